@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Smart Notes Aggregates - Running totals kept up to date on every write
+
+Counts per type and tag, total words, mood and energy sums/counts, min and
+max (via a value multiset, so deletes never force a rescan) and per-hour
+buckets are adjusted by add/remove as notes change. Statistics, mood trends,
+the local question router and the Streamlit cards then read them in O(1)
+instead of rescanning every note on every rerun. `verify` compares the
+running totals with a full recompute.
+"""
+
+from collections import Counter
+
+HOURS = range(24)
+MORNING_HOURS = range(0, 12)
+EVENING_HOURS = range(18, 24)
+
+
+def metric_value(note, key):
+    """A usable mood/energy rating from a note, or None (same rule as the original scans)"""
+    value = note.get("metadata", {}).get(key)
+    if value and isinstance(value, (int, float)) and not isinstance(value, bool):
+        return value
+    return None
+
+
+def word_count(note):
+    """Words in a note: metadata.word_count, or counted from the content for legacy notes without it"""
+    value = note.get("metadata", {}).get("word_count")
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    return len(note.get("content", "").split())
+
+
+class MetricStats:
+    """Count, sum and a value multiset for one rating (min/max are O(distinct values))"""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0
+        self.values = Counter()
+
+    def add(self, value):
+        self.count += 1
+        self.total += value
+        self.values[value] += 1
+
+    def remove(self, value):
+        self.count -= 1
+        self.total -= value
+        self.values[value] -= 1
+        if self.values[value] <= 0:
+            del self.values[value]
+
+    def average(self):
+        return self.total / self.count if self.count else None
+
+    def minimum(self):
+        return min(self.values) if self.values else None
+
+    def maximum(self):
+        return max(self.values) if self.values else None
+
+    def to_dict(self):
+        return {"count": self.count, "total": self.total, "values": dict(sorted(self.values.items()))}
+
+
+class NoteAggregates:
+    """Incrementally maintained totals over a notes dict"""
+
+    def __init__(self):
+        self.total_notes = 0
+        self.total_words = 0
+        self.type_counts = Counter()
+        self.tag_counts = Counter()  # lowercased tag -> notes carrying it
+        self.mood = MetricStats()
+        self.energy = MetricStats()
+        self.hour_counts = [0] * 24
+        self.hour_mood_totals = [0] * 24
+        self.hour_mood_counts = [0] * 24
+
+    @classmethod
+    def from_notes(cls, notes):
+        aggregates = cls()
+        for note in notes.values():
+            aggregates.add(note)
+        return aggregates
+
+    def _apply(self, note, sign):
+        metadata = note.get("metadata", {})
+        self.total_notes += sign
+        self.total_words += sign * word_count(note)
+        note_type = note.get("type", "general")
+        self.type_counts[note_type] += sign
+        if self.type_counts[note_type] <= 0:
+            del self.type_counts[note_type]
+        for tag in {tag.lower() for tag in note.get("tags", [])}:
+            self.tag_counts[tag] += sign
+            if self.tag_counts[tag] <= 0:
+                del self.tag_counts[tag]
+
+        hour = metadata.get("created_hour", 12)
+        if hour in HOURS:
+            self.hour_counts[hour] += sign
+
+        mood = metric_value(note, "mood")
+        if mood is not None:
+            if sign > 0:
+                self.mood.add(mood)
+            else:
+                self.mood.remove(mood)
+            if hour in HOURS:
+                self.hour_mood_totals[hour] += sign * mood
+                self.hour_mood_counts[hour] += sign
+
+        energy = metric_value(note, "energy_level")
+        if energy is not None:
+            if sign > 0:
+                self.energy.add(energy)
+            else:
+                self.energy.remove(energy)
+
+    def add(self, note):
+        self._apply(note, 1)
+
+    def remove(self, note):
+        self._apply(note, -1)
+
+    def replace(self, old_note, new_note):
+        """Account for an update: take the old version out, put the new one in"""
+        self.remove(old_note)
+        self.add(new_note)
+
+    def hours_mood_average(self, hours):
+        """Average mood over a set of hours (e.g. MORNING_HOURS), or None"""
+        count = sum(self.hour_mood_counts[hour] for hour in hours)
+        if not count:
+            return None
+        return sum(self.hour_mood_totals[hour] for hour in hours) / count
+
+    def to_dict(self):
+        return {
+            "total_notes": self.total_notes,
+            "total_words": self.total_words,
+            "type_counts": dict(sorted(self.type_counts.items())),
+            "tag_counts": dict(sorted(self.tag_counts.items())),
+            "mood": self.mood.to_dict(),
+            "energy": self.energy.to_dict(),
+            "hour_counts": list(self.hour_counts),
+            "hour_mood_totals": list(self.hour_mood_totals),
+            "hour_mood_counts": list(self.hour_mood_counts)
+        }
+
+    def verify(self, notes):
+        """Compare against a full recompute; returns a list of mismatched fields (empty = consistent)"""
+        expected = NoteAggregates.from_notes(notes).to_dict()
+        actual = self.to_dict()
+        return [f"{field}: expected {expected[field]}, got {actual[field]}"
+                for field in expected if expected[field] != actual[field]]
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Smart Notes AI Jobs - Background AI work that survives Streamlit reruns
+
+Long AI calls used to run inline in the Streamlit script thread, freezing the
+session and losing the result on any rerun or navigation. Jobs run on a
+process-wide thread pool instead. The registry is keyed by (session, prompt
+hash), so a second click on the same analysis joins the job that is already
+running instead of starting another. Jobs publish progress messages and
+partial streamed text for the UI to poll. Cancellation is cooperative: the job
+stops at its next progress or stream step. Finished jobs are kept for a
+retention period so results are still there after the user navigates away
+and back.
+"""
+
+import hashlib
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from config import AI_JOB_WORKERS, AI_JOB_RETENTION_SECONDS
+
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+
+class JobCancelled(Exception):
+    """Raised inside a job function when the user has cancelled it"""
+
+
+def prompt_hash(*parts):
+    """Stable short hash identifying what a job computes"""
+    return hashlib.sha256("\x1f".join(str(part) for part in parts).encode('utf-8')).hexdigest()[:16]
+
+
+class Job:
+    """State of one background job; job functions update it, the UI polls it"""
+
+    def __init__(self, job_id, key, label):
+        self.id = job_id
+        self.key = key
+        self.label = label
+        self.status = RUNNING
+        self.messages = []
+        self.chunks = []
+        self.result = None
+        self.error = None
+        self.meta = {}
+        self.created_at = time.time()
+        self.finished_at = None
+        self._cancel = threading.Event()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    @property
+    def finished(self):
+        return self.status != RUNNING
+
+    @property
+    def elapsed(self):
+        return (self.finished_at or time.time()) - self.created_at
+
+    @property
+    def partial_text(self):
+        return "".join(self.chunks)
+
+    def check_cancelled(self):
+        if self._cancel.is_set():
+            raise JobCancelled()
+
+    def report(self, message):
+        """Record a progress message (also a cancellation point)"""
+        self.check_cancelled()
+        self.messages.append(message)
+
+    def append_text(self, chunk):
+        """Record a chunk of streamed output (also a cancellation point)"""
+        self.check_cancelled()
+        self.chunks.append(chunk)
+
+
+class JobRegistry:
+    """Thread-pool executor plus a registry of jobs keyed by (session, prompt hash)"""
+
+    def __init__(self, max_workers=AI_JOB_WORKERS, retention_seconds=AI_JOB_RETENTION_SECONDS):
+        self.retention_seconds = retention_seconds
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ai-job")
+        self._lock = threading.Lock()
+        self._jobs = {}
+        self._by_key = {}
+        self._ids = itertools.count(1)
+
+    def submit(self, session_id, digest, label, function):
+        """Start function(job) in the background, or return the matching job if one exists.
+
+        A running or finished job with the same key is reused; failed and
+        cancelled ones are replaced so a retry really retries.
+        """
+        key = (session_id, digest)
+        with self._lock:
+            self._prune()
+            existing = self._jobs.get(self._by_key.get(key))
+            if existing is not None and existing.status in (RUNNING, DONE):
+                return existing
+            job = Job(next(self._ids), key, label)
+            self._jobs[job.id] = job
+            self._by_key[key] = job.id
+        self._executor.submit(self._run, job, function)
+        return job
+
+    def _run(self, job, function):
+        try:
+            job.result = function(job)
+            job.status = CANCELLED if job.cancelled else DONE
+        except JobCancelled:
+            job.status = CANCELLED
+        except Exception as e:
+            job.error = e
+            job.status = FAILED
+        finally:
+            job.finished_at = time.time()
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id):
+        job = self.get(job_id)
+        if job is not None and not job.finished:
+            job._cancel.set()
+            return True
+        return False
+
+    def jobs_for(self, session_id):
+        """All retained jobs of one session, newest first"""
+        with self._lock:
+            jobs = [job for job in self._jobs.values() if job.key[0] == session_id]
+        return sorted(jobs, key=lambda job: job.created_at, reverse=True)
+
+    def _prune(self):
+        # Caller holds the lock
+        cutoff = time.time() - self.retention_seconds
+        for job_id, job in list(self._jobs.items()):
+            if job.finished and job.finished_at < cutoff:
+                del self._jobs[job_id]
+                if self._by_key.get(job.key) == job_id:
+                    del self._by_key[job.key]
+
+
+_shared_registry = None
+_shared_registry_lock = threading.Lock()
+
+
+def get_job_registry():
+    """Return the process-wide JobRegistry"""
+    global _shared_registry
+    if _shared_registry is None:
+        with _shared_registry_lock:
+            if _shared_registry is None:
+                _shared_registry = JobRegistry()
+    return _shared_registry
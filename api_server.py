@@ -0,0 +1,425 @@
+#!/usr/bin/env python3
+"""
+Smart Notes API Server - HTTP/JSON access to the notes store for other tools
+
+A small HTTP/1.1 server built on asyncio streams (standard library only), on
+top of the same copy-on-write SharedNotesStore the Streamlit app uses. Reads
+come from the current snapshot without locking. Writes, asks and anything
+that scans the notebook run on worker threads, so one slow request does not
+stall the others. Connections are kept alive and requests on them may be
+pipelined. GET responses for lists, searches, single notes and stats carry an
+ETag derived from the store generation, so If-None-Match gets a 304 without
+the body being rebuilt. Their serialized bodies are also cached until the next
+write.
+
+    python api_server.py --port 8780
+
+    GET    /health
+    GET    /notes?limit=50&offset=0&type=journal&tag=work&sort=newest
+    POST   /notes            {"title", "content", "tags", "note_type", "mood", "energy_level"}
+    GET    /notes/{id}
+    PATCH  /notes/{id}       any of the POST fields
+    DELETE /notes/{id}
+    GET    /search?q=text&limit=20
+    GET    /stats
+    POST   /ask              {"question", "relevant_only", "use_local"}
+    GET    /metrics          Prometheus text (needs SMART_NOTES_TRACE=1)
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import re
+import threading
+import uuid
+from collections import OrderedDict
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+
+from config import API_HOST, API_PORT, API_KEEPALIVE_SECONDS, API_MAX_BODY_BYTES
+from daily_rollup import combine
+from instrumentation import PROMETHEUS_CONTENT_TYPE, prometheus_text, span
+from notes_enhanced import NOTE_SORTS, SmartNotes
+from shared_store import SharedNotesStore
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 1000
+RESPONSE_CACHE_ENTRIES = 256
+REFRESH_INTERVAL_SECONDS = 2.0
+NOTE_FIELDS = ("title", "content", "tags", "note_type", "mood", "energy_level")
+
+_NOTE_PATH = re.compile(r"^/notes/(?P<note_id>[\w-]+)$")
+
+
+class ApiError(Exception):
+    """Turned into a JSON error response with the given status"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _int_param(query, name, default, maximum=None):
+    try:
+        value = int(query.get(name, [default])[0])
+    except ValueError:
+        raise ApiError(HTTPStatus.BAD_REQUEST, f"{name} must be an integer")
+    value = max(0, value)
+    return min(value, maximum) if maximum is not None else value
+
+
+def _note_fields(body, required=()):
+    unknown = set(body) - set(NOTE_FIELDS)
+    if unknown:
+        raise ApiError(HTTPStatus.BAD_REQUEST, f"Unknown fields: {', '.join(sorted(unknown))}")
+    for name in required:
+        if not str(body.get(name) or "").strip():
+            raise ApiError(HTTPStatus.BAD_REQUEST, f"{name} is required")
+    if "tags" in body and not isinstance(body["tags"], list):
+        raise ApiError(HTTPStatus.BAD_REQUEST, "tags must be a list")
+    return body
+
+
+class NotesApi:
+    """Routes, handlers and caches; transport-independent so it can be driven directly"""
+
+    def __init__(self, store=None):
+        self.store = store or SharedNotesStore()
+        self.view = self.store.view()
+        self._etag_salt = uuid.uuid4().hex[:8]  # so ETags from a previous server run never match
+        self._cache_lock = threading.Lock()
+        self._id_lists = OrderedDict()     # (generation, filters) -> matching ids in order
+        self._responses = OrderedDict()    # (generation, target) -> serialized body
+        self._asker = (None, None)         # (generation, SmartNotes) reused by /ask, so its passage index is too
+        self.routes = [
+            ("GET", re.compile(r"^/health$"), self.health),
+            ("GET", re.compile(r"^/notes$"), self.list_notes),
+            ("POST", re.compile(r"^/notes$"), self.create_note),
+            ("GET", _NOTE_PATH, self.get_note),
+            ("PATCH", _NOTE_PATH, self.update_note),
+            ("PUT", _NOTE_PATH, self.update_note),
+            ("DELETE", _NOTE_PATH, self.delete_note),
+            ("GET", re.compile(r"^/search$"), self.search),
+            ("GET", re.compile(r"^/stats$"), self.stats),
+            ("POST", re.compile(r"^/ask$"), self.ask),
+            ("GET", re.compile(r"^/metrics$"), self.metrics)
+        ]
+
+    # -- caching helpers -------------------------------------------------------
+
+    def etag(self, generation, target):
+        digest = hashlib.sha1(f"{self._etag_salt}|{generation}|{target}".encode('utf-8')).hexdigest()
+        return f'"{digest[:20]}"'
+
+    def _remember(self, cache, key, value):
+        with self._cache_lock:
+            cache[key] = value
+            cache.move_to_end(key)
+            while len(cache) > RESPONSE_CACHE_ENTRIES:
+                cache.popitem(last=False)
+
+    def _matching_ids(self, notes, generation, note_type=None, tag=None, query=None, sort="file"):
+        key = (generation, note_type, tag, query, sort)
+        with self._cache_lock:
+            ids = self._id_lists.get(key)
+        if ids is None:
+            finder = SmartNotes(notes=notes)  # reuses the CLI's filtering and sort orders, no file read
+            ids = [note_id for note_id, note in finder.iter_notes(sort, tag, query)
+                   if note_type is None or note.get("type", "general") == note_type]
+            self._remember(self._id_lists, key, ids)
+        return ids
+
+    def _asker_for_generation(self):
+        """One SmartNotes per store generation; its passage index is built once per notebook version
+        and statistics questions are answered from the snapshot's aggregates and rollup"""
+        generation = self.store.generation
+        with self._cache_lock:
+            asker_generation, asker = self._asker
+            if asker is None or asker_generation != generation:
+                snapshot = self.store.snapshot()
+                asker = SmartNotes(notes=snapshot.notes, aggregates=snapshot.aggregates, rollup=snapshot.rollup)
+                self._asker = (generation, asker)
+        return asker
+
+    # -- handlers (run on worker threads; return (status, payload)) -------------
+
+    def health(self, query, body, match):
+        return HTTPStatus.OK, {"ok": True, "notes": len(self.store.snapshot().notes),
+                               "generation": self.store.generation}
+
+    def list_notes(self, query, body, match):
+        return self._page(query, note_type=query.get("type", [None])[0], tag=query.get("tag", [None])[0])
+
+    def search(self, query, body, match):
+        text = query.get("q", [""])[0].strip()
+        if not text:
+            raise ApiError(HTTPStatus.BAD_REQUEST, "q is required")
+        return self._page(query, query_text=text)
+
+    def _page(self, query, note_type=None, tag=None, query_text=None):
+        sort = query.get("sort", ["file"])[0]
+        if sort not in NOTE_SORTS:
+            raise ApiError(HTTPStatus.BAD_REQUEST, f"sort must be one of {', '.join(NOTE_SORTS)}")
+        limit = _int_param(query, "limit", DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE)
+        offset = _int_param(query, "offset", 0)
+        generation = self.store.generation
+        notes = self.store.snapshot().notes
+        ids = self._matching_ids(notes, generation, note_type, tag, query_text, sort)
+        page = [dict(notes[note_id], id=note_id) for note_id in ids[offset:offset + limit] if note_id in notes]
+        return HTTPStatus.OK, {"total": len(ids), "offset": offset, "limit": limit, "notes": page}
+
+    def get_note(self, query, body, match):
+        note_id = match.group("note_id")
+        note = self.store.snapshot().notes.get(note_id)
+        if note is None:
+            raise ApiError(HTTPStatus.NOT_FOUND, f"Note {note_id} not found")
+        return HTTPStatus.OK, dict(note, id=note_id)
+
+    def create_note(self, query, body, match):
+        fields = _note_fields(body, required=("title", "content"))
+        note_id = self.view.add_note(fields["title"], fields["content"], fields.get("tags"),
+                                     fields.get("note_type") or "general", fields.get("mood"),
+                                     fields.get("energy_level"))
+        return HTTPStatus.CREATED, dict(self.store.snapshot().notes[note_id], id=note_id)
+
+    def update_note(self, query, body, match):
+        note_id = match.group("note_id")
+        fields = _note_fields(body)
+        if note_id not in self.store.snapshot().notes:
+            raise ApiError(HTTPStatus.NOT_FOUND, f"Note {note_id} not found")
+        self.view.update_note(note_id, fields.get("title"), fields.get("content"), fields.get("tags"),
+                              fields.get("note_type"), fields.get("mood"), fields.get("energy_level"))
+        return HTTPStatus.OK, dict(self.store.snapshot().notes[note_id], id=note_id)
+
+    def delete_note(self, query, body, match):
+        note_id = match.group("note_id")
+        if not self.view.delete_note(note_id):
+            raise ApiError(HTTPStatus.NOT_FOUND, f"Note {note_id} not found")
+        return HTTPStatus.OK, {"deleted": note_id}
+
+    def stats(self, query, body, match):
+        app = self.store.snapshot()
+        aggregates = app.aggregates
+        total_notes = aggregates.total_notes
+        return HTTPStatus.OK, {
+            "total_notes": total_notes,
+            "total_words": aggregates.total_words,
+            "avg_words": aggregates.total_words // total_notes if total_notes else 0,
+            "type_counts": dict(sorted(aggregates.type_counts.items())),
+            "mood": {"average": aggregates.mood.average(), "min": aggregates.mood.minimum(),
+                     "max": aggregates.mood.maximum(), "count": aggregates.mood.count},
+            "energy": {"average": aggregates.energy.average(), "min": aggregates.energy.minimum(),
+                       "max": aggregates.energy.maximum(), "count": aggregates.energy.count},
+            "last_30_days": combine(app.rollup.last_days(30))
+        }
+
+    def ask(self, query, body, match):
+        question = str(body.get("question") or "").strip()
+        if not question:
+            raise ApiError(HTTPStatus.BAD_REQUEST, "question is required")
+        result = self._asker_for_generation().answer_question(question, bool(body.get("relevant_only")),
+                                       use_local=body.get("use_local", True) is not False)
+        return (HTTPStatus.BAD_GATEWAY if "error" in result else HTTPStatus.OK), result
+
+    def metrics(self, query, body, match):
+        # Bytes rather than a dict: dispatch sends them as Prometheus text instead of JSON
+        return HTTPStatus.OK, prometheus_text().encode('utf-8')
+
+    # -- dispatch ---------------------------------------------------------------
+
+    @staticmethod
+    def _run(handler, query, body, match):
+        with span(f"api.{handler.__name__}"):
+            return handler(query, body, match)
+
+    CACHEABLE = ("list_notes", "search", "get_note", "stats")
+
+    async def dispatch(self, method, target, headers, body):
+        """Returns (status, body bytes, extra headers)"""
+        parts = urlsplit(target)
+        allowed = []
+        for route_method, pattern, handler in self.routes:
+            match = pattern.match(parts.path)
+            if match is None:
+                continue
+            if route_method != method:
+                allowed.append(route_method)
+                continue
+            cacheable = method == "GET" and handler.__name__ in self.CACHEABLE
+            if cacheable:
+                generation = self.store.generation
+                etag = self.etag(generation, target)
+                if etag in headers.get("if-none-match", ""):
+                    return HTTPStatus.NOT_MODIFIED, b"", {"ETag": etag}
+                cache_key = (generation, target)
+                with self._cache_lock:
+                    cached = self._responses.get(cache_key)
+                if cached is not None:
+                    return HTTPStatus.OK, cached, {"ETag": etag}
+            try:
+                payload = json.loads(body) if body else {}
+                if not isinstance(payload, dict):
+                    raise ApiError(HTTPStatus.BAD_REQUEST, "Request body must be a JSON object")
+            except ValueError:
+                return self._error(HTTPStatus.BAD_REQUEST, "Request body is not valid JSON")
+            try:
+                status, result = await asyncio.to_thread(self._run, handler, parse_qs(parts.query), payload, match)
+            except ApiError as e:
+                return self._error(e.status, str(e))
+            except Exception as e:
+                return self._error(HTTPStatus.INTERNAL_SERVER_ERROR, f"Unexpected error: {e}")
+            if isinstance(result, bytes):
+                return status, result, {"Content-Type": PROMETHEUS_CONTENT_TYPE}
+            data = json.dumps(result, ensure_ascii=False).encode('utf-8')
+            if cacheable and status == HTTPStatus.OK:
+                if self.store.generation == generation:
+                    # A write landed mid-request: send the body but don't file it under the old generation
+                    self._remember(self._responses, cache_key, data)
+                return status, data, {"ETag": etag}
+            return status, data, {}
+        if allowed:
+            status, data, extra = self._error(HTTPStatus.METHOD_NOT_ALLOWED, f"Use {', '.join(allowed)}")
+            return status, data, {"Allow": ", ".join(allowed)}
+        return self._error(HTTPStatus.NOT_FOUND, f"No route for {parts.path}")
+
+    @staticmethod
+    def _error(status, message):
+        return status, json.dumps({"error": message}).encode('utf-8'), {}
+
+
+class ApiServer:
+    """asyncio HTTP/1.1 transport for NotesApi with keep-alive and pipelining"""
+
+    def __init__(self, api=None, host=API_HOST, port=API_PORT,
+                 keepalive_seconds=API_KEEPALIVE_SECONDS, max_body_bytes=API_MAX_BODY_BYTES):
+        self.api = api or NotesApi()
+        self.host = host
+        self.port = port
+        self.keepalive_seconds = keepalive_seconds
+        self.max_body_bytes = max_body_bytes
+        self.server = None
+        self._refresher = None
+        self._connections = {}  # handler task -> its writer, so stop() can close idle keep-alives
+
+    async def _read_request(self, reader):
+        """(method, target, version, headers, body), or None when the client is done"""
+        request_line = await asyncio.wait_for(reader.readline(), self.keepalive_seconds)
+        if not request_line.strip():
+            return None
+        try:
+            method, target, version = request_line.decode('latin-1').split()
+        except ValueError:
+            raise ApiError(HTTPStatus.BAD_REQUEST, "Malformed request line")
+        headers = {}
+        while True:
+            line = await asyncio.wait_for(reader.readline(), self.keepalive_seconds)
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode('latin-1').partition(":")
+            headers[name.strip().lower()] = value.strip()
+        if "transfer-encoding" in headers:
+            # Only Content-Length framing is supported; chunk bytes must not be read as the next request
+            raise ApiError(HTTPStatus.NOT_IMPLEMENTED, "Transfer-Encoding is not supported, send Content-Length")
+        length = headers.get("content-length") or "0"
+        if not length.isdigit():
+            raise ApiError(HTTPStatus.BAD_REQUEST, "Content-Length must be a non-negative integer")
+        length = int(length)
+        if length > self.max_body_bytes:
+            raise ApiError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Request body too large")
+        body = await reader.readexactly(length) if length else b""
+        return method.upper(), target, version, headers, body
+
+    @staticmethod
+    def _keep_alive(version, headers):
+        connection = headers.get("connection", "").lower()
+        if version == "HTTP/1.0":
+            return connection == "keep-alive"
+        return connection != "close"
+
+    def _response(self, status, data, extra_headers, keep_alive):
+        status = HTTPStatus(status)
+        lines = [f"HTTP/1.1 {status.value} {status.phrase}"]
+        if status != HTTPStatus.NOT_MODIFIED and "Content-Type" not in extra_headers:
+            lines.append("Content-Type: application/json; charset=utf-8")
+        lines.append(f"Content-Length: {len(data)}")
+        lines.append("Connection: keep-alive" if keep_alive else "Connection: close")
+        if keep_alive:
+            lines.append(f"Keep-Alive: timeout={int(self.keepalive_seconds)}")
+        lines.extend(f"{name}: {value}" for name, value in extra_headers.items())
+        return ("\r\n".join(lines) + "\r\n\r\n").encode('latin-1') + data
+
+    async def handle_connection(self, reader, writer):
+        task = asyncio.current_task()
+        self._connections[task] = writer
+        try:
+            while True:
+                try:
+                    request = await self._read_request(reader)
+                except ApiError as e:
+                    status, data, extra = NotesApi._error(e.status, str(e))
+                    writer.write(self._response(status, data, extra, keep_alive=False))
+                    break
+                if request is None:
+                    break
+                method, target, version, headers, body = request
+                status, data, extra = await self.api.dispatch(method, target, headers, body)
+                keep_alive = self._keep_alive(version, headers)
+                writer.write(self._response(status, data, extra, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+            pass  # idle keep-alive timeout or the client hung up
+        finally:
+            self._connections.pop(task, None)
+            writer.close()
+
+    async def _refresh_loop(self):
+        # Pick up notes written by the CLI or the Streamlit app
+        while True:
+            await asyncio.sleep(REFRESH_INTERVAL_SECONDS)
+            await asyncio.to_thread(self.api.store.refresh_if_changed)
+
+    async def start(self):
+        self.server = await asyncio.start_server(self.handle_connection, self.host, self.port, backlog=1024)
+        self.port = self.server.sockets[0].getsockname()[1]
+        self._refresher = asyncio.create_task(self._refresh_loop())
+        return self
+
+    async def stop(self):
+        """Stop accepting, end the refresh loop and open connections, and wait until all are closed"""
+        if self._refresher is not None:
+            self._refresher.cancel()
+            await asyncio.gather(self._refresher, return_exceptions=True)
+            self._refresher = None
+        if self.server is None:
+            return
+        self.server.close()
+        handlers = list(self._connections)
+        for task in handlers:
+            task.cancel()
+        await asyncio.gather(*handlers, return_exceptions=True)
+        await self.server.wait_closed()
+
+    async def serve_forever(self):
+        await self.start()
+        print(f"🚪 Smart Notes API listening on http://{self.host}:{self.port} "
+              f"({len(self.api.store.snapshot().notes)} notes)")
+        async with self.server:
+            await self.server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HTTP/JSON API over the Smart Notes store")
+    parser.add_argument('--host', type=str, default=API_HOST)
+    parser.add_argument('--port', type=int, default=API_PORT)
+    args = parser.parse_args()
+    try:
+        asyncio.run(ApiServer(host=args.host, port=args.port).serve_forever())
+    except KeyboardInterrupt:
+        print("👋 API server stopped")
+
+
+if __name__ == "__main__":
+    main()
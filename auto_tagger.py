@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Smart Notes Auto-Tagger - Single-pass, word-boundary keyword tagging
+
+The tag lexicon (tag_lexicon.json) is compiled once into an Aho-Corasick
+automaton. Tagging walks the content a single time and reports every keyword
+hit whose edges fall on word boundaries, so "read" no longer fires inside
+"already" and "plan" no longer fires inside "planet". A trailing "*" in the
+lexicon makes an entry a prefix ("learn*" matches learn, learning, learned).
+Hits are summed into per-tag scores. The best scoring tags win, instead of
+whichever tags happened to be checked first. The lexicon is reloaded
+automatically when its file changes.
+"""
+
+import json
+import os
+import threading
+from collections import deque
+
+from config import TAG_LEXICON_FILE
+
+DEFAULT_MAX_TAGS = 3
+DEFAULT_MIN_SCORE = 1.0
+
+
+def _is_word_char(char):
+    return char.isalnum() or char == "_"
+
+
+class KeywordAutomaton:
+    """Aho-Corasick automaton over (term, payload) pairs"""
+
+    def __init__(self, entries):
+        # Node 0 is the root; each node has goto edges, a failure link and outputs
+        self.goto = [{}]
+        self.fail = [0]
+        self.outputs = [[]]
+        for term, payload in entries:
+            self._insert(term, payload)
+        self._link()
+
+    def _insert(self, term, payload):
+        node = 0
+        for char in term:
+            next_node = self.goto[node].get(char)
+            if next_node is None:
+                next_node = len(self.goto)
+                self.goto[node][char] = next_node
+                self.goto.append({})
+                self.fail.append(0)
+                self.outputs.append([])
+            node = next_node
+        self.outputs[node].append((len(term), payload))
+
+    def _link(self):
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self.goto[node].items():
+                queue.append(child)
+                fallback = self.fail[node]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(char, 0)
+                if self.fail[child] == child:
+                    self.fail[child] = 0
+                self.outputs[child] = self.outputs[child] + self.outputs[self.fail[child]]
+
+    def iter_matches(self, text):
+        """Yield (start, end, payload) for every occurrence of every term in one pass"""
+        node = 0
+        for index, char in enumerate(text):
+            while node and char not in self.goto[node]:
+                node = self.fail[node]
+            node = self.goto[node].get(char, 0)
+            for length, payload in self.outputs[node]:
+                yield index - length + 1, index + 1, payload
+
+
+class AutoTagger:
+    """Scores content against the tag lexicon and returns the best tags"""
+
+    def __init__(self, lexicon_file=TAG_LEXICON_FILE):
+        self.lexicon_file = lexicon_file
+        self._lock = threading.Lock()
+        self._mtime = None
+        self.automaton = KeywordAutomaton([])
+        self.max_tags = DEFAULT_MAX_TAGS
+        self.min_score = DEFAULT_MIN_SCORE
+        self.reload_if_changed()
+
+    def load(self, lexicon):
+        """Compile a lexicon dict ({"tags": {tag: {"weight", "terms"}}, ...})"""
+        entries = []
+        for tag, spec in lexicon.get("tags", {}).items():
+            weight = float(spec.get("weight", 1.0))
+            for term in spec.get("terms", []):
+                term = term.strip().lower()
+                prefix = term.endswith("*")
+                term = term.rstrip("*")
+                if term:
+                    entries.append((term, (tag, weight, prefix)))
+        automaton = KeywordAutomaton(entries)
+        with self._lock:
+            self.automaton = automaton
+            self.max_tags = int(lexicon.get("max_tags", DEFAULT_MAX_TAGS))
+            self.min_score = float(lexicon.get("min_score", DEFAULT_MIN_SCORE))
+
+    def reload_if_changed(self):
+        """Recompile when the lexicon file's mtime changes; keeps the old lexicon if the new one is broken"""
+        try:
+            mtime = os.stat(self.lexicon_file).st_mtime_ns
+        except OSError:
+            return False
+        if mtime == self._mtime:
+            return False
+        try:
+            with open(self.lexicon_file, 'r', encoding='utf-8') as f:
+                lexicon = json.load(f)
+        except (json.JSONDecodeError, OSError) as e:
+            print(f"❌ Could not load tag lexicon {self.lexicon_file}: {e}")
+            self._mtime = mtime
+            return False
+        self.load(lexicon)
+        self._mtime = mtime
+        return True
+
+    def score(self, content):
+        """{tag: score} from a single pass over the content"""
+        self.reload_if_changed()
+        text = content.lower()
+        automaton = self.automaton
+        scores = {}
+        for start, end, (tag, weight, prefix) in automaton.iter_matches(text):
+            if start > 0 and _is_word_char(text[start - 1]):
+                continue
+            if not prefix and end < len(text) and _is_word_char(text[end]):
+                continue
+            scores[tag] = scores.get(tag, 0.0) + weight
+        return scores
+
+    def tag(self, content, max_tags=None):
+        """Best scoring tags (highest first), keeping only those above the minimum score"""
+        scores = self.score(content)
+        ranked = sorted((item for item in scores.items() if item[1] >= self.min_score),
+                        key=lambda item: (-item[1], item[0]))
+        return [tag for tag, _ in ranked[:max_tags or self.max_tags]]
+
+
+_shared_tagger = None
+_shared_tagger_lock = threading.Lock()
+
+
+def get_auto_tagger():
+    """Return the process-wide AutoTagger"""
+    global _shared_tagger
+    if _shared_tagger is None:
+        with _shared_tagger_lock:
+            if _shared_tagger is None:
+                _shared_tagger = AutoTagger()
+    return _shared_tagger
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Smart Notes Backfill - Parallel re-tagging and metadata backfill
+
+Older notes (note_1, note_2, anything written by the basic SmartNotes CLI)
+have no type or metadata, so mood analytics and word counts skip them, and a
+changed tag lexicon leaves every existing note's auto-tags stale. This job
+streams the store through a process pool. Each worker computes word_count,
+created_date_only, created_hour and auto_tags, plus defaults for type, tags
+and updated. Results are committed in batches, with progress and a checkpoint
+so an interrupted run resumes where it stopped. --dry-run prints a diff and
+writes nothing.
+
+    python backfill.py --dry-run
+    python backfill.py --workers 8 --batch-size 50000
+"""
+
+import argparse
+import json
+import os
+import time
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+
+from auto_tagger import get_auto_tagger
+from config import NOTES_FILE, REINDEX_BATCH_SIZE, REINDEX_CHECKPOINT_FILE
+
+CHUNK_SIZE = 1000       # notes per task sent to a worker
+DIFF_PREVIEW = 20       # notes shown in a dry-run diff
+
+
+def backfill_note(note, tagger):
+    """Return the backfilled copy of a note (the input is not modified)"""
+    note = dict(note)
+    metadata = dict(note.get("metadata") or {})
+    created = note.get("created", "")
+    content = note.get("content", "")
+
+    note.setdefault("type", "general")
+    note.setdefault("tags", [])
+    if created:
+        note.setdefault("updated", created)
+    metadata.setdefault("mood", None)
+    metadata.setdefault("energy_level", None)
+    metadata["word_count"] = len(content.split())
+    if created:
+        metadata["created_date_only"] = created[:10]
+        metadata["created_hour"] = int(created[11:13]) if len(created) >= 13 else 12
+    metadata["auto_tags"] = tagger.tag(f"{note.get('title', '')}\n{content}")
+    note["metadata"] = metadata
+    return note
+
+
+def backfill_chunk(chunk):
+    """Worker entry point: [(note_id, note)] -> [(note_id, new_note)] for notes that changed"""
+    tagger = get_auto_tagger()
+    changed = []
+    for note_id, note in chunk:
+        new_note = backfill_note(note, tagger)
+        if new_note != note:
+            changed.append((note_id, new_note))
+    return changed
+
+
+def diff_note(old, new, prefix=""):
+    """Human-readable field changes between two versions of a note"""
+    lines = []
+    for key in sorted(set(old) | set(new)):
+        before, after = old.get(key), new.get(key)
+        if isinstance(before, dict) or isinstance(after, dict):
+            lines.extend(diff_note(before or {}, after or {}, f"{prefix}{key}."))
+        elif before != after:
+            lines.append(f"{prefix}{key}: {json.dumps(before, ensure_ascii=False)} -> {json.dumps(after, ensure_ascii=False)}")
+    return lines
+
+
+def changed_fields(old, new):
+    return [line.split(":", 1)[0] for line in diff_note(old, new)]
+
+
+def _chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _parallel_map(executor, function, tasks, window):
+    """Like executor.map, but submits lazily so only `window` tasks are in flight"""
+    pending = deque()
+    for task in tasks:
+        pending.append(executor.submit(function, task))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+class Checkpoint:
+    """Where the last committed batch ended, so an interrupted run can resume"""
+
+    def __init__(self, checkpoint_file=REINDEX_CHECKPOINT_FILE):
+        self.checkpoint_file = checkpoint_file
+
+    def load(self, note_ids):
+        """Number of notes already processed, or 0 if there is no usable checkpoint"""
+        if not self.checkpoint_file.exists():
+            return 0
+        try:
+            with open(self.checkpoint_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (json.JSONDecodeError, FileNotFoundError):
+            return 0
+        done = data.get("done", 0)
+        # Only trust it if the store still has the same note at that position
+        if 0 < done <= len(note_ids) and note_ids[done - 1] == data.get("last_id"):
+            return done
+        return 0
+
+    def save(self, done, last_id):
+        with open(self.checkpoint_file, 'w', encoding='utf-8') as f:
+            json.dump({"done": done, "last_id": last_id, "saved_at": time.time()}, f)
+
+    def clear(self):
+        if self.checkpoint_file.exists():
+            self.checkpoint_file.unlink()
+
+
+def _write_store(notes, notes_file):
+    tmp_file = notes_file.with_suffix(".tmp")
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(notes, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_file, notes_file)
+
+
+def run_backfill(notes_file=NOTES_FILE, workers=None, batch_size=REINDEX_BATCH_SIZE,
+                 dry_run=False, resume=True, checkpoint=None):
+    """Backfill every note; returns a summary dict"""
+    workers = workers or os.cpu_count() or 1
+    checkpoint = checkpoint or Checkpoint()
+    if not notes_file.exists():
+        print("📝 No notes to reindex")
+        return {"processed": 0, "changed": 0}
+    with open(notes_file, 'r', encoding='utf-8') as f:
+        notes = json.load(f)
+
+    note_ids = list(notes)
+    start = checkpoint.load(note_ids) if resume and not dry_run else 0
+    if start:
+        print(f"↩️ Resuming after {start:,} already processed notes")
+    items = [(note_id, notes[note_id]) for note_id in note_ids[start:]]
+    chunk_size = min(CHUNK_SIZE, batch_size)
+    total = len(note_ids)
+    mode = "Dry run over" if dry_run else "Reindexing"
+    print(f"🔄 {mode} {len(items):,} notes with {workers} worker processes...")
+
+    started = time.perf_counter()
+    processed = start
+    changed = 0
+    field_counts = Counter()
+    previews = []
+    pending_batch = 0
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = _parallel_map(executor, backfill_chunk, _chunks(items, chunk_size), window=workers * 2)
+        for chunk, chunk_changes in zip(_chunks(items, chunk_size), results):
+            for note_id, new_note in chunk_changes:
+                old_note = notes[note_id]
+                field_counts.update(changed_fields(old_note, new_note))
+                if dry_run and len(previews) < DIFF_PREVIEW:
+                    previews.append((note_id, diff_note(old_note, new_note)))
+                if not dry_run:
+                    notes[note_id] = new_note
+            changed += len(chunk_changes)
+            processed += len(chunk)
+            pending_batch += len(chunk)
+
+            if pending_batch >= batch_size or processed == total:
+                if not dry_run:
+                    # Commit the batch, then record how far we got
+                    _write_store(notes, notes_file)
+                    checkpoint.save(processed, note_ids[processed - 1])
+                pending_batch = 0
+                rate = (processed - start) / max(time.perf_counter() - started, 1e-9)
+                print(f"  📦 {processed:,}/{total:,} notes ({changed:,} changed, {rate:,.0f} notes/s)")
+
+    if dry_run:
+        for note_id, lines in previews:
+            print(f"~ {note_id}")
+            for line in lines:
+                print(f"    {line}")
+        if changed > len(previews):
+            print(f"  ... and {changed - len(previews):,} more notes")
+    else:
+        checkpoint.clear()
+
+    elapsed = time.perf_counter() - started
+    print(f"✨ {'Would change' if dry_run else 'Changed'} {changed:,} of {total:,} notes in {elapsed:.1f}s")
+    for field, count in field_counts.most_common():
+        print(f"    {field}: {count:,}")
+    return {"processed": processed, "changed": changed, "fields": dict(field_counts), "elapsed_s": elapsed}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill metadata and auto-tags for every note")
+    parser.add_argument('--workers', type=int, help='Worker processes (default: all cores)')
+    parser.add_argument('--batch-size', type=int, default=REINDEX_BATCH_SIZE, help='Notes per committed batch')
+    parser.add_argument('--dry-run', action='store_true', help='Show what would change without writing')
+    parser.add_argument('--restart', action='store_true', help='Ignore any checkpoint and start from the first note')
+    args = parser.parse_args()
+    run_backfill(workers=args.workers, batch_size=max(1, args.batch_size),
+                 dry_run=args.dry_run, resume=not args.restart)
+
+
+if __name__ == "__main__":
+    main()
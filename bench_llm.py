@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+LLM Path Load Test - Drive the retrieval and prompt pipelines against mock_gemini
+
+Starts an in-process mock Gemini server (or uses --base-url), points the shared
+client at it and fires questions through retrieval, prompt building and
+generateContent with a configurable concurrency. Response caching is bypassed
+so every question exercises the full pipeline. Nothing touches the network.
+
+    python bench_llm.py --questions 500 --concurrency 16 --latency-ms 80 --relevant-only
+"""
+
+import argparse
+import json
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from chunking import PassageIndex
+from gemini_client import GeminiClient, GeminiError, set_client
+from mock_gemini import MockGeminiServer
+from notes_enhanced import SmartNotes
+
+QUESTION_TEMPLATES = [
+    "How has my mood changed over time? ({n})",
+    "What do I keep writing about at work? ({n})",
+    "Which principles matter most to me? ({n})",
+    "What did I learn recently? ({n})",
+    "What gives me energy in the mornings? ({n})"
+]
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(values):
+    return {
+        "count": len(values),
+        "p50_ms": round(percentile(values, 0.50), 2),
+        "p95_ms": round(percentile(values, 0.95), 2),
+        "p99_ms": round(percentile(values, 0.99), 2),
+        "max_ms": round(max(values), 2) if values else 0.0
+    }
+
+
+def run_question(notes, client, question, relevant_only):
+    """One full pipeline pass; returns per-stage timings in ms (or an error)"""
+    timings = {}
+    started = time.perf_counter()
+    try:
+        prompt, _ = notes._build_ask_prompt(question, relevant_only, client.api_key, verbose=False)
+        timings["prompt_ms"] = (time.perf_counter() - started) * 1000
+        generate_started = time.perf_counter()
+        client.generate_content(prompt)
+        timings["generate_ms"] = (time.perf_counter() - generate_started) * 1000
+    except GeminiError as e:
+        timings["error"] = str(e)
+    timings["total_ms"] = (time.perf_counter() - started) * 1000
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline load test for the LLM paths")
+    parser.add_argument('--questions', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--latency-ms', type=float, default=50.0, help='Mock server latency')
+    parser.add_argument('--jitter-ms', type=float, default=20.0, help='Mock server jitter')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Mock server error rate')
+    parser.add_argument('--relevant-only', action='store_true', help='Include passage retrieval')
+    parser.add_argument('--base-url', type=str, help='Use an already running mock/replay server')
+    parser.add_argument('--json', type=str, help='Also write the report to this JSON file')
+    args = parser.parse_args()
+
+    server = None
+    base_url = args.base_url
+    if not base_url:
+        server = MockGeminiServer(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+                                  error_rate=args.error_rate).start()
+        base_url = server.base_url
+
+    # Unthrottled client: we want to measure our pipeline, not the rate limiter
+    client = GeminiClient(api_key="mock-key", base_url=base_url, max_retries=2,
+                          pool_size=max(16, args.concurrency))
+    set_client(client)
+
+    notes = SmartNotes()
+    with tempfile.TemporaryDirectory() as scratch:
+        # Keep benchmark embeddings out of the real passage index
+        notes.passage_index = PassageIndex(index_file=Path(scratch) / "passage_index.json")
+        if args.relevant_only and notes.notes:
+            started = time.perf_counter()
+            notes.ensure_passage_index(client.api_key)
+            print(f"🧩 Passage index built in {(time.perf_counter() - started) * 1000:.0f} ms "
+                  f"({len(notes.passage_index.passages)} passages)")
+
+        questions = [QUESTION_TEMPLATES[n % len(QUESTION_TEMPLATES)].format(n=n) for n in range(args.questions)]
+        print(f"🚀 {len(questions)} questions, concurrency {args.concurrency}, {len(notes.notes)} notes")
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+            results = list(executor.map(
+                lambda question: run_question(notes, client, question, args.relevant_only), questions
+            ))
+        elapsed = time.perf_counter() - started
+
+    if server:
+        server.stop()
+
+    ok = [result for result in results if "error" not in result]
+    report = {
+        "questions": len(results),
+        "errors": len(results) - len(ok),
+        "elapsed_s": round(elapsed, 3),
+        "throughput_qps": round(len(results) / elapsed, 2) if elapsed else 0.0,
+        "prompt": summarize([result["prompt_ms"] for result in ok]),
+        "generate": summarize([result["generate_ms"] for result in ok]),
+        "total": summarize([result["total_ms"] for result in results])
+    }
+
+    print("=" * 50)
+    print(f"Throughput: {report['throughput_qps']} questions/s ({report['errors']} errors)")
+    for stage in ("prompt", "generate", "total"):
+        stats = report[stage]
+        print(f"{stage:>9}: p50 {stats['p50_ms']} ms  p95 {stats['p95_ms']} ms  p99 {stats['p99_ms']} ms")
+    print("=" * 50)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"📄 Report written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
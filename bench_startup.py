@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+CLI Startup Benchmark - Import-time regression check for notes_enhanced.py
+
+Runs `python -X importtime -c "import notes_enhanced"` in fresh interpreters,
+reports the slowest imports, and fails if a heavy dependency (numpy,
+scikit-learn, scipy, requests) is imported at startup again. It also times a
+real `notes_enhanced.py list` against an empty interpreter, so the figure it
+checks against the budget is only what the CLI adds.
+
+    python bench_startup.py
+    python bench_startup.py --runs 10 --budget-ms 100 --json startup.json
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+HEAVY_MODULES = ("numpy", "sklearn", "scipy", "requests", "urllib3", "pandas")
+PROJECT_DIR = Path(__file__).parent
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def import_profile(module="notes_enhanced"):
+    """{module: (self_us, cumulative_us)} from one -X importtime run"""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            capture_output=True, text=True, cwd=PROJECT_DIR)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    profile = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        profile[name.strip()] = (int(self_us), int(cumulative_us))
+    return profile
+
+
+def wall_time_ms(args):
+    started = time.perf_counter()
+    subprocess.run([sys.executable, *args], cwd=PROJECT_DIR,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return (time.perf_counter() - started) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import-time regression check for the CLI")
+    parser.add_argument('--runs', type=int, default=5, help='Fresh interpreters per measurement')
+    parser.add_argument('--top', type=int, default=10, help='Slowest imports to show')
+    parser.add_argument('--budget-ms', type=float, default=100.0,
+                        help='Max median time `list` may add on top of a bare interpreter')
+    parser.add_argument('--json', type=str, help='Also write the report to this JSON file')
+    args = parser.parse_args()
+    runs = max(1, args.runs)
+
+    profiles = [import_profile() for _ in range(runs)]
+    heavy = sorted({name for profile in profiles for name in profile
+                    if name.split(".")[0] in HEAVY_MODULES})
+    import_ms = [profile["notes_enhanced"][1] / 1000 for profile in profiles]
+    slowest = sorted(profiles[-1].items(), key=lambda item: item[1][0], reverse=True)[:args.top]
+
+    baseline_ms = [wall_time_ms(["-c", "pass"]) for _ in range(runs)]
+    list_ms = [wall_time_ms(["notes_enhanced.py", "list"]) for _ in range(runs)]
+    overhead_ms = percentile(list_ms, 0.5) - percentile(baseline_ms, 0.5)
+
+    report = {
+        "runs": runs,
+        "import_ms_p50": round(percentile(import_ms, 0.5), 2),
+        "interpreter_ms_p50": round(percentile(baseline_ms, 0.5), 2),
+        "list_ms_p50": round(percentile(list_ms, 0.5), 2),
+        "list_overhead_ms": round(overhead_ms, 2),
+        "budget_ms": args.budget_ms,
+        "heavy_imports": heavy,
+        "slowest_imports": [{"module": name, "self_ms": round(self_us / 1000, 2),
+                             "cumulative_ms": round(cumulative_us / 1000, 2)}
+                            for name, (self_us, cumulative_us) in slowest]
+    }
+
+    print("=" * 50)
+    print(f"import notes_enhanced: p50 {report['import_ms_p50']} ms")
+    print(f"notes_enhanced.py list: p50 {report['list_ms_p50']} ms "
+          f"({report['list_overhead_ms']} ms over a bare interpreter, budget {args.budget_ms} ms)")
+    print("Slowest imports (self time):")
+    for entry in report["slowest_imports"]:
+        print(f"  {entry['self_ms']:>7} ms  {entry['module']}")
+    print("=" * 50)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"📄 Report written to {args.json}")
+
+    failed = False
+    if heavy:
+        print(f"❌ Heavy modules imported at startup: {', '.join(heavy)}")
+        failed = True
+    if overhead_ms > args.budget_ms:
+        print(f"❌ CLI startup over budget: {overhead_ms:.0f} ms > {args.budget_ms:.0f} ms")
+        failed = True
+    if failed:
+        sys.exit(1)
+    print("✅ Startup within budget and free of heavy imports")
+
+
+if __name__ == "__main__":
+    main()
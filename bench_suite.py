@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Smart Notes Benchmark Suite - Store and analytics timings across notebook sizes
+
+For each size, a deterministic corpus is generated with corpus_generator.py
+(and cached in --corpus-dir so reruns skip generation). Its history ends
+today, so windowed analytics like track_mood_trends(30) have data to chew
+on; only the dates shift from day to day, never the notes themselves. A copy
+of the corpus is benchmarked in a fresh worker process pointed at it via
+SMART_NOTES_DATA_DIR, so config, caches and the daily ledger all see only that
+notebook and the real my_notes is never touched. Each operation is repeated until --repeats
+runs or --budget-s seconds, whichever comes first, and min/median/max are
+reported. Printed output from the operations goes to /dev/null.
+
+Results go to JSON with the git commit, so two commits can be compared:
+
+    python bench_suite.py --sizes 1000 10000 100000 --json before.json
+    git checkout my-branch
+    python bench_suite.py --sizes 1000 10000 100000 --json after.json --compare before.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from datetime import date, datetime
+from pathlib import Path
+
+from corpus_generator import DEFAULT_SEED, write_corpus
+
+PROJECT_DIR = Path(__file__).parent
+DEFAULT_SIZES = [1000, 10000, 100000]
+TAG_SAMPLE_SIZE = 1000
+SEARCH_QUERY = "grateful"
+OPERATIONS = ["load_notes", "save_notes", "add_note", "search_notes", "list_notes", "get_statistics",
+              "track_mood_trends", "track_mood_trends_all_time", "_auto_generate_tags",
+              "_prepare_analysis_context"]
+
+
+def measure(operation, repeats, budget_s):
+    """Run operation up to `repeats` times or until budget_s is spent (at least once)"""
+    timings = []
+    deadline = time.perf_counter() + budget_s
+    while len(timings) < repeats:
+        started = time.perf_counter()
+        operation()
+        timings.append((time.perf_counter() - started) * 1000)
+        if time.perf_counter() >= deadline:
+            break
+    return {
+        "runs": len(timings),
+        "min_ms": round(min(timings), 3),
+        "median_ms": round(statistics.median(timings), 3),
+        "max_ms": round(max(timings), 3)
+    }
+
+
+def run_worker(repeats, budget_s, operations):
+    """Benchmark the notebook in SMART_NOTES_DATA_DIR; prints one JSON result line"""
+    from notes_enhanced import SmartNotes
+    from self_exploration_app import SmartNotesEnhanced
+
+    results = {}
+    with open(os.devnull, 'w', encoding='utf-8') as devnull, redirect_stdout(devnull):
+        started = time.perf_counter()
+        app = SmartNotesEnhanced()
+        open_ms = (time.perf_counter() - started) * 1000
+        cli = SmartNotes(notes=app.notes)
+        sample = [note["content"] for note in list(app.notes.values())[:TAG_SAMPLE_SIZE]]
+
+        def add_note():
+            app.add_note("Benchmark note", "Feeling grateful after a long run this morning.",
+                         tags=["benchmark"], note_type="journal", mood=7, energy_level=6)
+
+        def auto_tags():
+            for content in sample:
+                app._auto_generate_tags(content)
+
+        timed = {
+            "load_notes": app.load_notes,
+            "save_notes": app.save_notes,
+            "add_note": add_note,
+            "search_notes": lambda: cli.search_notes(SEARCH_QUERY, limit=20),
+            "list_notes": app.list_notes,
+            "get_statistics": app.get_statistics,
+            "track_mood_trends": lambda: app.track_mood_trends(30),
+            "track_mood_trends_all_time": lambda: app.track_mood_trends(None),
+            "_auto_generate_tags": auto_tags,
+            "_prepare_analysis_context": app._prepare_analysis_context
+        }
+        for name in operations:
+            results[name] = measure(timed[name], repeats, budget_s)
+    if "_auto_generate_tags" in results:
+        results["_auto_generate_tags"]["notes"] = len(sample)
+
+    print(json.dumps({"notes": len(app.notes), "open_ms": round(open_ms, 3), "operations": results}))
+
+
+def corpus_for(size, seed, corpus_dir, end):
+    """Path to a cached generated notes.json for this size, seed and end date"""
+    notes_file = Path(corpus_dir) / f"corpus_{size}_seed{seed}_{end.date().isoformat()}" / "notes.json"
+    if not notes_file.exists():
+        print(f"🏗️ Generating {size:,} notes...")
+        partial = notes_file.with_suffix(".tmp")
+        write_corpus(partial, size, seed, end=end)
+        os.replace(partial, notes_file)
+    return notes_file
+
+
+def bench_size(size, args):
+    notes_file = corpus_for(size, args.seed, args.corpus_dir, args.end)
+    with tempfile.TemporaryDirectory(prefix="smart_notes_bench_") as data_dir:
+        shutil.copy(notes_file, Path(data_dir) / "notes.json")   # add_note/save_notes rewrite it
+        env = dict(os.environ, SMART_NOTES_DATA_DIR=data_dir, NOTES_NO_DAEMON="1")
+        command = [sys.executable, str(Path(__file__).resolve()), "--worker",
+                   "--repeats", str(args.repeats), "--budget-s", str(args.budget_s),
+                   "--operations", *args.operations]
+        result = subprocess.run(command, capture_output=True, text=True, env=env, cwd=PROJECT_DIR)
+    if result.returncode != 0:
+        print(f"❌ Benchmark worker failed for {size:,} notes: {result.stderr.strip()[-500:]}")
+        return None
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+    report["size"] = size
+    report["file_mb"] = round(notes_file.stat().st_size / 1_000_000, 2)
+    return report
+
+
+def git_commit():
+    try:
+        result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=PROJECT_DIR)
+    except OSError:
+        return None
+    return result.stdout.strip() or None
+
+
+def compare(report, baseline, threshold):
+    """Operations whose median got slower than threshold x the baseline's, per size"""
+    old_sizes = {str(entry["size"]): entry for entry in baseline.get("results", [])}
+    regressions = []
+    for entry in report["results"]:
+        old = old_sizes.get(str(entry["size"]))
+        if old is None:
+            continue
+        for name, stats in entry["operations"].items():
+            old_stats = old["operations"].get(name)
+            if not old_stats or not old_stats["median_ms"]:
+                continue
+            ratio = stats["median_ms"] / old_stats["median_ms"]
+            # Sub-millisecond operations are too noisy to flag on ratio alone
+            if ratio > threshold and stats["median_ms"] - old_stats["median_ms"] > 1.0:
+                regressions.append({"size": entry["size"], "operation": name, "ratio": round(ratio, 2),
+                                    "before_ms": old_stats["median_ms"], "after_ms": stats["median_ms"]})
+    return regressions
+
+
+def print_table(report, baseline=None):
+    old_sizes = {str(entry["size"]): entry for entry in (baseline or {}).get("results", [])}
+    for entry in report["results"]:
+        print(f"\n📚 {entry['notes']:,} notes ({entry['file_mb']} MB, opened in {entry['open_ms']:.0f} ms)")
+        old = old_sizes.get(str(entry["size"]), {}).get("operations", {})
+        for name, stats in entry["operations"].items():
+            line = f"  {name:<28} median {stats['median_ms']:>10.2f} ms  (min {stats['min_ms']:.2f}, {stats['runs']} runs)"
+            if name in old and old[name]["median_ms"]:
+                line += f"  x{stats['median_ms'] / old[name]['median_ms']:.2f} vs baseline"
+            print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Smart Notes operations across notebook sizes")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help='Notebook sizes (1k to 1M)')
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    parser.add_argument('--repeats', type=int, default=5, help='Max runs per operation')
+    parser.add_argument('--budget-s', type=float, default=10.0, help='Stop repeating an operation after this long')
+    parser.add_argument('--operations', nargs='+', default=OPERATIONS, choices=OPERATIONS)
+    parser.add_argument('--corpus-dir', type=str, default=str(Path(tempfile.gettempdir()) / "smart_notes_corpora"),
+                        help='Where generated corpora are cached between runs')
+    parser.add_argument('--json', type=str, help='Write the report to this JSON file')
+    parser.add_argument('--compare', type=str, help='Baseline JSON report to compare against')
+    parser.add_argument('--threshold', type=float, default=1.25,
+                        help='Flag operations whose median is this many times slower than the baseline')
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(max(1, args.repeats), args.budget_s, args.operations)
+        return
+    args.end = datetime.combine(date.today(), datetime.min.time())
+
+    report = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": args.seed,
+        "corpus_end": args.end.date().isoformat(),
+        "repeats": args.repeats,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": []
+    }
+    for size in args.sizes:
+        print(f"⏱️ Benchmarking {size:,} notes...")
+        entry = bench_size(size, args)
+        if entry is not None:
+            report["results"].append(entry)
+
+    baseline = None
+    if args.compare:
+        try:
+            with open(args.compare, 'r', encoding='utf-8') as f:
+                baseline = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"❌ Could not read baseline {args.compare}: {e}")
+
+    print("=" * 50)
+    print_table(report, baseline)
+    print("=" * 50)
+
+    if baseline is not None:
+        report["baseline_commit"] = baseline.get("commit")
+        report["regressions"] = compare(report, baseline, args.threshold)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"📄 Report written to {args.json}")
+
+    if baseline is not None:
+        if report["regressions"]:
+            for item in report["regressions"]:
+                print(f"❌ {item['operation']} at {item['size']:,} notes: {item['before_ms']} ms -> "
+                      f"{item['after_ms']} ms (x{item['ratio']})")
+            sys.exit(1)
+        print(f"✅ No regressions over x{args.threshold} against {baseline.get('commit') or args.compare}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Smart Notes Chunking - Passage-level splitting and indexing for semantic retrieval
+
+Long notes are split into overlapping passages (paragraph first, then sentence,
+then word windows) under a token budget. Each passage is embedded and indexed
+on its own so retrieval can return just the relevant part of a note.
+numpy and scikit-learn are imported on first build/search, so modules that
+only need estimate_tokens or chunk_note stay cheap to import.
+"""
+
+import hashlib
+import json
+import re
+
+from config import PASSAGE_INDEX_FILE
+
+# Default passage sizing (in estimated tokens)
+PASSAGE_TOKEN_BUDGET = 200
+PASSAGE_OVERLAP_TOKENS = 40
+
+_PARAGRAPH_SPLIT = re.compile(r"\n\s*\n")
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+")
+
+
+def estimate_tokens(text):
+    """Cheap token estimate (~4 characters per token, no tokenizer needed)"""
+    if not text:
+        return 0
+    return (len(text) + 3) // 4
+
+
+def _split_long_unit(unit, max_tokens):
+    """Break a unit that exceeds the budget into sentences, then word windows"""
+    if estimate_tokens(unit) <= max_tokens:
+        return [unit]
+
+    pieces = []
+    for sentence in _SENTENCE_SPLIT.split(unit):
+        sentence = sentence.strip()
+        if not sentence:
+            continue
+        if estimate_tokens(sentence) <= max_tokens:
+            pieces.append(sentence)
+            continue
+        # A single run-on sentence: fall back to fixed word windows
+        window = []
+        for word in sentence.split():
+            if window and estimate_tokens(" ".join(window + [word])) > max_tokens:
+                pieces.append(" ".join(window))
+                window = []
+            window.append(word)
+        if window:
+            pieces.append(" ".join(window))
+    return pieces
+
+
+def split_into_passages(text, max_tokens=PASSAGE_TOKEN_BUDGET, overlap_tokens=PASSAGE_OVERLAP_TOKENS):
+    """Split text into overlapping passages that each fit within max_tokens"""
+    text = (text or "").strip()
+    if not text:
+        return []
+    if estimate_tokens(text) <= max_tokens:
+        return [text]
+
+    units = []
+    for paragraph in _PARAGRAPH_SPLIT.split(text):
+        paragraph = paragraph.strip()
+        if paragraph:
+            units.extend(_split_long_unit(paragraph, max_tokens))
+
+    passages = []
+    current = []
+    current_tokens = 0
+    for unit in units:
+        unit_tokens = estimate_tokens(unit)
+        if current and current_tokens + unit_tokens > max_tokens:
+            passages.append(" ".join(current))
+            # Carry trailing units forward so context spans passage borders
+            carried = []
+            carried_tokens = 0
+            for previous in reversed(current):
+                previous_tokens = estimate_tokens(previous)
+                if carried_tokens + previous_tokens > overlap_tokens:
+                    break
+                carried.insert(0, previous)
+                carried_tokens += previous_tokens
+            if carried_tokens + unit_tokens > max_tokens:
+                carried, carried_tokens = [], 0
+            current, current_tokens = carried, carried_tokens
+        current.append(unit)
+        current_tokens += unit_tokens
+    if current:
+        passages.append(" ".join(current))
+    return passages
+
+
+def chunk_note(note_id, note, max_tokens=PASSAGE_TOKEN_BUDGET, overlap_tokens=PASSAGE_OVERLAP_TOKENS):
+    """Split a note into passage records that remember their parent note"""
+    title = note.get("title", "")
+    tags = " ".join(note.get("tags", []))
+    passages = []
+    for position, text in enumerate(split_into_passages(note.get("content", ""), max_tokens, overlap_tokens)):
+        passages.append({
+            "passage_id": f"{note_id}#{position}",
+            "note_id": note_id,
+            "position": position,
+            "text": text,
+            # Title and tags give every passage enough context to embed well
+            "embed_text": f"{title}\n{text}\n{tags}".strip()
+        })
+    if not passages:
+        passages.append({
+            "passage_id": f"{note_id}#0",
+            "note_id": note_id,
+            "position": 0,
+            "text": "",
+            "embed_text": f"{title}\n{tags}".strip()
+        })
+    return passages
+
+
+class PassageIndex:
+    """Embedding index over note passages with a persistent vector cache"""
+
+    def __init__(self, index_file=PASSAGE_INDEX_FILE, max_tokens=PASSAGE_TOKEN_BUDGET,
+                 overlap_tokens=PASSAGE_OVERLAP_TOKENS):
+        self.index_file = index_file
+        self.max_tokens = max_tokens
+        self.overlap_tokens = overlap_tokens
+        self.passages = []
+        self.matrix = None
+        self._vectors = self._load_vectors()
+
+    def _load_vectors(self):
+        """Load cached passage vectors keyed by a hash of the embedded text"""
+        if self.index_file.exists():
+            try:
+                with open(self.index_file, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            except (json.JSONDecodeError, FileNotFoundError):
+                return {}
+        return {}
+
+    def _save_vectors(self):
+        with open(self.index_file, 'w', encoding='utf-8') as f:
+            json.dump(self._vectors, f)
+
+    @staticmethod
+    def _text_key(text):
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+    def build(self, notes, embed_fn, batch_embed_fn=None, batch_size=100):
+        """Chunk every note and embed passages not already in the vector cache"""
+        all_passages = []
+        missing = {}
+        for note_id, note in notes.items():
+            for passage in chunk_note(note_id, note, self.max_tokens, self.overlap_tokens):
+                key = self._text_key(passage["embed_text"])
+                all_passages.append((key, passage))
+                if key not in self._vectors:
+                    missing[key] = passage["embed_text"]
+
+        # Embed new passages, in batches when the caller supports it
+        missing_items = list(missing.items())
+        for start in range(0, len(missing_items), batch_size):
+            batch = missing_items[start:start + batch_size]
+            vectors = None
+            if batch_embed_fn is not None:
+                try:
+                    vectors = batch_embed_fn([text for _, text in batch])
+                except Exception:
+                    vectors = None  # fall back to one request per passage
+            if vectors is None:
+                vectors = [embed_fn(text) for _, text in batch]
+            for (key, _), vector in zip(batch, vectors):
+                if vector:
+                    self._vectors[key] = vector
+
+        passages = []
+        vectors = []
+        used_keys = set()
+        for key, passage in all_passages:
+            vector = self._vectors.get(key)
+            if vector is None:
+                continue
+            used_keys.add(key)
+            passages.append(passage)
+            vectors.append(vector)
+
+        # Drop vectors for passages that no longer exist
+        stale_keys = set(self._vectors) - used_keys
+        for key in stale_keys:
+            del self._vectors[key]
+        if missing or stale_keys:
+            self._save_vectors()
+
+        import numpy as np
+
+        self.passages = passages
+        self.matrix = np.array(vectors, dtype=float) if vectors else None
+        return len(passages)
+
+    def search(self, query_vector, top_k=5):
+        """Return the top_k passages as (passage, similarity) pairs"""
+        if self.matrix is None or not self.passages:
+            return []
+        from sklearn.metrics.pairwise import cosine_similarity
+
+        scores = cosine_similarity([query_vector], self.matrix)[0]
+        ranked = scores.argsort()[::-1][:top_k]
+        return [(self.passages[i], float(scores[i])) for i in ranked]
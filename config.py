@@ -16,8 +16,74 @@ except ImportError:
 GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')  # 🎪 Gets your circus ticket to the AI show
 
 # 🏠 HOME BASE - Where all your precious thoughts live
-DATA_DIR = Path("my_notes")      # 📂 Creates a cozy folder called "my_notes"
-DATA_DIR.mkdir(exist_ok=True)    # 🏗️ Builds the folder if it doesn't exist yet
+DATA_DIR = Path(os.getenv('SMART_NOTES_DATA_DIR', "my_notes"))   # 📂 A cozy folder called "my_notes" (or your own)
+DATA_DIR.mkdir(parents=True, exist_ok=True)    # 🏗️ Builds the folder if it doesn't exist yet
 
 # 📝 THE MAIN BOOK - Your digital diary location
-NOTES_FILE = DATA_DIR / "notes.json"  # 📖 Points to your main journal file
\ No newline at end of file
+NOTES_FILE = DATA_DIR / "notes.json"  # 📖 Points to your main journal file
+
+# 🧩 THE PASSAGE CARD CATALOG - Cached embeddings for note passages
+PASSAGE_INDEX_FILE = DATA_DIR / "passage_index.json"  # 🗂️ Saves re-embedding unchanged passages
+
+# 🌐 THE AI HOTLINE - Where and how we talk to Gemini
+GEMINI_DEFAULT_BASE_URL = "https://generativelanguage.googleapis.com/v1beta"  # 📞 The real switchboard
+GEMINI_BASE_URL = os.getenv('GEMINI_BASE_URL', GEMINI_DEFAULT_BASE_URL)      # 🔀 Point at mock_gemini.py offline
+GEMINI_MODEL = "gemini-1.5-flash"                # 🧠 The brain that writes answers
+GEMINI_EMBEDDING_MODEL = "text-embedding-004"    # 🧭 The brain that measures meaning
+GEMINI_CONNECT_TIMEOUT = float(os.getenv('GEMINI_CONNECT_TIMEOUT', '5'))   # ⏱️ Seconds to get through
+GEMINI_READ_TIMEOUT = float(os.getenv('GEMINI_READ_TIMEOUT', '60'))        # ⌛ Seconds to wait for an answer
+GEMINI_MAX_RETRIES = int(os.getenv('GEMINI_MAX_RETRIES', '3'))             # 🔁 Redials on 429/5xx
+GEMINI_RATE_LIMIT = float(os.getenv('GEMINI_RATE_LIMIT', '5'))             # 🚦 Calls per second, shared by everyone
+GEMINI_RATE_BURST = int(os.getenv('GEMINI_RATE_BURST', '10'))              # 🪣 Calls allowed in a quick burst
+
+# 🗄️ THE ANSWER FILING CABINET - Remembers AI answers so repeats are instant
+LLM_CACHE_FILE = DATA_DIR / "llm_cache.json"                                # 🗃️ Where answers are filed
+LLM_CACHE_TTL_SECONDS = int(os.getenv('LLM_CACHE_TTL_SECONDS', '604800'))   # 📆 Keep answers for a week
+LLM_CACHE_MAX_ENTRIES = int(os.getenv('LLM_CACHE_MAX_ENTRIES', '256'))      # 📦 Oldest-used answers leave first
+
+# 🧭 THE "DIDN'T YOU JUST ASK THAT?" DRAWER - Reuses answers for reworded questions
+SEMANTIC_CACHE_FILE = DATA_DIR / "semantic_cache.json"                                # 🗂️ Questions and their answers
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv('SEMANTIC_CACHE_THRESHOLD', '0.92'))       # 🎯 How alike two questions must be
+SEMANTIC_CACHE_TTL_SECONDS = int(os.getenv('SEMANTIC_CACHE_TTL_SECONDS', '86400'))    # ⏳ Keep answers for a day
+SEMANTIC_CACHE_MAX_ENTRIES = int(os.getenv('SEMANTIC_CACHE_MAX_ENTRIES', '200'))      # 📦 Oldest-used questions leave first
+
+# 📏 THE PROMPT MEASURING TAPE - How much of your notebook fits in one AI request
+CONTEXT_TOKEN_BUDGET = int(os.getenv('CONTEXT_TOKEN_BUDGET', '24000'))          # 🧳 Total suitcase size
+CONTEXT_NOTE_TOKEN_LIMIT = int(os.getenv('CONTEXT_NOTE_TOKEN_LIMIT', '1000'))   # 👕 Max space per note
+
+# 🗓️ THE WEEKLY DIGEST SHELF - Cached per-window summaries for big notebooks
+WINDOW_SUMMARIES_FILE = DATA_DIR / "window_summaries.json"           # 📚 One summary per week
+ANALYSIS_MAX_WORKERS = int(os.getenv('ANALYSIS_MAX_WORKERS', '4'))   # 👥 Windows summarized at once
+
+# 🧵 THE BACK KITCHEN - AI jobs keep cooking while you browse other pages
+AI_JOB_WORKERS = int(os.getenv('AI_JOB_WORKERS', '4'))                              # 👩‍🍳 Jobs running at once
+AI_JOB_RETENTION_SECONDS = int(os.getenv('AI_JOB_RETENTION_SECONDS', '3600'))       # 🍱 Finished results kept for an hour
+
+# 📆 THE DAILY LEDGER - One pre-added row per day for fast dashboards
+DAILY_ROLLUP_FILE = DATA_DIR / "daily_rollup.json"   # 📒 Past days never change, so keep their totals
+
+# 🔁 THE RE-FILING CREW - Bulk backfill of metadata and auto-tags
+REINDEX_CHECKPOINT_FILE = DATA_DIR / "reindex_checkpoint.json"          # 🔖 Where an interrupted run resumes
+REINDEX_BATCH_SIZE = int(os.getenv('REINDEX_BATCH_SIZE', '50000'))      # 📦 Notes saved per batch
+
+# 🏷️ THE LABEL MAKER'S WORD LIST - Which words earn which auto-tags (edit it, no restart needed)
+TAG_LEXICON_FILE = Path(os.getenv('TAG_LEXICON_FILE', Path(__file__).with_name("tag_lexicon.json")))
+
+# ⏱️ THE KITCHEN STOPWATCH - Opt-in timing of every Streamlit rerun (or add ?profile=1 to the URL)
+PROFILE_RERUNS = os.getenv('PROFILE_RERUNS', '').lower() in ('1', 'true', 'yes')   # 🔛 Start every session with profiling on
+PROFILE_METRICS_FILE = DATA_DIR / "rerun_metrics.jsonl"                             # 🧾 One line per profiled rerun
+PROFILE_HISTORY_SIZE = int(os.getenv('PROFILE_HISTORY_SIZE', '200'))                # 📊 Reruns behind the percentiles
+
+# 🛎️ THE NIGHT PORTER - notes_daemon.py keeps the notebook warm for the CLI
+NOTES_DAEMON_SOCKET = Path(os.getenv('NOTES_DAEMON_SOCKET', DATA_DIR / "notes_daemon.sock"))   # 🔌 Where the CLI knocks
+
+# 🚪 THE SERVICE HATCH - api_server.py lets other tools read and write notes over HTTP
+API_HOST = os.getenv('API_HOST', '127.0.0.1')                                   # 🏠 Local only by default
+API_PORT = int(os.getenv('API_PORT', '8780'))                                   # 🔢 Which hatch to knock on
+API_KEEPALIVE_SECONDS = float(os.getenv('API_KEEPALIVE_SECONDS', '15'))         # ⏳ Idle connections close after this
+API_MAX_BODY_BYTES = int(os.getenv('API_MAX_BODY_BYTES', str(1024 * 1024)))     # 📦 Largest accepted request body
+
+# 🔬 THE FLIGHT RECORDER - Opt-in spans and metrics for store and AI calls (instrumentation.py)
+TRACE_ENABLED = os.getenv('SMART_NOTES_TRACE', '').lower() in ('1', 'true', 'yes')        # 🔛 Record spans and metrics
+TRACE_FILE = Path(os.getenv('SMART_NOTES_TRACE_FILE', DATA_DIR / "traces.jsonl"))         # 🧾 One JSON line per span
+METRICS_FILE = Path(os.getenv('SMART_NOTES_METRICS_FILE', DATA_DIR / "metrics.prom"))     # 📊 Prometheus text snapshot
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Smart Notes Context Builder - Token-budgeted prompt context for AI calls
+
+Notes are streamed in a chosen order (recency, relevance, type priority or
+chronological) into a list-joined buffer until the token budget is spent.
+Each note's content is truncated to a per-note limit, and the result reports
+exactly which notes made it into the prompt so `sources_used` can be checked.
+"""
+
+from chunking import estimate_tokens
+from config import CONTEXT_TOKEN_BUDGET, CONTEXT_NOTE_TOKEN_LIMIT
+
+# Lower number = included first when ordering by type
+TYPE_PRIORITY = {
+    "principle": 0,
+    "goal": 1,
+    "journal": 2,
+    "reflection": 3,
+    "learning": 4,
+    "general": 5
+}
+
+# Below this many spare tokens a note is omitted rather than squeezed in
+MIN_USEFUL_NOTE_TOKENS = 32
+
+
+def truncate_to_tokens(text, max_tokens):
+    """Cut text to roughly max_tokens, preferring a word boundary; returns (text, truncated)"""
+    if estimate_tokens(text) <= max_tokens:
+        return text, False
+    cut = text[:max(0, max_tokens * 4 - 3)]
+    space = cut.rfind(" ")
+    if space > len(cut) // 2:
+        cut = cut[:space]
+    return cut + "...", True
+
+
+def iter_notes(notes, order="recency", relevance=None):
+    """Yield (note_id, note) pairs in the requested order"""
+    items = notes.items()
+    if order == "recency":
+        return iter(sorted(items, key=lambda item: item[1].get("created", ""), reverse=True))
+    if order == "chronological":
+        return iter(sorted(items, key=lambda item: item[1].get("created", "")))
+    if order == "relevance":
+        relevance = relevance or {}
+        return iter(sorted(items, key=lambda item: relevance.get(item[0], 0.0), reverse=True))
+    if order == "type":
+        return iter(sorted(
+            sorted(items, key=lambda item: item[1].get("created", ""), reverse=True),
+            key=lambda item: TYPE_PRIORITY.get(item[1].get("type", "general"), len(TYPE_PRIORITY))
+        ))
+    raise ValueError(f"Unknown context order: {order}")
+
+
+class ContextResult:
+    """The built context text plus which notes were included, truncated or left out"""
+
+    def __init__(self, text, included_ids, truncated_ids, omitted_ids, token_estimate):
+        self.text = text
+        self.included_ids = included_ids
+        self.truncated_ids = truncated_ids
+        self.omitted_ids = omitted_ids
+        self.token_estimate = token_estimate
+
+    def filter_sources(self, sources):
+        """Keep only source ids that were actually present in the context"""
+        included = set(self.included_ids)
+        return [source for source in sources if source in included]
+
+
+class ContextBuilder:
+    """Accumulates note blocks under a token budget"""
+
+    def __init__(self, header="", token_budget=CONTEXT_TOKEN_BUDGET,
+                 per_note_tokens=CONTEXT_NOTE_TOKEN_LIMIT):
+        self.header = header
+        self.token_budget = token_budget
+        self.per_note_tokens = per_note_tokens
+        self._blocks = []
+        self._used = estimate_tokens(header)
+        self._included = []
+        self._included_set = set()
+        self._truncated = []
+        self._omitted = []
+
+    @property
+    def full(self):
+        return self._used + MIN_USEFUL_NOTE_TOKENS > self.token_budget
+
+    def add(self, note_id, prefix, content, suffix=""):
+        """Add one block (prefix + truncated content + suffix); returns False if it did not fit"""
+        fixed_tokens = estimate_tokens(prefix) + estimate_tokens(suffix)
+        remaining = self.token_budget - self._used - fixed_tokens
+        if remaining < MIN_USEFUL_NOTE_TOKENS:
+            self._omitted.append(note_id)
+            return False
+
+        content, truncated = truncate_to_tokens(content, min(self.per_note_tokens, remaining))
+        block = f"{prefix}{content}{suffix}"
+        self._blocks.append(block)
+        self._used += fixed_tokens + estimate_tokens(content)
+
+        if note_id not in self._included_set:
+            self._included_set.add(note_id)
+            self._included.append(note_id)
+        if truncated:
+            self._truncated.append(note_id)
+        return True
+
+    def extend(self, entries):
+        """Stream (note_id, prefix, content, suffix) entries until the budget runs out"""
+        for note_id, prefix, content, suffix in entries:
+            if self.full:
+                self._omitted.append(note_id)
+                continue
+            self.add(note_id, prefix, content, suffix)
+        return self
+
+    def build(self, reverse=False):
+        """Join the accepted blocks (optionally in reverse add order) into a ContextResult"""
+        blocks = self._blocks[::-1] if reverse else self._blocks
+        parts = [self.header]
+        parts.extend(blocks)
+        omitted = [note_id for note_id in self._omitted if note_id not in self._included_set]
+        if omitted:
+            parts.append(f"({len(omitted)} more entries omitted to fit the context budget)\n")
+        return ContextResult("".join(parts), self._included, self._truncated, omitted, self._used)
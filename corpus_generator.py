@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Smart Notes Corpus Generator - Deterministic synthetic notebooks from 1k to 1M notes
+
+Produces a notes.json that looks like years of real use. Content lengths are
+long-tailed (log-normal per note type). Moods and energy drift with the topic
+and the time of day. Entries cluster in the mornings and evenings, tags mix
+topic tags with a long tail of personal ones, and the oldest notes use the
+legacy schema written by the basic CLI (no type or metadata). The same seed
+and size always give byte-identical output. Notes are streamed to disk one at
+a time, so a million-note corpus needs little memory. --end shifts the whole
+history to end on another date without changing anything else.
+
+    python corpus_generator.py --notes 100000 --out /tmp/corpus_100k
+    SMART_NOTES_DATA_DIR=/tmp/corpus_100k python notes_enhanced.py list --limit 5
+"""
+
+import argparse
+import json
+import math
+import random
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+DEFAULT_SEED = 42
+DEFAULT_END = datetime(2025, 9, 1)
+DEFAULT_DAYS = 3 * 365
+DEFAULT_LEGACY_RATIO = 0.03
+
+# note type -> (share of notes, median words, whether mood/energy are usually recorded)
+NOTE_TYPES = {
+    "journal": (0.55, 80, True),
+    "reflection": (0.15, 120, True),
+    "goal": (0.10, 50, False),
+    "principle": (0.08, 60, False),
+    "general": (0.12, 40, False)
+}
+WORD_SIGMA = 0.8
+MAX_WORDS = 3000
+
+# topic -> (mood shift, title stems, sentences, tags)
+TOPICS = {
+    "work": (-0.5, ["Work Project", "Team Meeting", "Deadline Week", "Sprint Review"], [
+        "The project deadline moved up again and the team is scrambling.",
+        "Had a long meeting about the roadmap and left with more questions than answers.",
+        "Finally shipped the feature I have been working on for weeks.",
+        "My manager gave useful feedback on how I present my work.",
+        "Spent most of the afternoon untangling a bug nobody else wanted to touch.",
+        "I need to communicate better with the team about realistic timelines."
+    ], ["work", "meetings", "project", "career"]),
+    "stress": (-2.0, ["Feeling Overwhelmed", "Rough Day", "Too Much at Once"], [
+        "Feeling overwhelmed by everything on my plate right now.",
+        "I was frustrated and snapped at someone who did not deserve it.",
+        "Could not sleep well, my mind kept racing about tomorrow.",
+        "Everything felt difficult today, even the small things.",
+        "I noticed the stress building in my shoulders again."
+    ], ["stress", "anxiety", "health"]),
+    "gratitude": (1.5, ["Grateful Today", "Small Joys", "Thank You Note"], [
+        "I am grateful for a quiet morning and a good cup of coffee.",
+        "Really appreciate how my friends showed up for me this week.",
+        "Thankful for the walk in the park and the sun finally coming out.",
+        "Counting three good things from today made the evening lighter."
+    ], ["gratitude", "joy"]),
+    "relationships": (0.5, ["Family Dinner", "Catching Up", "Hard Conversation"], [
+        "Called my parents and we talked for over an hour.",
+        "Dinner with friends reminded me how much I missed them.",
+        "My partner and I finally talked through the thing we kept avoiding.",
+        "Helped a friend move and it turned into a great afternoon."
+    ], ["family", "friends", "relationships"]),
+    "learning": (1.0, ["Learning Log", "Book Notes", "Course Progress"], [
+        "Today I learned about list comprehensions and they finally clicked.",
+        "Reading a book on habits and taking notes on every chapter.",
+        "The online course is harder than expected but rewarding.",
+        "Studied for two hours and practiced the exercises twice."
+    ], ["learning", "python", "books", "programming"]),
+    "goals": (0.5, ["Goal Check-in", "Planning Ahead", "Quarterly Plan"], [
+        "I want to build a steady morning routine over the next month.",
+        "Planning the next quarter with three concrete goals.",
+        "Broke the big goal into smaller steps I can finish each week.",
+        "Reviewed last month's plan and most of it is on track."
+    ], ["goals", "planning", "habits"]),
+    "health": (0.8, ["Morning Run", "Sleep Notes", "Gym Session"], [
+        "Went for a run before work and felt energized all morning.",
+        "Slept eight hours for the first time in weeks.",
+        "Meditated for twenty minutes and the day started with clarity.",
+        "Skipped the gym again, need to be kinder to myself about it."
+    ], ["health", "exercise", "sleep", "meditation"])
+}
+TOPIC_NAMES = list(TOPICS)
+TOPIC_WEIGHTS = [0.24, 0.12, 0.12, 0.14, 0.14, 0.12, 0.12]
+PERSONAL_TAGS = ["cooking", "travel", "music", "running", "garden", "photography", "climbing", "chess",
+                 "podcasts", "coffee", "weekend", "side-project", "finance", "writing", "art", "movies",
+                 "volunteering", "dog", "cycling", "yoga", "home", "spanish", "guitar", "baking"]
+FILLER = ["Not sure what to make of it yet.", "More on this tomorrow.", "Writing it down helps.",
+          "Overall a mixed day.", "Trying to notice patterns here.", "It is a start."]
+
+
+def _note_id(index):
+    # Multiplicative hash: unique for every 32-bit index, but looks like the app's random hex ids
+    return f"note_{(index * 2654435761) % (1 << 32):08x}"
+
+
+def _clip(value, low, high):
+    return max(low, min(high, value))
+
+
+def _timestamps(rng, count, end, days):
+    """count sorted timestamps over `days` days before `end`, clustered in mornings and evenings"""
+    start = end - timedelta(days=days)
+    stamps = []
+    for _ in range(count):
+        day = rng.randrange(days)
+        roll = rng.random()
+        if roll < 0.45:
+            hour = rng.randint(6, 10)
+        elif roll < 0.80:
+            hour = rng.randint(19, 23)
+        else:
+            hour = rng.randint(11, 18)
+        stamps.append(day * 86400 + hour * 3600 + rng.random() * 3600)
+    stamps.sort()
+    return (start + timedelta(seconds=offset) for offset in stamps)
+
+
+def _content(rng, topic, words_wanted):
+    sentences = TOPICS[topic][2]
+    parts = []
+    words = 0
+    while words < words_wanted:
+        # Mostly the main topic, sometimes a detour into another one
+        pool = sentences if rng.random() < 0.75 else TOPICS[rng.choice(TOPIC_NAMES)][2]
+        sentence = rng.choice(pool) if rng.random() < 0.9 else rng.choice(FILLER)
+        parts.append(sentence)
+        words += len(sentence.split())
+        if rng.random() < 0.08:
+            parts.append("\n\n")
+    return " ".join(parts).replace(" \n\n ", "\n\n").strip()
+
+
+def generate_notes(count, seed=DEFAULT_SEED, end=DEFAULT_END, days=DEFAULT_DAYS,
+                   legacy_ratio=DEFAULT_LEGACY_RATIO):
+    """Yield (note_id, note) pairs in creation order"""
+    rng = random.Random(seed)
+    type_names = list(NOTE_TYPES)
+    type_weights = [NOTE_TYPES[name][0] for name in type_names]
+    legacy_count = int(count * legacy_ratio)
+
+    for index, created_at in enumerate(_timestamps(rng, count, end, days)):
+        topic = rng.choices(TOPIC_NAMES, TOPIC_WEIGHTS)[0]
+        note_type = rng.choices(type_names, type_weights)[0]
+        _, median_words, tracks_mood = NOTE_TYPES[note_type]
+        words = int(_clip(rng.lognormvariate(math.log(median_words), WORD_SIGMA), 3, MAX_WORDS))
+        mood_shift, stems, _, topic_tags = TOPICS[topic]
+
+        created = created_at.isoformat(timespec="microseconds")
+        title = rng.choice(stems)
+        if rng.random() < 0.3:
+            title = f"{title} - {created_at.strftime('%b %d')}"
+        content = _content(rng, topic, words)
+        tags = rng.sample(topic_tags, rng.randint(0, min(2, len(topic_tags))))
+        if rng.random() < 0.25:
+            tags.append(rng.choice(PERSONAL_TAGS))
+
+        if index < legacy_count:
+            # The basic CLI's schema: sequential ids, no type and no metadata
+            yield f"note_{index + 1}", {"title": title, "content": content, "created": created,
+                                        "updated": created, "tags": tags}
+            continue
+
+        mood = energy = None
+        if rng.random() < (0.85 if tracks_mood else 0.35):
+            morning_lift = 0.5 if created_at.hour < 11 else -0.3 if created_at.hour >= 21 else 0.0
+            mood = int(round(_clip(rng.gauss(6.2 + mood_shift + morning_lift, 1.6), 1, 10)))
+            energy = int(round(_clip(rng.gauss(mood + (0.8 if created_at.hour < 11 else -0.8), 1.5), 1, 10)))
+        updated = created
+        if rng.random() < 0.1:
+            updated = (created_at + timedelta(hours=rng.randint(1, 24 * 30))).isoformat(timespec="microseconds")
+        yield _note_id(index), {
+            "title": title,
+            "content": content,
+            "created": created,
+            "updated": updated,
+            "tags": tags,
+            "type": note_type,
+            "metadata": {
+                "mood": mood,
+                "energy_level": energy,
+                "word_count": len(content.split()),
+                "created_date_only": created[:10],
+                "created_hour": created_at.hour
+            }
+        }
+
+
+def write_corpus(notes_file, count, seed=DEFAULT_SEED, **options):
+    """Stream a generated notebook to notes_file as one JSON object; returns the note count"""
+    notes_file = Path(notes_file)
+    notes_file.parent.mkdir(parents=True, exist_ok=True)
+    written = 0
+    with open(notes_file, 'w', encoding='utf-8') as f:
+        f.write("{")
+        for note_id, note in generate_notes(count, seed, **options):
+            f.write(",\n" if written else "\n")
+            f.write(f"{json.dumps(note_id)}: {json.dumps(note, ensure_ascii=False)}")
+            written += 1
+        f.write("\n}\n")
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a deterministic synthetic Smart Notes corpus")
+    parser.add_argument('--notes', type=int, default=10000, help='Number of notes (1k to 1M is the tested range)')
+    parser.add_argument('--out', type=str, required=True, help='Directory to write notes.json into')
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    parser.add_argument('--days', type=int, default=DEFAULT_DAYS, help='How many days of history to spread notes over')
+    parser.add_argument('--end', type=str, default=DEFAULT_END.date().isoformat(),
+                        help='Date the history ends on (YYYY-MM-DD)')
+    parser.add_argument('--legacy-ratio', type=float, default=DEFAULT_LEGACY_RATIO,
+                        help='Share of (oldest) notes in the legacy schema')
+    args = parser.parse_args()
+    try:
+        end = datetime.fromisoformat(args.end)
+    except ValueError:
+        print(f"❌ Invalid --end date: {args.end}")
+        return
+
+    started = time.perf_counter()
+    notes_file = Path(args.out) / "notes.json"
+    count = write_corpus(notes_file, max(0, args.notes), args.seed, end=end, days=max(1, args.days),
+                         legacy_ratio=_clip(args.legacy_ratio, 0.0, 1.0))
+    size_mb = notes_file.stat().st_size / 1_000_000
+    print(f"✨ Wrote {count:,} notes ({size_mb:.1f} MB) to {notes_file} in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Smart Notes Daily Rollup - One persisted row of totals per day
+
+Each row (keyed by metadata.created_date_only) holds entries per type, word
+count, mood and energy sum/count/min/max, morning and evening mood, and tag
+counts. Rows are adjusted on every add, update and delete and can be rebuilt
+in bulk. Past days never change, so dashboards and range queries read a
+handful of rows instead of every note. The file remembers the notebook version
+it was built from and is rebuilt if the notes were changed elsewhere.
+"""
+
+import bisect
+import copy
+import json
+import os
+import threading
+from datetime import date, timedelta
+
+from aggregates import metric_value, word_count
+from config import DAILY_ROLLUP_FILE
+
+ROLLUP_VERSION = 1
+
+
+def note_day(note):
+    """The YYYY-MM-DD a note belongs to"""
+    return note.get("metadata", {}).get("created_date_only") or note.get("created", "")[:10]
+
+
+def _empty_metric():
+    return {"sum": 0, "count": 0, "min": None, "max": None, "values": {}}
+
+
+def _empty_row():
+    return {
+        "entries": 0,
+        "types": {},
+        "words": 0,
+        "mood": _empty_metric(),
+        "energy": _empty_metric(),
+        "morning_mood": {"sum": 0, "count": 0},
+        "evening_mood": {"sum": 0, "count": 0},
+        "tags": {}
+    }
+
+
+def _bump(counts, key, sign):
+    counts[key] = counts.get(key, 0) + sign
+    if counts[key] <= 0:
+        del counts[key]
+
+
+def _apply_metric(metric, value, sign):
+    # Values are kept as a small multiset (JSON keys are strings) so min/max survive deletes
+    metric["sum"] += sign * value
+    metric["count"] += sign
+    _bump(metric["values"], json.dumps(value), sign)
+    values = [json.loads(key) for key in metric["values"]]
+    metric["min"] = min(values) if values else None
+    metric["max"] = max(values) if values else None
+
+
+class DailyRollup:
+    """Persisted {YYYY-MM-DD: row} table with sorted-day range queries"""
+
+    def __init__(self, rollup_file=DAILY_ROLLUP_FILE):
+        self.rollup_file = rollup_file
+        self._lock = threading.Lock()
+        self.rows = {}
+        self.notes_version = None
+        self._days = []
+        self._owned_days = None  # on a copy: days whose rows are private (the rest are shared until written)
+        self._load()
+
+    def _load(self):
+        if not self.rollup_file.exists():
+            return
+        try:
+            with open(self.rollup_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (json.JSONDecodeError, FileNotFoundError):
+            return
+        if data.get("version") != ROLLUP_VERSION:
+            return
+        self.rows = data.get("rows", {})
+        self.notes_version = data.get("notes_version")
+        self._days = sorted(self.rows)
+
+    def save(self, notes_version):
+        """Persist the rows, stamped with the notebook version they describe"""
+        with self._lock:
+            self.notes_version = notes_version
+            data = {"version": ROLLUP_VERSION, "notes_version": notes_version, "rows": self.rows}
+            tmp_file = self.rollup_file.with_suffix(".tmp")
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_file, self.rollup_file)
+
+    def copy(self):
+        """Copy for a copy-on-write snapshot: rows are shared until the copy first writes to them"""
+        with self._lock:
+            clone = copy.copy(self)
+            clone._lock = threading.Lock()
+            clone.rows = dict(self.rows)
+            clone._days = list(self._days)
+            clone._owned_days = set()
+        return clone
+
+    def _apply(self, note, sign):
+        day = note_day(note)
+        if not day:
+            return
+        row = self.rows.get(day)
+        if row is not None and self._owned_days is not None and day not in self._owned_days:
+            row = self.rows[day] = copy.deepcopy(row)  # leave the original row to the snapshot we came from
+            self._owned_days.add(day)
+        if row is None:
+            row = self.rows[day] = _empty_row()
+            bisect.insort(self._days, day)
+            if self._owned_days is not None:
+                self._owned_days.add(day)
+
+        metadata = note.get("metadata", {})
+        row["entries"] += sign
+        _bump(row["types"], note.get("type", "general"), sign)
+        row["words"] += sign * word_count(note)
+        for tag in note.get("tags", []):
+            _bump(row["tags"], tag, sign)
+
+        mood = metric_value(note, "mood")
+        if mood is not None:
+            _apply_metric(row["mood"], mood, sign)
+            hour = metadata.get("created_hour", 12)
+            part = "morning_mood" if hour < 12 else "evening_mood" if hour >= 18 else None
+            if part:
+                row[part]["sum"] += sign * mood
+                row[part]["count"] += sign
+        energy = metric_value(note, "energy_level")
+        if energy is not None:
+            _apply_metric(row["energy"], energy, sign)
+
+        if row["entries"] <= 0:
+            del self.rows[day]
+            self._days.remove(day)
+
+    def add(self, note):
+        with self._lock:
+            self._apply(note, 1)
+
+    def remove(self, note):
+        with self._lock:
+            self._apply(note, -1)
+
+    def replace(self, old_note, new_note):
+        with self._lock:
+            self._apply(old_note, -1)
+            self._apply(new_note, 1)
+
+    def rebuild(self, notes):
+        """Recompute every row from scratch (bulk imports, or notes changed outside this app)"""
+        with self._lock:
+            self.rows = {}
+            self._days = []
+            self._owned_days = None
+            for note in notes.values():
+                self._apply(note, 1)
+
+    def range(self, start, end=None):
+        """[(day, row)] for start <= day <= end (dates or YYYY-MM-DD), reading only those rows"""
+        start, end = str(start), str(end or date.today())
+        with self._lock:
+            low = bisect.bisect_left(self._days, start)
+            high = bisect.bisect_right(self._days, end)
+            return [(day, self.rows[day]) for day in self._days[low:high]]
+
+    def last_days(self, days_back, today=None):
+        """Rows for the last `days_back` days including today (at most days_back rows)"""
+        today = today or date.today()
+        return self.range(today - timedelta(days=days_back - 1), today)
+
+
+def combine(rows):
+    """Fold rows into one: totals plus mood/energy average, min and max"""
+    total = _empty_row()
+    for _, row in rows:
+        total["entries"] += row["entries"]
+        total["words"] += row["words"]
+        for key, count in row["types"].items():
+            _bump(total["types"], key, count)
+        for key, count in row["tags"].items():
+            _bump(total["tags"], key, count)
+        for metric in ("mood", "energy"):
+            for key, count in row[metric]["values"].items():
+                _apply_metric_bulk(total[metric], key, count)
+        for part in ("morning_mood", "evening_mood"):
+            total[part]["sum"] += row[part]["sum"]
+            total[part]["count"] += row[part]["count"]
+    for metric in ("mood", "energy", "morning_mood", "evening_mood"):
+        count = total[metric]["count"]
+        total[metric]["average"] = total[metric]["sum"] / count if count else None
+    return total
+
+
+def _apply_metric_bulk(metric, key, count):
+    value = json.loads(key)
+    metric["sum"] += value * count
+    metric["count"] += count
+    _bump(metric["values"], key, count)
+    metric["min"] = value if metric["min"] is None else min(metric["min"], value)
+    metric["max"] = value if metric["max"] is None else max(metric["max"], value)
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Smart Notes Gemini Client - One shared, pooled HTTP client for every Gemini call
+
+All generateContent, streamGenerateContent, embedContent and batchEmbedContents
+requests go through a single
+requests.Session (keep-alive connection pool) with connect/read timeouts,
+exponential backoff on 429/5xx and a token-bucket rate limiter that is shared
+by every caller in the process, including all Streamlit sessions.
+requests itself is imported when the first client is built, not at import
+time, so commands that never talk to Gemini don't pay for it.
+"""
+
+import json
+import random
+import threading
+import time
+
+from config import (
+    GEMINI_API_KEY, GEMINI_BASE_URL, GEMINI_MODEL, GEMINI_EMBEDDING_MODEL,
+    GEMINI_CONNECT_TIMEOUT, GEMINI_READ_TIMEOUT, GEMINI_MAX_RETRIES,
+    GEMINI_RATE_LIMIT, GEMINI_RATE_BURST
+)
+from instrumentation import span
+
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+BACKOFF_BASE_SECONDS = 0.5
+BACKOFF_MAX_SECONDS = 20.0
+
+
+class GeminiError(Exception):
+    """Raised when a Gemini call fails; status_code is None for network errors"""
+
+    def __init__(self, message, status_code=None, response_text=None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.response_text = response_text
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, bursts up to `capacity`"""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens=1):
+        """Block until `tokens` are available, then take them"""
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class GeminiClient:
+    """Pooled Gemini REST client with timeouts, retries and rate limiting"""
+
+    def __init__(self, api_key=None, base_url=GEMINI_BASE_URL, model=GEMINI_MODEL,
+                 embedding_model=GEMINI_EMBEDDING_MODEL,
+                 timeout=(GEMINI_CONNECT_TIMEOUT, GEMINI_READ_TIMEOUT),
+                 max_retries=GEMINI_MAX_RETRIES, rate_limiter=None, pool_size=16):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip('/')
+        self.model = model
+        self.embedding_model = embedding_model
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.rate_limiter = rate_limiter
+
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({"Content-Type": "application/json"})
+
+    def _backoff(self, attempt, response=None):
+        """Sleep before the next attempt, honouring Retry-After when present"""
+        delay = None
+        if response is not None:
+            retry_after = response.headers.get("Retry-After")
+            if retry_after:
+                try:
+                    delay = float(retry_after)
+                except ValueError:
+                    delay = None
+        if delay is None:
+            delay = BACKOFF_BASE_SECONDS * (2 ** attempt)
+            delay += random.uniform(0, delay / 2)  # jitter so callers don't retry in lockstep
+        time.sleep(min(delay, BACKOFF_MAX_SECONDS))
+
+    def post(self, model, method, payload, api_key=None, stream=False, query=None):
+        """POST to models/{model}:{method}, retrying transient failures"""
+        import requests
+
+        url = f"{self.base_url}/models/{model}:{method}"
+        params = {"key": api_key or self.api_key or GEMINI_API_KEY}
+        if query:
+            params.update(query)
+
+        with span(f"gemini.{method}", model=model) as sp:
+            for attempt in range(self.max_retries + 1):
+                if self.rate_limiter is not None:
+                    self.rate_limiter.acquire()
+                try:
+                    response = self.session.post(url, params=params, json=payload,
+                                                 timeout=self.timeout, stream=stream)
+                except (requests.ConnectionError, requests.Timeout) as e:
+                    if attempt < self.max_retries:
+                        self._backoff(attempt)
+                        continue
+                    sp.set(attempts=attempt + 1)
+                    raise GeminiError(f"Network error: {e}") from e
+                except requests.RequestException as e:
+                    raise GeminiError(f"Network error: {e}") from e
+
+                if response.status_code in RETRY_STATUS_CODES and attempt < self.max_retries:
+                    response.close()
+                    self._backoff(attempt, response)
+                    continue
+                sp.set(attempts=attempt + 1, status_code=response.status_code)
+                if response.status_code != 200:
+                    raise GeminiError(f"API Error: {response.status_code}",
+                                      response.status_code, response.text)
+                if sp.enabled:
+                    # A streamed body is counted by the reader as it arrives
+                    sp.add_bytes(read=0 if stream else len(response.content),
+                                 written=len(response.request.body or b""))
+                return response
+
+    def generate_content(self, prompt, api_key=None, model=None):
+        """Send a single-turn prompt and return the first candidate's text"""
+        payload = {
+            "contents": [{
+                "parts": [{
+                    "text": prompt
+                }]
+            }]
+        }
+        result = self.post(model or self.model, "generateContent", payload, api_key).json()
+        if 'candidates' in result and len(result['candidates']) > 0:
+            return result['candidates'][0]['content']['parts'][0]['text']
+        raise GeminiError("No response from AI")
+
+    def stream_generate_content(self, prompt, api_key=None, model=None):
+        """Yield text chunks from streamGenerateContent (server-sent events) as they arrive"""
+        payload = {
+            "contents": [{
+                "parts": [{
+                    "text": prompt
+                }]
+            }]
+        }
+        import requests
+
+        response = self.post(model or self.model, "streamGenerateContent", payload, api_key,
+                             stream=True, query={"alt": "sse"})
+        with span("gemini.streamGenerateContent.read", model=model or self.model) as sp:
+            try:
+                for line in response.iter_lines(decode_unicode=True):
+                    if sp.enabled:
+                        sp.add_bytes(read=len(line.encode('utf-8')) + 1)
+                    # SSE frames look like "data: {...}"; blank lines separate events
+                    if not line or not line.startswith("data:"):
+                        continue
+                    data = line[5:].strip()
+                    if not data or data == "[DONE]":
+                        continue
+                    try:
+                        chunk = json.loads(data)
+                    except ValueError as e:
+                        raise GeminiError(f"Malformed stream event: {data[:80]}") from e
+                    for candidate in chunk.get("candidates", [])[:1]:
+                        for part in candidate.get("content", {}).get("parts", []):
+                            if part.get("text"):
+                                yield part["text"]
+            except requests.RequestException as e:
+                # Includes ChunkedEncodingError when the connection drops mid-stream
+                raise GeminiError(f"Network error: {e}") from e
+            finally:
+                response.close()
+
+    def embed_content(self, text, api_key=None, model=None):
+        """Return the embedding vector for text"""
+        model = model or self.embedding_model
+        payload = {
+            "model": f"models/{model}",
+            "content": {
+                "parts": [{"text": text}]
+            }
+        }
+        return self.post(model, "embedContent", payload, api_key).json()['embedding']['values']
+
+    def batch_embed_contents(self, texts, api_key=None, model=None):
+        """Return embedding vectors for many texts in one request"""
+        model = model or self.embedding_model
+        payload = {
+            "requests": [{
+                "model": f"models/{model}",
+                "content": {
+                    "parts": [{"text": text}]
+                }
+            } for text in texts]
+        }
+        result = self.post(model, "batchEmbedContents", payload, api_key).json()
+        return [embedding['values'] for embedding in result['embeddings']]
+
+
+# One client and one rate limiter per process, shared by CLI and every Streamlit session
+_shared_rate_limiter = TokenBucket(GEMINI_RATE_LIMIT, GEMINI_RATE_BURST)
+_shared_client = None
+_shared_client_lock = threading.Lock()
+
+
+def get_client():
+    """Return the process-wide GeminiClient, creating it on first use"""
+    global _shared_client
+    if _shared_client is None:
+        with _shared_client_lock:
+            if _shared_client is None:
+                _shared_client = GeminiClient(rate_limiter=_shared_rate_limiter)
+    return _shared_client
+
+
+def set_client(client):
+    """Replace the process-wide client (e.g. one pointed at mock_gemini.py in benchmarks)"""
+    global _shared_client
+    with _shared_client_lock:
+        _shared_client = client
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Smart Notes Hierarchical Analysis - Incremental map-reduce pattern analysis
+
+Map: notes are grouped into time windows (weekly by default) and each window
+is summarized into the usual analysis schema (emotional_patterns,
+behavioral_patterns, recommendations, summary). Window summaries are cached
+with a fingerprint of their notes, so only windows containing changed notes
+are sent to the model again, and independent windows run concurrently.
+
+Reduce: a final call merges the window summaries into one report.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+
+from config import ANALYSIS_MAX_WORKERS, CONTEXT_TOKEN_BUDGET, WINDOW_SUMMARIES_FILE
+from context_builder import ContextBuilder
+from gemini_client import get_client
+from llm_cache import cached_generate_content, notebook_version
+
+# Bump when either prompt changes so cached summaries are recomputed
+WINDOW_PROMPT_VERSION = "window-v1"
+REDUCE_PROMPT_VERSION = "reduce-v1"
+
+ANALYSIS_SCHEMA = """{
+  "emotional_patterns": {
+    "dominant_emotions": ["emotion1", "emotion2"],
+    "trends": "description of emotional trends"
+  },
+  "behavioral_patterns": {
+    "recurring_themes": ["theme1", "theme2"],
+    "growth_indicators": ["indicator1", "indicator2"]
+  },
+  "recommendations": {
+    "immediate_actions": ["action1", "action2"],
+    "reflection_questions": ["question1", "question2"]
+  },
+  "summary": "2-3 sentence summary"
+}"""
+
+
+def window_for(created, window="week"):
+    """Map an ISO timestamp to its window label (e.g. 2025-W35)"""
+    moment = datetime.fromisoformat(created)
+    if window == "day":
+        return moment.strftime("%Y-%m-%d")
+    if window == "month":
+        return moment.strftime("%Y-%m")
+    year, week, _ = moment.isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+def group_by_window(notes, window="week"):
+    """Group notes into {window_label: [(note_id, note), ...]} in date order"""
+    windows = {}
+    for note_id, note in sorted(notes.items(), key=lambda item: item[1].get("created", "")):
+        windows.setdefault(window_for(note["created"], window), []).append((note_id, note))
+    return windows
+
+
+def window_fingerprint(window_notes):
+    """Hash of everything in a window; changes when any of its notes change"""
+    material = json.dumps([WINDOW_PROMPT_VERSION, window_notes], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+
+def parse_json_response(text):
+    """Parse a model reply as JSON, tolerating ```json fences"""
+    cleaned = text.strip()
+    if cleaned.startswith("```"):
+        cleaned = cleaned.split("\n", 1)[1] if "\n" in cleaned else ""
+        cleaned = cleaned.rsplit("```", 1)[0]
+    return json.loads(cleaned)
+
+
+class WindowSummaryStore:
+    """Persistent {window: {fingerprint, note_count, summary}} cache"""
+
+    def __init__(self, store_file=WINDOW_SUMMARIES_FILE):
+        self.store_file = store_file
+        self._lock = threading.Lock()
+        self.windows = self._load()
+
+    def _load(self):
+        if self.store_file.exists():
+            try:
+                with open(self.store_file, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            except (json.JSONDecodeError, FileNotFoundError):
+                return {}
+        return {}
+
+    def save(self):
+        with self._lock:
+            tmp_file = self.store_file.with_suffix(".tmp")
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(self.windows, f, indent=2, ensure_ascii=False)
+            os.replace(tmp_file, self.store_file)
+
+    def get(self, window, fingerprint):
+        entry = self.windows.get(window)
+        if entry and entry.get("fingerprint") == fingerprint:
+            return entry["summary"]
+        return None
+
+    def put(self, window, fingerprint, note_count, summary):
+        with self._lock:
+            self.windows[window] = {
+                "fingerprint": fingerprint,
+                "note_count": note_count,
+                "summary": summary
+            }
+
+    def prune(self, live_windows):
+        """Forget windows that no longer contain any notes"""
+        with self._lock:
+            for window in set(self.windows) - set(live_windows):
+                del self.windows[window]
+
+
+class HierarchicalAnalyzer:
+    """Map-reduce analysis over time windows with cached window summaries"""
+
+    def __init__(self, notes_app, client=None, store=None, window="week",
+                 max_workers=ANALYSIS_MAX_WORKERS, token_budget=CONTEXT_TOKEN_BUDGET):
+        self.notes_app = notes_app
+        self.client = client or get_client()
+        self.store = store or WindowSummaryStore()
+        self.window = window
+        self.max_workers = max_workers
+        self.token_budget = token_budget
+
+    def _window_prompt(self, window, window_notes):
+        builder = ContextBuilder(
+            header=f"Notes from {window} ({len(window_notes)} entries)\n\n",
+            token_budget=self.token_budget,
+            per_note_tokens=250
+        )
+        builder.extend(self.notes_app._analysis_entries(reversed(window_notes)))
+        context = builder.build(reverse=True)
+        return f"""You are a personal development coach. Summarize the personal notes from {window} in JSON format:
+
+{ANALYSIS_SCHEMA}
+
+Notes data:
+{context.text}
+
+Respond ONLY with valid JSON, no other text."""
+
+    def summarize_window(self, window, window_notes, api_key=None):
+        """Map step: one window of notes -> one summary in the analysis schema"""
+        answer = self.client.generate_content(self._window_prompt(window, window_notes), api_key=api_key)
+        try:
+            return parse_json_response(answer)
+        except ValueError:
+            return {"summary": answer.strip()}
+
+    def _reduce_prompt(self, summaries):
+        builder = ContextBuilder(
+            header=f"Window summaries ({len(summaries)} windows, oldest first)\n\n",
+            token_budget=self.token_budget,
+            per_note_tokens=400
+        )
+        # Newest windows win if the budget runs out
+        entries = ((window, f"Window {window}:\n", json.dumps(summary, ensure_ascii=False), "\n\n")
+                   for window, summary in reversed(summaries))
+        context = builder.extend(entries).build(reverse=True)
+        return f"""You are a personal development coach. These are summaries of someone's personal notes, one per time window. Combine them into one overall report in JSON format:
+
+{ANALYSIS_SCHEMA}
+
+Look for how emotions and themes change across windows.
+
+Window summaries:
+{context.text}
+
+Provide actionable insights for personal growth. Respond ONLY with valid JSON, no other text."""
+
+    def analyze(self, api_key=None, progress=None):
+        """Run map (changed windows only, concurrently) then reduce; returns the report"""
+        windows = group_by_window(self.notes_app.notes, self.window)
+        fingerprints = {window: window_fingerprint(items) for window, items in windows.items()}
+        stale = [window for window in windows
+                 if self.store.get(window, fingerprints[window]) is None]
+
+        if progress:
+            progress(f"{len(windows)} windows, {len(stale)} to summarize")
+
+        if stale:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                futures = {
+                    executor.submit(self.summarize_window, window, windows[window], api_key): window
+                    for window in stale
+                }
+                try:
+                    for done, future in enumerate(as_completed(futures), 1):
+                        window = futures[future]
+                        self.store.put(window, fingerprints[window], len(windows[window]), future.result())
+                        if progress:
+                            progress(f"Summarized {window} ({done}/{len(stale)})")
+                finally:
+                    # Keep whatever finished so a retry only redoes the failed windows
+                    self.store.save()
+        self.store.prune(windows)
+        self.store.save()
+
+        summaries = [(window, self.store.get(window, fingerprints[window])) for window in sorted(windows)]
+        answer, _ = cached_generate_content(
+            self._reduce_prompt(summaries), REDUCE_PROMPT_VERSION,
+            notebook_version(self.notes_app.notes_file), api_key=api_key, client=self.client
+        )
+        try:
+            return parse_json_response(answer)
+        except ValueError:
+            return answer
@@ -0,0 +1,388 @@
+#!/usr/bin/env python3
+"""
+Smart Notes Instrumentation - Tracing spans and metrics for store and AI hot paths
+
+Wrap a function with @traced("name"), or a block with `with span("name") as sp`,
+and every call records its latency into a histogram and a request counter
+(status ok/error). Spans can also count bytes read and written
+(sp.file_read(path), sp.add_bytes(...)). Spans opened inside another span on
+the same thread become its children and share its trace id, so one slow `ask`
+breaks down into note loading, embedding calls and generateContent.
+
+Nothing is recorded unless SMART_NOTES_TRACE=1 (or enable() is called). When
+disabled, span() returns a shared no-op object and @traced costs one attribute
+check per call. When enabled, finished spans are appended to TRACE_FILE as
+JSON lines (buffered, flushed about once a second and at exit), and a
+Prometheus text snapshot of the metrics is written to METRICS_FILE. The API
+server also serves the live metrics at GET /metrics.
+
+    SMART_NOTES_TRACE=1 python notes_enhanced.py ask "How was my week?" --relevant-only
+    python instrumentation.py                 # latency summary per span name
+    python instrumentation.py --slowest 3     # span trees of the slowest traces
+    python instrumentation.py --prometheus    # the last metrics snapshot
+"""
+
+import argparse
+import atexit
+import json
+import os
+import random
+import threading
+import time
+from bisect import bisect_left
+from functools import wraps
+
+from config import TRACE_ENABLED, TRACE_FILE, METRICS_FILE
+
+# Upper bounds in seconds; the store calls are sub-millisecond to seconds, the AI calls up to tens of seconds
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+METRIC_PREFIX = "smart_notes"
+TRACE_BUFFER_SPANS = 512
+FLUSH_INTERVAL_SECONDS = 1.0
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class Histogram:
+    """Prometheus-style latency histogram (per-bucket counts, made cumulative on export)"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # the last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, seconds):
+        self.counts[bisect_left(self.buckets, seconds)] += 1
+        self.sum += seconds
+        self.count += 1
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Metrics:
+    """Latency histograms plus request and byte counters, keyed by operation name"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latency = {}        # operation -> Histogram
+        self.requests = {}       # (operation, status) -> count
+        self.bytes_read = {}     # operation -> bytes
+        self.bytes_written = {}  # operation -> bytes
+
+    def record(self, name, seconds, status, bytes_read=0, bytes_written=0):
+        with self._lock:
+            histogram = self.latency.get(name)
+            if histogram is None:
+                histogram = self.latency[name] = Histogram()
+            histogram.observe(seconds)
+            self.requests[(name, status)] = self.requests.get((name, status), 0) + 1
+            if bytes_read:
+                self.bytes_read[name] = self.bytes_read.get(name, 0) + bytes_read
+            if bytes_written:
+                self.bytes_written[name] = self.bytes_written.get(name, 0) + bytes_written
+
+    def prometheus_text(self):
+        """All metrics in the Prometheus text exposition format"""
+        prefix = METRIC_PREFIX
+        with self._lock:
+            lines = [f"# HELP {prefix}_operation_duration_seconds Latency of instrumented operations",
+                     f"# TYPE {prefix}_operation_duration_seconds histogram"]
+            for name, histogram in sorted(self.latency.items()):
+                label = f'operation="{_label(name)}"'
+                cumulative = 0
+                for bound, count in zip(histogram.buckets, histogram.counts):
+                    cumulative += count
+                    lines.append(f'{prefix}_operation_duration_seconds_bucket{{{label},le="{bound}"}} {cumulative}')
+                lines.append(f'{prefix}_operation_duration_seconds_bucket{{{label},le="+Inf"}} {histogram.count}')
+                lines.append(f"{prefix}_operation_duration_seconds_sum{{{label}}} {histogram.sum:.6f}")
+                lines.append(f"{prefix}_operation_duration_seconds_count{{{label}}} {histogram.count}")
+
+            lines.append(f"# HELP {prefix}_operations_total Instrumented operations by outcome")
+            lines.append(f"# TYPE {prefix}_operations_total counter")
+            for (name, status), count in sorted(self.requests.items()):
+                lines.append(f'{prefix}_operations_total{{operation="{_label(name)}",status="{status}"}} {count}')
+
+            for metric, values, help_text in (("bytes_read_total", self.bytes_read, "Bytes read from disk or the network"),
+                                              ("bytes_written_total", self.bytes_written, "Bytes written to disk or the network")):
+                lines.append(f"# HELP {prefix}_{metric} {help_text}")
+                lines.append(f"# TYPE {prefix}_{metric} counter")
+                for name, count in sorted(values.items()):
+                    lines.append(f'{prefix}_{metric}{{operation="{_label(name)}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+
+class Span:
+    """One timed operation; use as a context manager"""
+
+    enabled = True
+
+    def __init__(self, tracer, name, attrs):
+        self.tracer = tracer
+        self.name = name
+        self.attrs = attrs
+        self.bytes_read = 0
+        self.bytes_written = 0
+
+    def __enter__(self):
+        stack = self.tracer._stack()
+        parent = stack[-1] if stack else None
+        self.trace_id = parent.trace_id if parent else f"{random.getrandbits(64):016x}"
+        self.parent_id = parent.span_id if parent else None
+        self.span_id = f"{random.getrandbits(32):08x}"
+        stack.append(self)
+        self._stack = stack  # exit may happen on another thread (a generator finished elsewhere)
+        self.start = time.time()
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration = time.perf_counter() - self._started
+        stack = self._stack
+        if stack and stack[-1] is self:
+            stack.pop()
+        elif self in stack:
+            stack.remove(self)  # a generator span closed out of order
+        failed = exc_type is not None and exc_type is not GeneratorExit  # a consumer stopping early is fine
+        if failed:
+            self.attrs["error"] = exc_type.__name__
+        self.tracer.finish(self, duration, "error" if failed else "ok")
+        return False
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def add_bytes(self, read=0, written=0):
+        self.bytes_read += read
+        self.bytes_written += written
+
+    def file_read(self, path):
+        try:
+            self.bytes_read += os.path.getsize(path)
+        except OSError:
+            pass
+
+    def file_written(self, path):
+        try:
+            self.bytes_written += os.path.getsize(path)
+        except OSError:
+            pass
+
+
+class _NullSpan:
+    """What span() returns while instrumentation is off: every method is a no-op"""
+
+    enabled = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set(self, **attrs):
+        pass
+
+    def add_bytes(self, read=0, written=0):
+        pass
+
+    def file_read(self, path):
+        pass
+
+    def file_written(self, path):
+        pass
+
+
+NULL_SPAN = _NullSpan()
+
+
+class Tracer:
+    """Owns the metrics, the per-thread span stack and the buffered trace writer"""
+
+    def __init__(self, enabled=False, trace_file=TRACE_FILE, metrics_file=METRICS_FILE):
+        self.enabled = False
+        self.trace_file = trace_file
+        self.metrics_file = metrics_file
+        self.metrics = Metrics()
+        self._local = threading.local()
+        self._buffer = []
+        self._buffer_lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        self._exit_hook = False
+        if enabled:
+            self.enable()
+
+    def enable(self, trace_file=None, metrics_file=None):
+        if trace_file is not None:
+            self.trace_file = trace_file
+        if metrics_file is not None:
+            self.metrics_file = metrics_file
+        if not self._exit_hook:
+            atexit.register(self.flush)
+            self._exit_hook = True
+        self.enabled = True
+
+    def disable(self):
+        self.flush()
+        self.enabled = False
+
+    def _stack(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def span(self, name, **attrs):
+        return Span(self, name, attrs) if self.enabled else NULL_SPAN
+
+    def finish(self, span, duration, status):
+        self.metrics.record(span.name, duration, status, span.bytes_read, span.bytes_written)
+        if self.trace_file is None:
+            return
+        record = {
+            "trace_id": span.trace_id,
+            "span_id": span.span_id,
+            "parent_id": span.parent_id,
+            "name": span.name,
+            "start": round(span.start, 6),
+            "duration_ms": round(duration * 1000, 3),
+            "status": status
+        }
+        if span.bytes_read:
+            record["bytes_read"] = span.bytes_read
+        if span.bytes_written:
+            record["bytes_written"] = span.bytes_written
+        if span.attrs:
+            record["attrs"] = span.attrs
+        with self._buffer_lock:
+            self._buffer.append(record)
+            due = (len(self._buffer) >= TRACE_BUFFER_SPANS or
+                   (span.parent_id is None and time.monotonic() - self._last_flush >= FLUSH_INTERVAL_SECONDS))
+        if due:
+            self.flush()
+
+    def flush(self):
+        """Append buffered spans to the trace file and rewrite the metrics snapshot"""
+        with self._buffer_lock:
+            records, self._buffer = self._buffer, []
+            self._last_flush = time.monotonic()
+        try:
+            if records and self.trace_file is not None:
+                lines = "".join(json.dumps(record, default=str) + "\n" for record in records)
+                with open(self.trace_file, 'a', encoding='utf-8') as f:
+                    f.write(lines)
+            if self.metrics_file is not None and self.metrics.latency:
+                tmp_file = f"{self.metrics_file}.tmp"
+                with open(tmp_file, 'w', encoding='utf-8') as f:
+                    f.write(self.metrics.prometheus_text())
+                os.replace(tmp_file, self.metrics_file)
+        except OSError as e:
+            print(f"❌ Could not write instrumentation output: {e}")
+
+
+_tracer = Tracer(enabled=TRACE_ENABLED)
+
+
+def get_tracer():
+    """The process-wide tracer"""
+    return _tracer
+
+
+def span(name, **attrs):
+    """Context manager timing a block as one span (a no-op when disabled)"""
+    return Span(_tracer, name, attrs) if _tracer.enabled else NULL_SPAN
+
+
+def traced(name):
+    """Decorator recording every call of the function as a span called `name`"""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _tracer.enabled:
+                return func(*args, **kwargs)
+            with Span(_tracer, name, {}):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def prometheus_text():
+    return _tracer.metrics.prometheus_text()
+
+
+def read_traces(trace_file=TRACE_FILE):
+    """Parsed span records from a JSONL trace file (unreadable lines are skipped)"""
+    records = []
+    try:
+        with open(trace_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    continue
+    except OSError as e:
+        print(f"❌ Could not read {trace_file}: {e}")
+    return records
+
+
+def _print_tree(record, children, depth=0):
+    size = ""
+    if record.get("bytes_read") or record.get("bytes_written"):
+        size = f"  ({record.get('bytes_read', 0):,} B read, {record.get('bytes_written', 0):,} B written)"
+    status = "" if record["status"] == "ok" else f"  [{record.get('attrs', {}).get('error', 'error')}]"
+    print(f"{'  ' * depth}{record['duration_ms']:>10.2f} ms  {record['name']}{size}{status}")
+    for child in sorted(children.get(record["span_id"], []), key=lambda item: item["start"]):
+        _print_tree(child, children, depth + 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize Smart Notes traces and metrics")
+    parser.add_argument('--traces', type=str, default=str(TRACE_FILE), help='JSONL trace file to read')
+    parser.add_argument('--slowest', type=int, default=0, help='Show span trees of the N slowest traces')
+    parser.add_argument('--prometheus', action='store_true', help='Print the last metrics snapshot')
+    args = parser.parse_args()
+
+    if args.prometheus:
+        try:
+            print(METRICS_FILE.read_text(encoding='utf-8'), end="")
+        except OSError as e:
+            print(f"❌ No metrics snapshot at {METRICS_FILE}: {e}")
+        return
+
+    records = read_traces(args.traces)
+    if not records:
+        print("💤 No spans recorded yet. Run a command with SMART_NOTES_TRACE=1")
+        return
+
+    from bench_llm import summarize
+
+    by_name = {}
+    for record in records:
+        by_name.setdefault(record["name"], []).append(record)
+    print(f"🔬 {len(records)} spans in {len({record['trace_id'] for record in records})} traces")
+    print("=" * 50)
+    for name, spans in sorted(by_name.items(), key=lambda item: -sum(r["duration_ms"] for r in item[1])):
+        stats = summarize([record["duration_ms"] for record in spans])
+        errors = sum(1 for record in spans if record["status"] != "ok")
+        read = sum(record.get("bytes_read", 0) for record in spans)
+        written = sum(record.get("bytes_written", 0) for record in spans)
+        print(f"{name:<32} n={stats['count']:<6} p50 {stats['p50_ms']:>9} ms  p95 {stats['p95_ms']:>9} ms  "
+              f"p99 {stats['p99_ms']:>9} ms" + (f"  errors {errors}" if errors else "")
+              + (f"  read {read:,} B" if read else "") + (f"  written {written:,} B" if written else ""))
+    print("=" * 50)
+
+    if args.slowest:
+        children = {}
+        for record in records:
+            if record.get("parent_id"):
+                children.setdefault(record["parent_id"], []).append(record)
+        roots = sorted((record for record in records if not record.get("parent_id")),
+                       key=lambda record: record["duration_ms"], reverse=True)
+        for root in roots[:args.slowest]:
+            print(f"\n🐢 Trace {root['trace_id']} at {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(root['start']))}")
+            _print_tree(root, children)
+
+
+if __name__ == "__main__":
+    main()
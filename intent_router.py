@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+Smart Notes Intent Router - Answer statistical questions locally, without the LLM
+
+Recognizes aggregate ("average mood", "highest energy"), count ("how many work
+notes") and date-range ("last month", "past 7 days", "since 2025-08-01")
+questions and answers them in milliseconds from the store's running aggregates
+and daily rollup, scanning notes only for filters those can't serve. Answers
+use the same JSON shape as ask_ai. Anything that needs reasoning, or qualifies
+the question beyond type, tag and date ("on weekends", "after meetings"),
+returns None so the caller falls through to the LLM.
+"""
+
+import re
+from datetime import datetime, timedelta
+
+from aggregates import word_count
+from daily_rollup import combine
+
+TYPE_WORDS = {
+    "journal": "journal", "journals": "journal",
+    "goal": "goal", "goals": "goal",
+    "principle": "principle", "principles": "principle",
+    "reflection": "reflection", "reflections": "reflection",
+    "learning": "learning", "learnings": "learning"
+}
+NOTE_WORDS = {"note", "notes", "entry", "entries"}
+# Words a statistical question may contain besides aggregates, metrics, types, tags and dates;
+# anything else ("notes that mention family", "mood on weekends") is a qualifier the totals
+# can't honour, so the question needs the LLM
+FILLER_WORDS = {
+    "how", "many", "number", "of", "count", "total", "do", "did", "does", "i", "i've", "ive", "have", "has",
+    "had", "are", "is", "was", "were", "there", "my", "me", "in", "the", "a", "an", "with", "tag", "tagged",
+    "write", "wrote", "written", "made", "make", "logged", "log", "added", "add", "created", "saved",
+    "so", "far", "all", "altogether", "overall", "what", "what's", "whats", "s", "ve", "tell", "show",
+    "please", "currently", "now", "got", "kept", "under", "as", "for", "type", "labeled", "labelled",
+    "over", "across", "ever", "been", "it", "level", "levels", "rating", "ratings", "score", "scores"
+}
+METRIC_WORDS = {"mood", "moods", "energy", "word", "words"}
+AGGREGATE_WORDS = {"average", "avg", "mean", "typical", "highest", "best", "max", "maximum", "peak",
+                   "lowest", "worst", "min", "minimum", "total", "sum"}
+DATE_WORDS = {"today", "yesterday", "this", "last", "past", "since", "on", "day", "days", "week", "weeks",
+              "month", "months", "year", "years"}
+
+AGGREGATES = [
+    ("avg", re.compile(r"\b(average|avg|mean|typical)\b")),
+    ("max", re.compile(r"\b(highest|best|max|maximum|peak)\b")),
+    ("min", re.compile(r"\b(lowest|worst|min|minimum)\b")),
+    ("total", re.compile(r"\b(total|sum)\b"))
+]
+COUNT_PATTERN = re.compile(r"\b(how many|number of|count)\b")
+REASONING_PATTERN = re.compile(
+    r"\b(why|should|advice|advise|suggest|recommend|explain|improve|help me|meaning|feel about|what does)\b"
+)
+TAG_PATTERN = re.compile(r"\b(?:tagged|with (?:the )?tag)\s+#?([\w-]+)")
+RELATIVE_PATTERN = re.compile(r"\b(?:in the )?(?:last|past)\s+(\d+)\s+(day|week|month|year)s?\b")
+ROLLING_PATTERN = re.compile(r"\b(?:in the )?past\s+(day|week|month|year)\b")
+SINCE_PATTERN = re.compile(r"\bsince\s+(\d{4}-\d{2}-\d{2})\b")
+ON_PATTERN = re.compile(r"\bon\s+(\d{4}-\d{2}-\d{2})\b")
+
+PERIOD_DAYS = {"day": 1, "week": 7, "month": 30, "year": 365}
+MAX_SOURCES = 10
+
+
+def _start_of_day(moment):
+    return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def parse_date_range(question, now=None):
+    """Return (start, end, label) for a date phrase in the question, or None"""
+    now = now or datetime.now()
+    today = _start_of_day(now)
+    text = question.lower()
+
+    match = RELATIVE_PATTERN.search(text)
+    if match:
+        days = int(match.group(1)) * PERIOD_DAYS[match.group(2)]
+        return today - timedelta(days=days - 1), today + timedelta(days=1), match.group(0).strip()
+    match = ROLLING_PATTERN.search(text)
+    if match:
+        days = PERIOD_DAYS[match.group(1)]
+        return today - timedelta(days=days - 1), today + timedelta(days=1), match.group(0).strip()
+    match = SINCE_PATTERN.search(text)
+    if match:
+        try:
+            return datetime.fromisoformat(match.group(1)), today + timedelta(days=1), match.group(0)
+        except ValueError:
+            return None  # "since 2025-02-30": not a real date, let the LLM make sense of it
+    match = ON_PATTERN.search(text)
+    if match:
+        try:
+            day = datetime.fromisoformat(match.group(1))
+        except ValueError:
+            return None
+        return day, day + timedelta(days=1), match.group(0)
+
+    if "yesterday" in text:
+        return today - timedelta(days=1), today, "yesterday"
+    if "today" in text:
+        return today, today + timedelta(days=1), "today"
+
+    week_start = today - timedelta(days=today.weekday())
+    month_start = today.replace(day=1)
+    year_start = today.replace(month=1, day=1)
+    if "this week" in text:
+        return week_start, week_start + timedelta(days=7), "this week"
+    if "last week" in text:
+        return week_start - timedelta(days=7), week_start, "last week"
+    if "this month" in text:
+        return month_start, (month_start + timedelta(days=32)).replace(day=1), "this month"
+    if "last month" in text:
+        return (month_start - timedelta(days=1)).replace(day=1), month_start, "last month"
+    if "this year" in text:
+        return year_start, year_start.replace(year=year_start.year + 1), "this year"
+    if "last year" in text:
+        return year_start.replace(year=year_start.year - 1), year_start, "last year"
+    return None
+
+
+def parse_intent(question, known_tags=(), now=None):
+    """Turn a question into {metric, aggregate, type, tag, range} or None if it needs the LLM"""
+    text = question.lower()
+    if REASONING_PATTERN.search(text):
+        return None
+    words = re.findall(r"[\w-]+", text)
+
+    aggregate = next((name for name, pattern in AGGREGATES if pattern.search(text)), None)
+    counting = bool(COUNT_PATTERN.search(text))
+
+    if "mood" in words:
+        metric = "mood"
+    elif "energy" in words:
+        metric = "energy_level"
+    elif "words" in words or "word count" in text:
+        metric = "word_count"
+        aggregate = aggregate or "total"
+    elif counting or any(word in NOTE_WORDS or word in TYPE_WORDS for word in words):
+        metric = "notes"
+    else:
+        return None
+
+    if metric == "notes":
+        if not counting:
+            return None
+        aggregate = "count"
+    elif aggregate is None:
+        # "how's my mood lately" is a judgement call, not arithmetic
+        return None
+
+    note_type = next((TYPE_WORDS[word] for word in words if word in TYPE_WORDS), None)
+
+    tag = None
+    match = TAG_PATTERN.search(text)
+    if match:
+        tag = match.group(1)
+    else:
+        # "work notes", "gratitude entries"
+        tags = {t.lower() for t in known_tags}
+        for previous, word in zip(words, words[1:]):
+            if word in NOTE_WORDS and previous in tags and previous not in TYPE_WORDS:
+                tag = previous
+                break
+    if note_type and tag == note_type:
+        tag = None
+
+    date_range = parse_date_range(question, now)
+    if date_range is None and (SINCE_PATTERN.search(text) or ON_PATTERN.search(text)):
+        return None  # a date we couldn't read; answering for all time would be wrong
+    if _has_qualifiers(text, words, tag, date_range):
+        return None
+
+    return {
+        "metric": metric,
+        "aggregate": aggregate,
+        "type": note_type,
+        "tag": tag,
+        "range": date_range
+    }
+
+
+def _has_qualifiers(text, words, tag, date_range):
+    """True if the question says more than aggregate, metric, type, tag and date ("mood on weekends")"""
+    if date_range:
+        words = re.findall(r"[\w-]+", text.replace(date_range[2], " "))
+    for word in words:
+        if (word in FILLER_WORDS or word in NOTE_WORDS or word in TYPE_WORDS or word in DATE_WORDS
+                or word in METRIC_WORDS or word in AGGREGATE_WORDS):
+            continue
+        if word == tag or word.isdigit():
+            continue
+        return True
+    return False
+
+
+def _matches(note, intent):
+    if intent["type"] and note.get("type", "general") != intent["type"]:
+        return False
+    if intent["tag"] and intent["tag"] not in [t.lower() for t in note.get("tags", [])]:
+        return False
+    if intent["range"]:
+        start, end, _ = intent["range"]
+        created = note.get("created", "")
+        if not (start.isoformat() <= created < end.isoformat()):
+            return False
+    return True
+
+
+def _describe_scope(intent):
+    parts = []
+    if intent["tag"]:
+        parts.append(f"'{intent['tag']}'")
+    parts.append(f"{intent['type']} entries" if intent["type"] else "entries")
+    if intent["range"]:
+        parts.append(intent["range"][2])
+    return " ".join(parts)
+
+
+def _summary(count, total=None, low=None, high=None, sources=()):
+    return {"count": count, "total": total, "min": low, "max": high, "sources": list(sources)}
+
+
+def _from_indexes(intent, aggregates, rollup):
+    """Summary read from the running aggregates or the daily rows in range, or None if they can't serve it"""
+    metric = intent["metric"]
+    if intent["type"] and intent["tag"]:
+        return None
+    if metric == "word_count" and intent["aggregate"] in ("min", "max"):
+        return None  # only word totals are kept, not per-note extremes
+    if metric != "notes" and (intent["type"] or intent["tag"]):
+        return None
+
+    if intent["range"]:
+        if rollup is None:
+            return None
+        start, end, _ = intent["range"]
+        # Ranges are whole days, so they map straight onto rollup rows
+        row = combine(rollup.range(start.date().isoformat(), (end - timedelta(days=1)).date().isoformat()))
+        if metric == "notes":
+            if intent["type"]:
+                return _summary(row["types"].get(intent["type"], 0))
+            if intent["tag"]:
+                return _summary(sum(count for tag, count in row["tags"].items() if tag.lower() == intent["tag"]))
+            return _summary(row["entries"])
+        if metric == "word_count":
+            return _summary(row["entries"], row["words"])
+        stats = row["mood" if metric == "mood" else "energy"]
+        return _summary(stats["count"], stats["sum"], stats["min"], stats["max"])
+
+    if aggregates is None:
+        return None
+    if metric == "notes":
+        if intent["type"]:
+            return _summary(aggregates.type_counts.get(intent["type"], 0))
+        if intent["tag"]:
+            return _summary(aggregates.tag_counts.get(intent["tag"], 0))
+        return _summary(aggregates.total_notes)
+    if metric == "word_count":
+        return _summary(aggregates.total_notes, aggregates.total_words)
+    stats = aggregates.mood if metric == "mood" else aggregates.energy
+    return _summary(stats.count, stats.total, stats.minimum(), stats.maximum())
+
+
+def _from_notes(notes, intent):
+    """Summary from one pass over the notes, for filters the indexes don't cover"""
+    matched = []
+    values = []
+    for note_id, note in notes.items():
+        if not _matches(note, intent):
+            continue
+        if intent["metric"] == "notes":
+            matched.append((note_id, note))
+            continue
+        if intent["metric"] == "word_count":
+            value = word_count(note)
+        else:
+            value = note.get("metadata", {}).get(intent["metric"])
+        if isinstance(value, (int, float)) and not isinstance(value, bool) and (value or intent["metric"] == "word_count"):
+            matched.append((note_id, note))
+            values.append(value)
+
+    recent = sorted(matched, key=lambda item: item[1].get("created", ""), reverse=True)
+    sources = [note_id for note_id, _ in recent[:MAX_SOURCES]]
+    if intent["metric"] == "notes":
+        return _summary(len(matched), sources=sources)
+    if not values:
+        return _summary(0, sources=sources)
+    return _summary(len(values), sum(values), min(values), max(values), sources)
+
+
+def answer_locally(notes, question, now=None, aggregates=None, rollup=None):
+    """Answer an aggregate/count question, or return None to use the LLM.
+
+    Pass the store's NoteAggregates and DailyRollup (kept in step with notes)
+    to answer from them; without them, or for filters they don't cover (such
+    as the mood of one tag), the notes are scanned. Answers read from the
+    indexes list no source notes.
+    """
+    if aggregates is not None:
+        known_tags = aggregates.tag_counts
+    else:
+        known_tags = {tag for note in notes.values() for tag in note.get("tags", [])}
+    intent = parse_intent(question, known_tags, now)
+    if intent is None:
+        return None
+
+    summary = _from_indexes(intent, aggregates, rollup)
+    if summary is None:
+        summary = _from_notes(notes, intent)
+    count = summary["count"]
+
+    scope = _describe_scope(intent)
+    label = {"mood": "mood", "energy_level": "energy", "word_count": "word count"}.get(intent["metric"])
+    if intent["aggregate"] == "count":
+        answer = f"You have {count} {scope}."
+    elif not count:
+        answer = f"No {label} data found for {scope}."
+    elif intent["aggregate"] == "avg":
+        suffix = "/10" if intent["metric"] != "word_count" else " words"
+        answer = f"Your average {label} across {count} {scope} is {summary['total'] / count:.1f}{suffix}."
+    elif intent["aggregate"] == "max":
+        answer = f"Your highest {label} across {count} {scope} is {summary['max']}."
+    elif intent["aggregate"] == "min":
+        answer = f"Your lowest {label} across {count} {scope} is {summary['min']}."
+    else:
+        answer = f"Your total {label} across {count} {scope} is {summary['total']:,}."
+
+    return {
+        "answer": answer,
+        "confidence": 1.0,
+        "sources_used": summary["sources"],
+        "suggested_actions": [],
+        "related_topics": [label or "entries"],
+        "answered_locally": True
+    }
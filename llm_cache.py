@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Smart Notes LLM Cache - Persistent response cache for Gemini prompts
+
+Responses are keyed on a hash of the model, the prompt template version, the
+notebook version and the whitespace-normalized prompt. Entries expire after a
+TTL, the cache is bounded with LRU eviction, and every entry belonging to an
+older notebook version is dropped as soon as the notes store changes.
+"""
+
+import atexit
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from config import LLM_CACHE_FILE, LLM_CACHE_TTL_SECONDS, LLM_CACHE_MAX_ENTRIES
+from gemini_client import get_client
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def notebook_version(notes_file):
+    """Cheap fingerprint of the notes store; changes whenever the file is rewritten"""
+    try:
+        stat = os.stat(notes_file)
+    except OSError:
+        return "empty"
+    return f"{stat.st_mtime_ns}-{stat.st_size}"
+
+
+def normalize_prompt(prompt):
+    """Collapse whitespace so cosmetic prompt differences share a cache entry"""
+    return _WHITESPACE.sub(" ", prompt).strip()
+
+
+class ResponseCache:
+    """Size-bounded LRU cache with TTL, persisted to a JSON file.
+
+    Lookups only touch memory. The file is rewritten when entries change
+    (put, eviction, invalidation, clear) and once more at exit if counters
+    are still unsaved. Each write first merges in entries and counters that
+    other processes saved since, so processes sharing the file don't erase
+    each other's work.
+    """
+
+    def __init__(self, cache_file=LLM_CACHE_FILE, ttl_seconds=LLM_CACHE_TTL_SECONDS,
+                 max_entries=LLM_CACHE_MAX_ENTRIES):
+        self.cache_file = cache_file
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+        self._unsaved = dict.fromkeys(self._stats, 0)  # counter increments not yet on disk
+        self._dropped = set()  # keys removed here, not to be revived from the file
+        self._cleared = False
+        self._dirty = False
+        entries, stats = self._read_file()
+        self._entries.update(entries)
+        self._stats.update(stats)
+        atexit.register(self.flush)
+
+    @staticmethod
+    def make_key(model, template_version, prompt, notebook_version):
+        """Hash of everything that determines the model's answer"""
+        material = json.dumps([model, template_version, notebook_version, normalize_prompt(prompt)])
+        return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+    def _read_file(self):
+        """(entries least-recently-used first, stats) as currently saved"""
+        if not self.cache_file.exists():
+            return [], {}
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (json.JSONDecodeError, FileNotFoundError):
+            return [], {}
+        return data.get("entries", []), data.get("stats", {})
+
+    def _count(self, name, amount=1):
+        self._stats[name] += amount
+        self._unsaved[name] += amount
+        self._dirty = True
+
+    def _save(self):
+        entries, stats = self._read_file()
+        now = time.time()
+        merged = OrderedDict()
+        if not self._cleared:
+            for key, entry in entries:
+                if (key not in self._entries and key not in self._dropped
+                        and now - entry["stored_at"] <= self.ttl_seconds):
+                    merged[key] = entry
+        # Ours were used by this process, so they count as more recent
+        merged.update(self._entries)
+        while len(merged) > self.max_entries:
+            merged.popitem(last=False)
+            self._unsaved["evictions"] += 1
+        self._entries = merged
+
+        self._stats = {name: stats.get(name, 0) + self._unsaved[name] for name in self._stats}
+        data = {"stats": self._stats, "entries": list(self._entries.items())}
+        tmp_file = self.cache_file.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_file, self.cache_file)
+        self._unsaved = dict.fromkeys(self._stats, 0)
+        self._dropped.clear()
+        self._cleared = False
+        self._dirty = False
+
+    def flush(self):
+        """Persist hit/miss counters that lookups have only kept in memory"""
+        with self._lock:
+            if self._dirty:
+                try:
+                    self._save()
+                except OSError as e:
+                    print(f"❌ Could not save response cache: {e}")
+
+    def get(self, key):
+        """Return the cached response or None, counting hits and misses in memory"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.time() - entry["stored_at"] > self.ttl_seconds:
+                del self._entries[key]
+                self._dropped.add(key)
+                entry = None
+            if entry is None:
+                self._count("misses")
+                return None
+            self._entries.move_to_end(key)
+            self._count("hits")
+            return entry["response"]
+
+    def put(self, key, response, notebook_version):
+        """Store a response, evicting the least recently used entries if full"""
+        with self._lock:
+            self._entries[key] = {
+                "response": response,
+                "notebook_version": notebook_version,
+                "stored_at": time.time()
+            }
+            self._entries.move_to_end(key)
+            self._dropped.discard(key)
+            while len(self._entries) > self.max_entries:
+                self._dropped.add(self._entries.popitem(last=False)[0])
+                self._count("evictions")
+            self._save()
+
+    def invalidate_stale(self, current_version):
+        """Drop entries computed against any other notebook version"""
+        with self._lock:
+            stale = [key for key, entry in self._entries.items()
+                     if entry["notebook_version"] != current_version]
+            for key in stale:
+                del self._entries[key]
+            self._dropped.update(stale)
+            if stale:
+                self._count("invalidations", len(stale))
+                self._save()
+            return len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._cleared = True
+            self._save()
+
+    def stats(self):
+        """Hit/miss counters plus the current hit rate and size"""
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return dict(self._stats,
+                        entries=len(self._entries),
+                        max_entries=self.max_entries,
+                        hit_rate=self._stats["hits"] / lookups if lookups else 0.0)
+
+
+_shared_cache = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_response_cache():
+    """Return the process-wide ResponseCache"""
+    global _shared_cache
+    if _shared_cache is None:
+        with _shared_cache_lock:
+            if _shared_cache is None:
+                _shared_cache = ResponseCache()
+    return _shared_cache
+
+
+def cached_generate_content(prompt, template_version, notes_version, api_key=None, client=None):
+    """generateContent through the response cache; returns (text, was_cached)"""
+    client = client or get_client()
+    cache = get_response_cache()
+    cache.invalidate_stale(notes_version)
+
+    key = ResponseCache.make_key(client.model, template_version, prompt, notes_version)
+    cached = cache.get(key)
+    if cached is not None:
+        return cached, True
+
+    answer = client.generate_content(prompt, api_key=api_key)
+    cache.put(key, answer, notes_version)
+    return answer, False
+
+
+def cached_stream_content(prompt, template_version, notes_version, api_key=None, client=None):
+    """Streaming generateContent through the response cache; yields text chunks.
+
+    A cache hit yields the whole stored answer at once; a miss streams from
+    the API and stores the complete answer when the stream finishes.
+    """
+    client = client or get_client()
+    cache = get_response_cache()
+    cache.invalidate_stale(notes_version)
+
+    key = ResponseCache.make_key(client.model, template_version, prompt, notes_version)
+    cached = cache.get(key)
+    if cached is not None:
+        yield cached
+        return
+
+    chunks = []
+    for chunk in client.stream_generate_content(prompt, api_key=api_key):
+        chunks.append(chunk)
+        yield chunk
+    cache.put(key, "".join(chunks), notes_version)
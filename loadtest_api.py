@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+API Load Test - Throughput and tail latency of api_server.py
+
+Opens --connections keep-alive connections (asyncio streams, standard library
+only) and has each one fire requests back to back for --duration seconds.
+Requests are a weighted mix of list, stats, search, single-note reads and,
+with --write-ratio, note creation. With --etag, each connection remembers the
+ETags it has seen and revalidates with If-None-Match, the way a polite client
+would. Reports throughput, status counts and p50/p95/p99 latency per
+endpoint. Notes created by --write-ratio go into the server's real notebook,
+so they are deleted again when the run ends (they are tagged "loadtest" in
+case a run is killed before it can clean up). --in-process starts a server in this process against the current
+notebook, so nothing else needs to be running.
+
+    python api_server.py &
+    python loadtest_api.py --connections 32 --duration 10 --etag
+    python loadtest_api.py --in-process --write-ratio 0.05 --json api_load.json
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import Counter
+from urllib.parse import quote
+
+from bench_llm import summarize
+from config import API_HOST, API_PORT
+
+SEARCH_TERMS = ["work", "mood", "learn", "goal", "today", "python", "stress", "grateful"]
+
+
+class Connection:
+    """One keep-alive HTTP/1.1 connection"""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+
+    async def open(self):
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+
+    async def request(self, method, target, body=None, headers=None):
+        """Returns (status, headers, body bytes); reconnects if the server closed the connection"""
+        if self.writer is None:
+            await self.open()
+        data = json.dumps(body).encode('utf-8') if body is not None else b""
+        lines = [f"{method} {target} HTTP/1.1", f"Host: {self.host}:{self.port}",
+                 f"Content-Length: {len(data)}"]
+        if data:
+            lines.append("Content-Type: application/json")
+        lines.extend(f"{name}: {value}" for name, value in (headers or {}).items())
+        self.writer.write(("\r\n".join(lines) + "\r\n\r\n").encode('latin-1') + data)
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionError("server closed the connection")
+        status = int(status_line.split()[1])
+        response_headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode('latin-1').partition(":")
+            response_headers[name.strip().lower()] = value.strip()
+        payload = await self.reader.readexactly(int(response_headers.get("content-length", 0)))
+        if response_headers.get("connection", "").lower() == "close":
+            self.close()
+        return status, response_headers, payload
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+
+def pick_request(rng, note_ids, write_ratio):
+    """(endpoint label, method, target, body) for one weighted random request"""
+    if write_ratio and rng.random() < write_ratio:
+        return "create", "POST", "/notes", {"title": "Load test note", "content": "Written by loadtest_api.py",
+                                            "tags": ["loadtest"]}
+    roll = rng.random()
+    if roll < 0.35:
+        return "list", "GET", f"/notes?limit=20&offset={rng.choice((0, 20, 40))}&sort=newest", None
+    if roll < 0.55:
+        return "stats", "GET", "/stats", None
+    if roll < 0.75:
+        return "search", "GET", f"/search?q={quote(rng.choice(SEARCH_TERMS))}&limit=20", None
+    if note_ids:
+        return "note", "GET", f"/notes/{rng.choice(note_ids)}", None
+    return "health", "GET", "/health", None
+
+
+async def worker(host, port, deadline, note_ids, args, seed, latencies, statuses, created):
+    rng = random.Random(seed)
+    connection = Connection(host, port)
+    etags = {}
+    try:
+        while time.perf_counter() < deadline:
+            label, method, target, body = pick_request(rng, note_ids, args.write_ratio)
+            headers = {"If-None-Match": etags[target]} if args.etag and target in etags else None
+            started = time.perf_counter()
+            try:
+                status, response_headers, payload = await connection.request(method, target, body, headers)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                connection.close()
+                statuses["connection_error"] += 1
+                continue
+            latencies.setdefault(label, []).append((time.perf_counter() - started) * 1000)
+            statuses[status] += 1
+            if label == "create" and status == 201:
+                created.append(json.loads(payload)["id"])
+            if "etag" in response_headers:
+                etags[target] = response_headers["etag"]
+    finally:
+        connection.close()
+
+
+async def delete_notes(host, port, note_ids):
+    """Remove the notes this run created so the notebook is left as it was"""
+    connection = Connection(host, port)
+    deleted = 0
+    try:
+        for note_id in note_ids:
+            status, _, _ = await connection.request("DELETE", f"/notes/{quote(note_id)}")
+            deleted += status == 200
+    except (OSError, asyncio.IncompleteReadError) as e:
+        print(f"❌ Cleanup stopped early: {e}")
+    finally:
+        connection.close()
+    print(f"🧹 Deleted {deleted} of {len(note_ids)} notes created by the load test")
+
+
+async def run(args):
+    if not args.in_process:
+        return await drive(args, args.host, args.port)
+    from api_server import ApiServer
+    server = await ApiServer(host="127.0.0.1", port=0).start()
+    try:
+        return await drive(args, "127.0.0.1", server.port)
+    finally:
+        await server.stop()
+
+
+async def drive(args, host, port):
+    probe = Connection(host, port)
+    try:
+        status, _, payload = await probe.request("GET", f"/notes?limit={args.sample_notes}")
+    except OSError as e:
+        print(f"❌ Could not reach the API at {host}:{port}: {e}")
+        return None
+    finally:
+        probe.close()
+    note_ids = [note["id"] for note in json.loads(payload).get("notes", [])] if status == 200 else []
+
+    print(f"🚀 {args.connections} connections for {args.duration:.0f}s against {host}:{port} "
+          f"(etag={'on' if args.etag else 'off'}, write ratio {args.write_ratio})")
+    latencies = {}
+    statuses = Counter()
+    started = time.perf_counter()
+    deadline = started + args.duration
+    created = []
+    try:
+        await asyncio.gather(*(worker(host, port, deadline, note_ids, args, seed, latencies, statuses, created)
+                               for seed in range(args.connections)))
+    finally:
+        elapsed = time.perf_counter() - started
+        if created:
+            await delete_notes(host, port, created)
+
+    all_latencies = [value for values in latencies.values() for value in values]
+    return {
+        "connections": args.connections,
+        "duration_s": round(elapsed, 2),
+        "requests": len(all_latencies),
+        "throughput_rps": round(len(all_latencies) / elapsed, 1),
+        "statuses": {str(status): count for status, count in sorted(statuses.items(), key=str)},
+        "latency": {"all": summarize(all_latencies),
+                    **{label: summarize(values) for label, values in sorted(latencies.items())}}
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test for api_server.py")
+    parser.add_argument('--host', type=str, default=API_HOST)
+    parser.add_argument('--port', type=int, default=API_PORT)
+    parser.add_argument('--connections', type=int, default=16, help='Concurrent keep-alive connections')
+    parser.add_argument('--duration', type=float, default=10.0, help='Seconds to run')
+    parser.add_argument('--etag', action='store_true', help='Revalidate with If-None-Match')
+    parser.add_argument('--write-ratio', type=float, default=0.0, help='Fraction of requests that create notes')
+    parser.add_argument('--sample-notes', type=int, default=200, help='Note ids to draw single-note reads from')
+    parser.add_argument('--in-process', action='store_true', help='Start a server in this process')
+    parser.add_argument('--json', type=str, help='Also write the report to this JSON file')
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    if report is None:
+        return
+    print("=" * 50)
+    print(f"Throughput: {report['throughput_rps']} requests/s ({report['requests']} requests)")
+    print(f"Statuses: {report['statuses']}")
+    for label, stats in report["latency"].items():
+        print(f"{label:>8}: p50 {stats['p50_ms']} ms  p95 {stats['p95_ms']} ms  p99 {stats['p99_ms']} ms")
+    print("=" * 50)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"📄 Report written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
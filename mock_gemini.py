@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+"""
+Mock Gemini - A local stand-in for the Gemini REST API
+
+Implements embedContent, batchEmbedContents, generateContent and
+streamGenerateContent (SSE with ?alt=sse, JSON array otherwise) with
+configurable latency, error injection and deterministic outputs, so every AI
+path can be run and benchmarked offline. Point the app at it with:
+
+    python mock_gemini.py --port 8765
+    export GEMINI_BASE_URL=http://127.0.0.1:8765/v1beta
+
+Record/replay: `--mode record --cassette FILE` forwards requests to the real
+API and appends every exchange to FILE; `--mode replay --cassette FILE`
+serves those recorded responses back without any network access.
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from config import GEMINI_DEFAULT_BASE_URL
+
+EMBEDDING_DIMENSIONS = 256
+STREAM_CHUNK_CHARS = 24
+
+_ROUTE = re.compile(r"/models/(?P<model>[^/:]+):(?P<method>\w+)$")
+_NOTE_ID = re.compile(r"\bID: (note_\w+)")
+_WORD = re.compile(r"[a-z0-9']+")
+
+
+def fake_embedding(text, dimensions=EMBEDDING_DIMENSIONS):
+    """Deterministic hashed bag-of-words vector; similar texts get similar vectors"""
+    vector = [0.0] * dimensions
+    for word in _WORD.findall(text.lower()):
+        digest = hashlib.md5(word.encode('utf-8')).digest()
+        index = int.from_bytes(digest[:4], 'little') % dimensions
+        vector[index] += 1.0 if digest[4] % 2 else -1.0
+    norm = math.sqrt(sum(value * value for value in vector)) or 1.0
+    return [value / norm for value in vector]
+
+
+def fake_generation(prompt):
+    """Deterministic reply shaped like what the app's prompts ask for"""
+    note_ids = list(dict.fromkeys(_NOTE_ID.findall(prompt)))
+    digest = hashlib.sha256(prompt.encode('utf-8')).hexdigest()[:8]
+    if '"sources_used"' in prompt:
+        question = prompt.rsplit("Question:", 1)[-1].split("\n", 1)[0].strip()
+        return json.dumps({
+            "answer": f"Mock answer ({digest}) to '{question}' based on {len(note_ids)} notes.",
+            "confidence": 0.75,
+            "sources_used": note_ids[:3],
+            "suggested_actions": ["Review the cited notes"],
+            "related_topics": ["mock"]
+        })
+    if '"emotional_patterns"' in prompt:
+        return json.dumps({
+            "emotional_patterns": {
+                "dominant_emotions": ["calm", "focused"],
+                "trends": f"Mock trend summary ({digest})."
+            },
+            "behavioral_patterns": {
+                "recurring_themes": ["routine", "growth"],
+                "growth_indicators": ["consistent journaling"]
+            },
+            "recommendations": {
+                "immediate_actions": ["Keep a morning routine"],
+                "reflection_questions": ["What gave you energy this week?"]
+            },
+            "summary": f"Mock analysis ({digest}) of {prompt.count('Date: ')} entries."
+        })
+    return f"Mock response ({digest})."
+
+
+def _cassette_key(model, method, body):
+    material = json.dumps([model, method, body], sort_keys=True)
+    return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+
+class Cassette:
+    """JSONL file of recorded exchanges, looked up by request hash"""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._exchanges = {}
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        exchange = json.loads(line)
+                        self._exchanges[exchange["key"]] = exchange
+        except FileNotFoundError:
+            pass
+
+    def get(self, key):
+        return self._exchanges.get(key)
+
+    def record(self, exchange):
+        with self._lock:
+            self._exchanges[exchange["key"]] = exchange
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(exchange, ensure_ascii=False) + "\n")
+
+
+class _MockHTTPServer(ThreadingHTTPServer):
+    # The default backlog of 5 drops SYNs once a benchmark opens more connections than that,
+    # and the retransmit shows up as second-long tail latency that no real API has
+    request_queue_size = 128
+
+
+class MockGeminiServer:
+    """Threaded HTTP server; usable from the CLI or as a context manager in benchmarks"""
+
+    def __init__(self, host="127.0.0.1", port=0, latency_ms=0.0, jitter_ms=0.0,
+                 chunk_delay_ms=0.0, error_rate=0.0, error_status=503, seed=0,
+                 mode="mock", cassette=None, upstream=GEMINI_DEFAULT_BASE_URL):
+        if mode in ("record", "replay") and not cassette:
+            raise ValueError(f"--cassette is required in {mode} mode")
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.chunk_delay_ms = chunk_delay_ms
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.mode = mode
+        self.cassette = Cassette(cassette) if cassette else None
+        self.upstream = upstream.rstrip('/')
+        self.stats = {}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._thread = None
+
+        server = self
+
+        class Handler(_MockHandler):
+            mock = server
+
+        self.httpd = _MockHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/v1beta"
+
+    def count(self, name):
+        with self._lock:
+            self.stats[name] = self.stats.get(name, 0) + 1
+
+    def draw(self):
+        """Pick this request's (delay seconds, inject error?) under the shared seeded RNG"""
+        with self._lock:
+            delay = self.latency_ms + self._random.uniform(0, self.jitter_ms)
+            failed = self._random.random() < self.error_rate
+        return delay / 1000.0, failed
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+class _MockHandler(BaseHTTPRequestHandler):
+    mock = None
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; with Nagle on, delayed ACKs add ~40 ms per keep-alive request
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, body):
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_error(self, status, message):
+        self._send_json(status, {"error": {"code": status, "message": message, "status": "MOCK_ERROR"}})
+
+    def do_GET(self):
+        if urlparse(self.path).path == "/stats":
+            self._send_json(200, self.mock.stats)
+        else:
+            self._send_error(404, "Not found")
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            self._send_error(400, "Invalid JSON payload")
+            return
+
+        route = _ROUTE.search(url.path)
+        if not route:
+            self._send_error(404, f"Unknown endpoint {url.path}")
+            return
+        model, method = route.group("model"), route.group("method")
+        self.mock.count(method)
+
+        delay, failed = self.mock.draw()
+        if delay:
+            time.sleep(delay)
+        if failed:
+            self.mock.count("injected_errors")
+            self._send_error(self.mock.error_status, "Injected failure")
+            return
+
+        if self.mock.mode == "mock":
+            self._serve_mock(method, body, query)
+        else:
+            self._serve_cassette(model, method, body, query)
+
+    def _serve_mock(self, method, body, query):
+        if method == "embedContent":
+            self._send_json(200, {"embedding": {"values": fake_embedding(_text_of(body))}})
+        elif method == "batchEmbedContents":
+            embeddings = [{"values": fake_embedding(_text_of(request))} for request in body.get("requests", [])]
+            self._send_json(200, {"embeddings": embeddings})
+        elif method == "generateContent":
+            self._send_json(200, _candidate(fake_generation(_text_of(body))))
+        elif method == "streamGenerateContent":
+            text = fake_generation(_text_of(body))
+            chunks = [text[i:i + STREAM_CHUNK_CHARS] for i in range(0, len(text), STREAM_CHUNK_CHARS)]
+            self._stream(chunks, query.get("alt") == ["sse"])
+        else:
+            self._send_error(404, f"Unsupported method {method}")
+
+    def _stream(self, chunks, sse):
+        if not sse:
+            # Without alt=sse the real API returns one JSON array of chunks
+            self._send_json(200, [_candidate(chunk) for chunk in chunks])
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        for chunk in chunks:
+            self.wfile.write(f"data: {json.dumps(_candidate(chunk))}\r\n\r\n".encode('utf-8'))
+            self.wfile.flush()
+            if self.mock.chunk_delay_ms:
+                time.sleep(self.mock.chunk_delay_ms / 1000.0)
+
+    def _serve_cassette(self, model, method, body, query):
+        key = _cassette_key(model, method, body)
+        exchange = self.mock.cassette.get(key)
+        if exchange is None and self.mock.mode == "record":
+            exchange = self._forward(key, model, method, body, query)
+        if exchange is None:
+            self.mock.count("replay_misses")
+            self._send_error(404, f"No recorded response for {method} ({key[:12]})")
+            return
+
+        data = exchange["response"].encode('utf-8')
+        self.send_response(exchange["status"])
+        self.send_header("Content-Type", exchange.get("content_type", "application/json"))
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _forward(self, key, model, method, body, query):
+        import requests
+
+        params = {name: values[0] for name, values in query.items()}
+        response = requests.post(f"{self.mock.upstream}/models/{model}:{method}",
+                                 params=params, json=body, timeout=(5, 120))
+        exchange = {
+            "key": key,
+            "model": model,
+            "method": method,
+            "request": body,
+            "status": response.status_code,
+            "content_type": response.headers.get("Content-Type", "application/json"),
+            "response": response.text
+        }
+        if response.status_code == 200:
+            self.mock.cassette.record(exchange)
+        return exchange
+
+
+def _text_of(request):
+    """Concatenate the text parts of an embed or generate request"""
+    if "content" in request:
+        parts = request["content"].get("parts", [])
+    else:
+        parts = [part for content in request.get("contents", []) for part in content.get("parts", [])]
+    return "".join(part.get("text", "") for part in parts)
+
+
+def _candidate(text):
+    return {"candidates": [{"content": {"parts": [{"text": text}], "role": "model"}}]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Gemini-compatible mock server")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='Fixed delay before every response')
+    parser.add_argument('--jitter-ms', type=float, default=0.0, help='Extra random delay (0..N ms)')
+    parser.add_argument('--chunk-delay-ms', type=float, default=0.0, help='Delay between streamed chunks')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests that fail')
+    parser.add_argument('--error-status', type=int, default=503, help='HTTP status for injected failures')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for latency jitter and error injection')
+    parser.add_argument('--mode', choices=['mock', 'record', 'replay'], default='mock')
+    parser.add_argument('--cassette', type=str, help='JSONL file for record/replay')
+    args = parser.parse_args()
+
+    server = MockGeminiServer(args.host, args.port, args.latency_ms, args.jitter_ms,
+                              args.chunk_delay_ms, args.error_rate, args.error_status,
+                              args.seed, args.mode, args.cassette)
+    print(f"🧪 Mock Gemini ({args.mode} mode) listening on {server.base_url}")
+    print(f"   export GEMINI_BASE_URL={server.base_url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Mock Gemini stopped")
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
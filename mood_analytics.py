@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Smart Notes Mood Analytics - Vectorized time-series over mood and energy
+
+Notes are turned once into columnar NumPy arrays (timestamp seconds, mood,
+energy; NaN where a rating is missing). Daily/weekly resampling, rolling
+averages, hour-of-day x weekday heatmaps, streaks and the mood-energy
+correlation are then bincount/cumsum operations over those columns, which
+stay in the millisecond range even for a million entries.
+"""
+
+from datetime import date
+
+import numpy as np
+
+from aggregates import metric_value
+
+SECONDS_PER_DAY = 86400
+WEEKDAYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+GOOD_MOOD = 7
+
+
+def _timestamp(created):
+    """Seconds since the epoch for an ISO timestamp, or None if it doesn't parse"""
+    try:
+        return int(np.datetime64(created[:19], "s").astype(np.int64))
+    except ValueError:
+        return None
+
+
+class MoodSeries:
+    """Columnar view of the notes, sorted by creation time"""
+
+    def __init__(self, timestamps, mood, energy):
+        order = np.argsort(timestamps, kind="stable")
+        self.timestamps = np.asarray(timestamps, dtype=np.int64)[order]
+        self.mood = np.asarray(mood, dtype=float)[order]
+        self.energy = np.asarray(energy, dtype=float)[order]
+        # Day numbers since 1970-01-01 (local, as the notes store naive local times)
+        self.days = self.timestamps // SECONDS_PER_DAY
+        self._valid = {"mood": ~np.isnan(self.mood), "energy": ~np.isnan(self.energy),
+                       None: np.ones(len(self.timestamps), dtype=bool)}
+
+    @classmethod
+    def from_notes(cls, notes):
+        rows = [note for note in notes.values() if note.get("created") and isinstance(note["created"], str)]
+        try:
+            timestamps = np.array([note["created"][:19] for note in rows], dtype="datetime64[s]").astype(np.int64)
+        except ValueError:
+            # A malformed timestamp ("2025-13-01...") must not sink the whole series; skip just those notes
+            parsed = [(_timestamp(note["created"]), note) for note in rows]
+            rows = [note for stamp, note in parsed if stamp is not None]
+            timestamps = np.array([stamp for stamp, _ in parsed if stamp is not None], dtype=np.int64)
+        mood = [metric_value(note, "mood") for note in rows]
+        energy = [metric_value(note, "energy_level") for note in rows]
+        return cls(timestamps,
+                   np.array([np.nan if value is None else value for value in mood], dtype=float),
+                   np.array([np.nan if value is None else value for value in energy], dtype=float))
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def column(self, metric):
+        """The values for "mood" or "energy"; None counts entries of any kind"""
+        if metric is None:
+            return np.ones(len(self), dtype=float)
+        return self.mood if metric == "mood" else self.energy
+
+    def valid(self, metric):
+        """Boolean mask of entries that have a value for metric"""
+        return self._valid[metric]
+
+
+def _period_index(days, freq):
+    """Map day numbers to period numbers; weeks start on Monday (1970-01-01 was a Thursday)"""
+    if freq == "week":
+        return (days + 3) // 7
+    return days
+
+
+def _period_start(periods, freq):
+    days = periods * 7 - 3 if freq == "week" else periods
+    return days.astype("datetime64[D]")
+
+
+def resample(series, metric="mood", freq="day"):
+    """Per-day or per-week sum, count and mean over a continuous range (empty periods are NaN)"""
+    if not len(series):
+        empty = np.array([], dtype=float)
+        return {"periods": np.array([], dtype="datetime64[D]"), "sum": empty, "count": empty, "mean": empty}
+    values = series.column(metric)
+    periods = _period_index(series.days, freq)
+    first = periods[0]
+    size = int(periods[-1] - first) + 1
+    valid = series.valid(metric)
+    bins = periods[valid] - first
+    sums = np.bincount(bins, weights=values[valid], minlength=size)
+    counts = np.bincount(bins, minlength=size).astype(float)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = sums / counts
+    return {
+        "periods": _period_start(np.arange(first, first + size), freq),
+        "sum": sums,
+        "count": counts,
+        "mean": means
+    }
+
+
+def rolling_mean(sums, counts, window=7):
+    """Entry-weighted rolling average over the last `window` periods (NaN where there is no data)"""
+    if not len(sums):
+        return np.array([], dtype=float)
+    cumulative_sums = np.concatenate(([0.0], np.cumsum(sums)))
+    cumulative_counts = np.concatenate(([0.0], np.cumsum(counts)))
+    starts = np.maximum(np.arange(1, len(sums) + 1) - window, 0)
+    window_sums = cumulative_sums[1:] - cumulative_sums[starts]
+    window_counts = cumulative_counts[1:] - cumulative_counts[starts]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return window_sums / window_counts
+
+
+def heatmap(series, metric="mood"):
+    """7x24 matrix (weekday x hour) of average values, plus the matching counts"""
+    values = series.column(metric)
+    valid = series.valid(metric)
+    weekday = (series.days[valid] + 3) % 7
+    hour = (series.timestamps[valid] % SECONDS_PER_DAY) // 3600
+    cells = weekday * 24 + hour
+    sums = np.bincount(cells, weights=values[valid], minlength=7 * 24).reshape(7, 24)
+    counts = np.bincount(cells, minlength=7 * 24).reshape(7, 24)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return sums / counts, counts
+
+
+def _runs(active):
+    """(start, length) of every run of True values"""
+    padded = np.concatenate(([0], active.astype(np.int8), [0]))
+    edges = np.flatnonzero(np.diff(padded))
+    starts, ends = edges[::2], edges[1::2]
+    return starts, ends - starts
+
+
+def streaks(series, today=None, good_mood=GOOD_MOOD):
+    """Longest and current runs of consecutive days with entries, and with an average mood >= good_mood"""
+    result = {"longest_journal_streak": 0, "current_journal_streak": 0,
+              "longest_good_mood_streak": 0, "current_good_mood_streak": 0}
+    if not len(series):
+        return result
+    daily = resample(series, None)
+    daily_mood = resample(series, "mood")
+    today_number = (np.datetime64(today or date.today(), "D") - np.datetime64("1970-01-01", "D")).astype(int)
+    last_day = int(series.days[-1])
+
+    for name, active in (("journal", daily["count"] > 0),
+                         ("good_mood", daily_mood["mean"] >= good_mood)):
+        starts, lengths = _runs(active)
+        if not len(lengths):
+            continue
+        result[f"longest_{name}_streak"] = int(lengths.max())
+        # A streak is still "current" if it reaches today or yesterday
+        if active[-1] and today_number - last_day <= 1:
+            result[f"current_{name}_streak"] = int(lengths[-1])
+    return result
+
+
+def correlation(series):
+    """Pearson correlation between mood and energy on entries that have both, or None"""
+    both = series.valid("mood") & series.valid("energy")
+    if both.sum() < 2:
+        return None
+    mood, energy = series.mood[both], series.energy[both]
+    if mood.std() == 0 or energy.std() == 0:
+        return None
+    return float(np.corrcoef(mood, energy)[0, 1])
+
+
+def summarize(series, window=7, today=None):
+    """Everything the Mood Trends and Statistics pages show"""
+    daily = resample(series, "mood", "day")
+    weekly = resample(series, "mood", "week")
+    daily_energy = resample(series, "energy", "day")
+    heat, heat_counts = heatmap(series, "mood")
+    return {
+        "daily": daily,
+        "daily_rolling": rolling_mean(daily["sum"], daily["count"], window),
+        "daily_energy": daily_energy,
+        "weekly": weekly,
+        "weekly_entries": resample(series, None, "week")["count"],
+        "heatmap": heat,
+        "heatmap_counts": heat_counts,
+        "streaks": streaks(series, today),
+        "correlation": correlation(series)
+    }
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Smart Notes Daemon - Keep the notebook warm between CLI commands
+
+Every `python notes_enhanced.py <cmd>` normally re-imports its dependencies,
+re-parses notes.json and, for --relevant-only, rebuilds the passage index. The
+daemon does all of that once. It holds a SmartNotes (notes, passage index and
+embedding matrix), the shared Gemini HTTP pool and the imported AI stack, and
+serves CLI commands over a Unix domain socket. notes_enhanced.py checks for
+the socket before importing anything. When the daemon answers, the CLI just
+streams the output back. Otherwise it runs the command in-process as before.
+
+Commands run one at a time, because their output is captured by redirecting
+stdout. The notebook is reloaded when notes.json changes underneath the daemon
+(Streamlit app, reindex, an in-process CLI run). Interactive commands, and
+clients started from another working directory (DATA_DIR is relative), fall
+back to in-process mode.
+
+    python notes_daemon.py            # serve until Ctrl+C or --stop
+    python notes_daemon.py --status
+    python notes_daemon.py --stop
+"""
+
+import argparse
+import io
+import json
+import os
+import socket
+import socketserver
+import sys
+import threading
+import time
+from contextlib import redirect_stderr, redirect_stdout
+
+from config import NOTES_DAEMON_SOCKET
+
+PROTOCOL_VERSION = 1
+COMMANDS_WITHOUT_NOTES = ("cache", "reindex")
+IN_MEMORY_WRITES = ("add", "update", "delete")   # keep the in-memory notebook and the file in step
+OUTPUT_BUFFER_BYTES = 64 * 1024
+
+
+def _request(payload, socket_path=NOTES_DAEMON_SOCKET):
+    """Open a connection, send one JSON request line; returns (socket, reader, header) or None"""
+    if not hasattr(socket, "AF_UNIX"):
+        return None
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        client.connect(str(socket_path))
+        client.sendall(json.dumps(payload).encode('utf-8') + b"\n")
+        reader = client.makefile('rb')
+        header = json.loads(reader.readline() or b"{}")
+    except (OSError, ValueError):
+        client.close()
+        return None
+    return client, reader, header
+
+
+def forward_to_daemon(argv, socket_path=NOTES_DAEMON_SOCKET):
+    """Run a CLI command in the daemon and copy its output to stdout.
+
+    Returns False when the caller should run the command itself: no daemon is
+    listening, --no-daemon / NOTES_NO_DAEMON was given, or the daemon declined.
+    """
+    if "--no-daemon" in argv or os.getenv('NOTES_NO_DAEMON'):
+        return False
+    response = _request({"argv": argv, "cwd": os.getcwd(), "version": PROTOCOL_VERSION}, socket_path)
+    if response is None:
+        return False
+    client, reader, header = response
+    with client:
+        if not header.get("ok"):
+            return False
+        out = sys.stdout.buffer
+        try:
+            for chunk in iter(lambda: reader.read1(OUTPUT_BUFFER_BYTES), b""):
+                out.write(chunk)
+                out.flush()
+        except OSError as e:
+            print(f"\n❌ Lost connection to notes daemon: {e}")
+    return True
+
+
+class _SocketWriter(io.TextIOBase):
+    """Text stream that buffers printed output and sends it to the client"""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self._buffer = []
+        self._size = 0
+
+    def writable(self):
+        return True
+
+    def write(self, text):
+        self._buffer.append(text)
+        self._size += len(text)
+        if self._size >= OUTPUT_BUFFER_BYTES:
+            self.flush()
+        return len(text)
+
+    def flush(self):
+        # Streaming answers call flush() per chunk, so they reach the client as they arrive
+        if self._buffer:
+            data = "".join(self._buffer).encode('utf-8')
+            self._buffer = []
+            self._size = 0
+            self.conn.sendall(data)
+
+
+class NotesDaemon:
+    """Holds a warm SmartNotes and runs parsed CLI commands against it"""
+
+    def __init__(self, socket_path=NOTES_DAEMON_SOCKET):
+        from llm_cache import notebook_version
+        from notes_enhanced import SmartNotes, build_parser, run_command
+
+        self.socket_path = socket_path
+        self.cwd = os.getcwd()
+        self.started_at = time.time()
+        self.commands_served = 0
+        self._notebook_version = notebook_version
+        self._run_command = run_command
+        self.parser = build_parser()
+        self.notes = SmartNotes()
+        self.version = notebook_version(self.notes.notes_file)
+        self._lock = threading.Lock()
+        self.server = None
+
+    def warm_up(self):
+        """Import the AI stack and open the HTTP pool now rather than on the first ask"""
+        from gemini_client import get_client
+        get_client()
+        try:
+            import numpy  # noqa: F401
+            from sklearn.metrics.pairwise import cosine_similarity  # noqa: F401
+        except ImportError as e:
+            print(f"❌ Could not preload the AI stack: {e}")
+
+    def _refresh(self):
+        version = self._notebook_version(self.notes.notes_file)
+        if version != self.version:
+            self.notes.notes = self.notes.load_notes()
+            self.version = version
+
+    def status(self):
+        return {
+            "ok": True,
+            "pid": os.getpid(),
+            "cwd": self.cwd,
+            "notes": len(self.notes.notes),
+            "commands_served": self.commands_served,
+            "uptime_s": round(time.time() - self.started_at, 1)
+        }
+
+    def _parse(self, argv):
+        """Parsed args, or None if argparse wants to print help/errors (the client does that itself)"""
+        try:
+            with redirect_stdout(io.StringIO()), redirect_stderr(io.StringIO()):
+                return self.parser.parse_args(argv)
+        except SystemExit:
+            return None
+
+    def handle(self, conn, request):
+        control = request.get("control")
+        if control == "status":
+            conn.sendall(json.dumps(self.status()).encode('utf-8') + b"\n")
+            return
+        if control == "stop":
+            conn.sendall(json.dumps({"ok": True, "stopping": True}).encode('utf-8') + b"\n")
+            threading.Thread(target=self.server.shutdown, daemon=True).start()
+            return
+
+        if request.get("version") != PROTOCOL_VERSION:
+            return self._decline(conn, "protocol version mismatch")
+        if os.path.realpath(request.get("cwd", "")) != os.path.realpath(self.cwd):
+            return self._decline(conn, "different working directory")
+
+        with self._lock:
+            args = self._parse(request.get("argv", []))
+            if args is None:
+                return self._decline(conn, "arguments")
+            if args.command == "add" and not (args.title and args.content):
+                return self._decline(conn, "interactive command")
+
+            conn.sendall(b'{"ok": true}\n')
+            writer = _SocketWriter(conn)
+            with redirect_stdout(writer):
+                self._refresh()
+                try:
+                    notes = None if args.command in COMMANDS_WITHOUT_NOTES else self.notes
+                    self._run_command(args, notes)
+                except Exception as e:
+                    print(f"❌ Daemon error: {e}")
+            if args.command in IN_MEMORY_WRITES:
+                # Our own save: the in-memory notebook already matches the file, no need to re-read it
+                self.version = self._notebook_version(self.notes.notes_file)
+            self.commands_served += 1
+            writer.flush()
+
+    def _decline(self, conn, reason):
+        conn.sendall(json.dumps({"ok": False, "reason": reason}).encode('utf-8') + b"\n")
+
+    def serve_forever(self):
+        daemon = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                try:
+                    request = json.loads(self.rfile.readline() or b"{}")
+                    daemon.handle(self.connection, request)
+                except (OSError, ValueError):
+                    pass  # client went away (e.g. output piped into head) or sent garbage
+
+        socket_path = str(self.socket_path)
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)  # stale socket from a daemon that didn't shut down cleanly
+        self.server = socketserver.ThreadingUnixStreamServer(socket_path, Handler)
+        self.server.daemon_threads = True
+        os.chmod(socket_path, 0o600)
+        try:
+            self.server.serve_forever()
+        finally:
+            self.server.server_close()
+            if os.path.exists(socket_path):
+                os.unlink(socket_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Keep Smart Notes warm for fast CLI commands")
+    parser.add_argument('--status', action='store_true', help='Show whether a daemon is running')
+    parser.add_argument('--stop', action='store_true', help='Stop the running daemon')
+    parser.add_argument('--no-warm-up', action='store_true', help='Skip preloading the AI stack')
+    args = parser.parse_args()
+
+    if not hasattr(socket, "AF_UNIX"):
+        print("❌ Unix domain sockets are not available on this platform")
+        return
+
+    running = _request({"control": "status"})
+    if args.status or args.stop:
+        if running is None:
+            print("💤 No notes daemon running")
+            return
+        client, _, header = running
+        client.close()
+        if args.stop:
+            stopped = _request({"control": "stop"})
+            if stopped is not None:
+                stopped[0].close()
+            print(f"🛑 Stopped notes daemon (pid {header.get('pid')})")
+        else:
+            print(f"🛎️ Notes daemon running (pid {header.get('pid')}) in {header.get('cwd')}")
+            print(f"   {header.get('notes')} notes, {header.get('commands_served')} commands served, "
+                  f"up {header.get('uptime_s')}s")
+        return
+    if running is not None:
+        running[0].close()
+        print(f"❌ A notes daemon is already listening on {NOTES_DAEMON_SOCKET}")
+        return
+
+    started = time.perf_counter()
+    daemon = NotesDaemon()
+    if not args.no_warm_up:
+        daemon.warm_up()
+    print(f"🛎️ Notes daemon ready in {time.perf_counter() - started:.1f}s with {len(daemon.notes.notes)} notes")
+    print(f"   Listening on {NOTES_DAEMON_SOCKET} (Ctrl+C to stop)")
+    try:
+        daemon.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    print("👋 Notes daemon stopped")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,43 +1,140 @@
 #!/usr/bin/env python3
 """
 Smart Notes CLI - A powerful note-taking tool with AI assistance
+
+Startup matters here: list/add/delete should not pay for the AI stack. numpy,
+scikit-learn and requests are only imported by the code paths that use them
+(see chunking, semantic_cache and gemini_client), the reindex process pool and
+the local question router are imported on demand, and the notebook is only
+loaded by commands that read it. bench_startup.py guards this. When
+notes_daemon.py is running, the CLI skips all of that and just forwards the
+command to the warm daemon.
 """
 
+import sys
+
+if __name__ == "__main__":
+    # Thin-client fast path: if notes_daemon.py is running, hand it the command before importing anything else
+    from notes_daemon import forward_to_daemon
+    if forward_to_daemon(sys.argv[1:]):
+        sys.exit(0)
+
 import json
 import os
-import sys
-import requests
-import numpy as np
 from datetime import datetime
 from pathlib import Path
-from sklearn.metrics.pairwise import cosine_similarity
 import argparse
 import hashlib
+import itertools
+import threading
+import time
 import uuid
 
-from config import GEMINI_API_KEY, NOTES_FILE
+from chunking import PassageIndex
+from config import GEMINI_API_KEY, NOTES_FILE, REINDEX_BATCH_SIZE
+from context_builder import ContextBuilder, iter_notes
+from gemini_client import GeminiError, get_client
+from instrumentation import span, traced
+from llm_cache import cached_generate_content, cached_stream_content, get_response_cache, notebook_version
+from semantic_cache import get_semantic_cache
+
+# Bump when the ask prompt template changes so cached answers are not reused
+ASK_PROMPT_VERSION = "ask-v1"
+
+# list/search orderings: (sort key, newest/largest first); "file" streams in stored order
+NOTE_SORTS = {
+    "file": None,
+    "newest": (lambda note: note.get("created", ""), True),
+    "oldest": (lambda note: note.get("created", ""), False),
+    "updated": (lambda note: note.get("updated", note.get("created", "")), True),
+    "title": (lambda note: note.get("title", "").lower(), False)
+}
+OUTPUT_FORMATS = ("text", "jsonl", "tsv")
+TSV_COLUMNS = ("id", "title", "created", "updated", "tags", "content")
+OUTPUT_BUFFER_CHARS = 1 << 16
+_JSONL_ENCODER = json.JSONEncoder(ensure_ascii=False)  # json.dumps(...) with options builds a new encoder per call
+
+
+def write_buffered(lines, stream=None, buffer_chars=OUTPUT_BUFFER_CHARS):
+    """Write an iterable of strings in large chunks instead of one syscall per print"""
+    stream = stream or sys.stdout
+    pending = []
+    size = 0
+    for line in lines:
+        pending.append(line)
+        size += len(line)
+        if size >= buffer_chars:
+            stream.write("".join(pending))
+            pending = []
+            size = 0
+    if pending:
+        stream.write("".join(pending))
+    stream.flush()
+
+
+def _tsv_field(value):
+    return str(value).replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+
+
+def format_note_lines(notes_iter, output_format, preview_chars=100):
+    """Yield output lines for (note_id, note) pairs in text, jsonl or tsv format"""
+    if output_format == "jsonl":
+        for note_id, note in notes_iter:
+            yield _JSONL_ENCODER.encode({"id": note_id, **note}) + "\n"
+    elif output_format == "tsv":
+        yield "\t".join(TSV_COLUMNS) + "\n"
+        for note_id, note in notes_iter:
+            row = (note_id, note.get("title", ""), note.get("created", ""), note.get("updated", note.get("created", "")),
+                   ",".join(note.get("tags", [])), note.get("content", ""))
+            yield "\t".join(_tsv_field(value) for value in row) + "\n"
+    else:
+        for note_id, note in notes_iter:
+            created = datetime.fromisoformat(note["created"]).strftime("%Y-%m-%d %H:%M")
+            updated_str = note.get("updated", note["created"])  # fallback to created if updated missing
+            updated = datetime.fromisoformat(updated_str).strftime("%Y-%m-%d %H:%M")
+            tags = ", ".join(note.get("tags", []))
+            content = note['content']
+            yield f"ID: {note_id}\nTitle: {note['title']}\nCreated: {created}\nUpdated: {updated}\n"
+            if tags:
+                yield f"Tags: {tags}\n"
+            yield f"Content: {content[:preview_chars]}{'...' if len(content) > preview_chars else ''}\n"
+            yield "-" * 50 + "\n"
 
 
 class SmartNotes:
-    def __init__(self):
+    def __init__(self, notes=None, aggregates=None, rollup=None):
         self.notes_file = NOTES_FILE
-        self.notes = self.load_notes()
+        # Callers that already hold the parsed notebook (api_server.py) pass it in instead of re-reading it,
+        # along with its aggregates and daily rollup if they keep those in step with it
+        self.notes = notes if notes is not None else self.load_notes()
+        self.passage_index = None
+        self._passage_index_version = None
+        self._index_lock = threading.Lock()
+        self._sort_indexes = {}  # sort name -> (notebook version, ordered note ids)
+        self._stat_indexes = (None, aggregates, rollup) if aggregates is not None else None
+        self._stat_lock = threading.Lock()  # separate from _index_lock so statistics never wait on embeddings
     
     def load_notes(self):
         """Load notes from JSON file, create empty dict if file doesn't exist"""
-        if self.notes_file.exists():
-            try:
-                with open(self.notes_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except (json.JSONDecodeError, FileNotFoundError):
-                return {}
-        return {}
+        with span("notes.load_notes") as sp:
+            if self.notes_file.exists():
+                try:
+                    with open(self.notes_file, 'r', encoding='utf-8') as f:
+                        notes = json.load(f)
+                    sp.file_read(self.notes_file)
+                    return notes
+                except (json.JSONDecodeError, FileNotFoundError):
+                    return {}
+            return {}
     
     def save_notes(self):
         """Save notes to JSON file"""
-        with open(self.notes_file, 'w', encoding='utf-8') as f:
-            json.dump(self.notes, f, indent=2, ensure_ascii=False)
+        with span("notes.save_notes") as sp:
+            with open(self.notes_file, 'w', encoding='utf-8') as f:
+                json.dump(self.notes, f, indent=2, ensure_ascii=False)
+            sp.file_written(self.notes_file)
     
+    @traced("notes.add_note")
     def add_note(self, title, content, tags=None):
         """Add a new note with timestamp and tags"""
         timestamp = datetime.now().isoformat()
@@ -56,6 +153,7 @@ class SmartNotes:
         print(f"✅ Note '{title}' saved with ID: {note_id}")
         return note_id
     
+    @traced("notes.update_note")
     def update_note(self, note_id, title=None, content=None, tags=None):
         """Update an existing note"""
         if note_id not in self.notes:
@@ -74,6 +172,7 @@ class SmartNotes:
         print(f"✅ Note '{self.notes[note_id]['title']}' updated")
         return True
     
+    @traced("notes.delete_note")
     def delete_note(self, note_id):
         """Delete a note by ID"""
         if note_id in self.notes:
@@ -86,146 +185,246 @@ class SmartNotes:
             print(f"❌ Note with ID {note_id} not found")
             return False
     
-    def list_notes(self, tag_filter=None):
-        """Display all notes, optionally filtered by tag"""
+    def sorted_ids(self, sort="file"):
+        """Note ids in the requested order; sorted orders are cached until the notebook changes"""
+        if NOTE_SORTS[sort] is None:
+            return self.notes.keys()
+        version = notebook_version(self.notes_file)
+        cached = self._sort_indexes.get(sort)
+        if cached is None or cached[0] != version or len(cached[1]) != len(self.notes):
+            key, reverse = NOTE_SORTS[sort]
+            notes = self.notes
+            cached = (version, sorted(notes, key=lambda note_id: key(notes[note_id]), reverse=reverse))
+            self._sort_indexes[sort] = cached
+        return cached[1]
+
+    def iter_notes(self, sort="file", tag_filter=None, query=None):
+        """Lazily yield (note_id, note) pairs matching an optional tag and search query"""
+        tag_filter = tag_filter.lower() if tag_filter else None
+        query_lower = query.lower() if query else None
+        notes = self.notes
+        for note_id in self.sorted_ids(sort):
+            note = notes.get(note_id)
+            if note is None:
+                continue
+            if tag_filter and tag_filter not in [t.lower() for t in note.get("tags", [])]:
+                continue
+            if query_lower and not (query_lower in note['title'].lower() or
+                                    query_lower in note['content'].lower() or
+                                    any(query_lower in tag.lower() for tag in note.get("tags", []))):
+                continue
+            yield note_id, note
+
+    def _page(self, sort, tag_filter, query, offset, limit):
+        return itertools.islice(self.iter_notes(sort, tag_filter, query), offset,
+                                offset + limit if limit is not None else None)
+
+    @traced("notes.list_notes")
+    def list_notes(self, tag_filter=None, limit=None, offset=0, sort="file", output_format="text"):
+        """Stream notes, optionally filtered by tag, paged and in text, jsonl or tsv format"""
+        if output_format != "text":
+            write_buffered(format_note_lines(self._page(sort, tag_filter, None, offset, limit), output_format))
+            return
         if not self.notes:
             print("📝 No notes found. Add some with: python notes.py add")
             return
         
-        filtered_notes = self.notes.items()
         if tag_filter:
-            filtered_notes = [(id, note) for id, note in self.notes.items() 
-                            if tag_filter.lower() in [t.lower() for t in note.get("tags", [])]]
-            print(f"📚 Found {len(filtered_notes)} notes with tag '{tag_filter}':")
+            total = sum(1 for _ in self.iter_notes("file", tag_filter))
+            print(f"📚 Found {total} notes with tag '{tag_filter}':")
         else:
-            print(f"📚 Found {len(self.notes)} notes:")
+            total = len(self.notes)
+            print(f"📚 Found {total} notes:")
         print("-" * 50)
-        
-        for note_id, note in filtered_notes:
-            created = datetime.fromisoformat(note["created"]).strftime("%Y-%m-%d %H:%M")
-            updated_str = note.get("updated", note["created"])  # fallback to created if updated missing
-            updated = datetime.fromisoformat(updated_str).strftime("%Y-%m-%d %H:%M")
-            tags = ", ".join(note.get("tags", []))
-            
-            print(f"ID: {note_id}")
-            print(f"Title: {note['title']}")
-            print(f"Created: {created}")
-            print(f"Updated: {updated}")
-            if tags:
-                print(f"Tags: {tags}")
-            print(f"Content: {note['content'][:100]}{'...' if len(note['content']) > 100 else ''}")
-            print("-" * 50)
+        write_buffered(format_note_lines(self._page(sort, tag_filter, None, offset, limit), "text"))
+        self._print_page_hint(total, offset, limit)
     
-    def search_notes(self, query):
-        """Simple search through note titles and content"""
-        matches = []
-        query_lower = query.lower()
-        
-        for note_id, note in self.notes.items():
-            if (query_lower in note['title'].lower() or 
-                query_lower in note['content'].lower() or
-                any(query_lower in tag.lower() for tag in note.get("tags", []))):
-                matches.append((note_id, note))
-        
-        if matches:
-            print(f"🔍 Found {len(matches)} matches for '{query}':")
+    @traced("notes.search_notes")
+    def search_notes(self, query, limit=None, offset=0, sort="file", output_format="text"):
+        """Simple search through note titles, content and tags"""
+        if output_format != "text":
+            write_buffered(format_note_lines(self._page(sort, None, query, offset, limit), output_format))
+            return
+        total = sum(1 for _ in self.iter_notes("file", query=query))
+        if total:
+            print(f"🔍 Found {total} matches for '{query}':")
             print("-" * 50)
-            for note_id, note in matches:
-                print(f"ID: {note_id} - {note['title']}")
-                tags = ", ".join(note.get("tags", []))
-                if tags:
-                    print(f"Tags: {tags}")
-                print(f"Content: {note['content'][:150]}{'...' if len(note['content']) > 150 else ''}")
-                print("-" * 50)
+            lines = (f"ID: {note_id} - {note['title']}\n"
+                     + (f"Tags: {', '.join(note['tags'])}\n" if note.get("tags") else "")
+                     + f"Content: {note['content'][:150]}{'...' if len(note['content']) > 150 else ''}\n"
+                     + "-" * 50 + "\n"
+                     for note_id, note in self._page(sort, None, query, offset, limit))
+            write_buffered(lines)
+            self._print_page_hint(total, offset, limit)
         else:
             print(f"❌ No matches found for '{query}'")
     
+    def _print_page_hint(self, total, offset, limit):
+        if offset >= total > 0:
+            print(f"📄 Showing 0 of {total}: offset {offset} is past the end (use --offset below {total})")
+            return
+        shown_end = total if limit is None else min(total, offset + limit)
+        if offset or shown_end < total:
+            print(f"📄 Showing {min(offset + 1, total)}-{shown_end} of {total} (use --offset/--limit for more)")
+    
+    def _note_entries(self, notes_iter):
+        """Yield context builder entries (id, prefix, content, suffix) for notes"""
+        for note_id, note in notes_iter:
+            prefix = [f"ID: {note_id}\n", f"Title: {note['title']}\n"]
+            if note.get("tags"):
+                prefix.append(f"Tags: {', '.join(note['tags'])}\n")
+            prefix.append("Content: ")
+            yield note_id, "".join(prefix), note['content'], f"\nCreated: {note['created']}\n\n"
+    
+    def build_notes_context(self, order="recency"):
+        """Build a token-budgeted context of all notes, newest first by default"""
+        builder = ContextBuilder(header="My Notes Collection:\n\n")
+        return builder.extend(self._note_entries(iter_notes(self.notes, order))).build()
+    
     def get_all_content(self):
         """Get all notes content for AI analysis"""
         if not self.notes:
             return "No notes available."
-        content = "My Notes Collection:\n\n"
-        for note_id, note in self.notes.items():
-            content += f"ID: {note_id}\n"
-            content += f"Title: {note['title']}\n"
-            if note.get("tags"):
-                content += f"Tags: {', '.join(note['tags'])}\n"
-            content += f"Content: {note['content']}\n"
-            content += f"Created: {note['created']}\n\n"
-        return content
+        return self.build_notes_context().text
 
+    @traced("notes.get_embedding")
     def get_embedding(self, text, api_key):
         """Get embedding vector for text using Gemini"""
         try:
-            url = f"https://generativelanguage.googleapis.com/v1beta/models/text-embedding-004:embedContent?key={api_key}"
-            payload = {
-                "model": "models/text-embedding-004",
-                "content": {
-                    "parts": [{"text": text}]
-                }
-            }
-            response = requests.post(url, json=payload)
-            if response.status_code == 200:
-                return response.json()['embedding']['values']
+            return get_client().embed_content(text, api_key=api_key)
+        except GeminiError:
             return None
         except Exception as e:
             print(f"Embedding error: {e}")
             return None
     
-    def find_relevant_notes(self, question, api_key, top_k=3):
-        """Find most relevant notes using semantic similarity"""
+    @traced("notes.find_relevant_passages")
+    def find_relevant_passages(self, question, api_key, top_k=5, verbose=True, question_embedding=None):
+        """Find the most relevant note passages using semantic similarity"""
         if not self.notes:
             return []
         
-        print("🔍 Finding relevant notes...")
+        if verbose:
+            print("🔍 Finding relevant passages...")
         
-        # Get question embedding
-        question_embedding = self.get_embedding(question, api_key)
+        # Get question embedding (reuse the one computed for the semantic cache)
+        if question_embedding is None:
+            question_embedding = self.get_embedding(question, api_key)
         if not question_embedding:
-            # Fallback to all notes if embedding fails
-            return list(self.notes.items())
+            return None
         
-        similarities = []
-        for note_id, note in self.notes.items():
-            # Combine title, content, and tags for better matching
-            note_text = f"{note['title']} {note['content']} {' '.join(note.get('tags', []))}"
-            note_embedding = self.get_embedding(note_text, api_key)
-            
-            if note_embedding:
-                # Calculate cosine similarity
-                similarity = cosine_similarity(
-                    [question_embedding], 
-                    [note_embedding]
-                )[0][0]
-                similarities.append((note_id, note, similarity))
+        self.ensure_passage_index(api_key)
         
-        # Sort by similarity and return top_k
-        similarities.sort(key=lambda x: x[2], reverse=True)
-        relevant_notes = [(note_id, note) for note_id, note, sim in similarities[:top_k]]
+        relevant_passages = []
+        for passage, similarity in self.passage_index.search(question_embedding, top_k):
+            relevant_passages.append(dict(passage, similarity=similarity))
         
-        print(f"📋 Found {len(relevant_notes)} most relevant notes")
-        return relevant_notes
+        if verbose:
+            print(f"📋 Found {len(relevant_passages)} most relevant passages")
+        return relevant_passages
     
-    def ask_ai(self, question, use_relevant_only=False):
-        """Ask AI about your notes using Gemini API"""
-        api_key = GEMINI_API_KEY
+    @traced("notes.ensure_passage_index")
+    def ensure_passage_index(self, api_key):
+        """Embed passages individually so long notes are not diluted; rebuilt only when notes change"""
+        with self._index_lock:
+            if self.passage_index is None:
+                self.passage_index = PassageIndex()
+            version = notebook_version(self.notes_file)
+            if self._passage_index_version != version:
+                self.passage_index.build(
+                    self.notes,
+                    lambda text: self.get_embedding(text, api_key),
+                    lambda texts: get_client().batch_embed_contents(texts, api_key=api_key)
+                )
+                self._passage_index_version = version
+        return self.passage_index
+    
+    def find_relevant_notes(self, question, api_key, top_k=3):
+        """Find most relevant notes, ranked by their best matching passage"""
+        if not self.notes:
+            return []
         
+        passages = self.find_relevant_passages(question, api_key, top_k=top_k * 3)
+        if passages is None:
+            # Fallback to all notes if embedding fails
+            return list(self.notes.items())
+        
+        relevant_notes = []
+        seen = set()
+        for passage in passages:
+            note_id = passage["note_id"]
+            if note_id in self.notes and note_id not in seen:
+                seen.add(note_id)
+                relevant_notes.append((note_id, self.notes[note_id]))
+        
+        print(f"📋 Found {len(relevant_notes[:top_k])} most relevant notes")
+        return relevant_notes[:top_k]
+    
+    def _stream_answer(self, prompt, api_key):
+        """Print the AI answer as it streams in and return the full text"""
+        started = time.perf_counter()
+        chunks = []
+        for chunk in cached_stream_content(
+            prompt, ASK_PROMPT_VERSION, notebook_version(self.notes_file), api_key=api_key
+        ):
+            if not chunks:
+                print(f"⚡ First token after {time.perf_counter() - started:.2f}s")
+                print("-" * 50)
+            chunks.append(chunk)
+            sys.stdout.write(chunk)
+            sys.stdout.flush()
+        print("\n" + "-" * 50)
+        return "".join(chunks)
+    
+    def _semantic_lookup(self, question, use_relevant_only, api_key):
+        """Embed the question and look for a near-duplicate answered before; returns (vector, hit)"""
+        vector = self.get_embedding(question, api_key)
+        if not vector:
+            return None, None
+        cache = get_semantic_cache()
+        version = notebook_version(self.notes_file)
+        cache.invalidate_stale(version)
+        scope = "relevant" if use_relevant_only else "all"
+        return vector, cache.lookup(vector, version, scope)
+    
+    def _remember_answer(self, question, vector, ai_response, use_relevant_only):
+        """Keep a structured answer so reworded versions of the question can reuse it"""
+        if vector:
+            scope = "relevant" if use_relevant_only else "all"
+            get_semantic_cache().put(question, vector, ai_response, notebook_version(self.notes_file), scope)
+    
+    def _build_ask_prompt(self, question, use_relevant_only, api_key, verbose=True, question_embedding=None):
+        """Build the ask prompt; returns (prompt, context) where context may be None"""
+        context = None
+        notes_context = None
         if use_relevant_only:
-            # Find only relevant notes for the question
-            relevant_notes = self.find_relevant_notes(question, api_key)
-            if relevant_notes:
-                notes_context = "Relevant Notes:\n\n"
-                for note_id, note in relevant_notes:
-                    notes_context += f"ID: {note_id}\n"
-                    notes_context += f"Title: {note['title']}\n"
+            # Find only the relevant passages for the question, best first
+            relevant_passages = self.find_relevant_passages(
+                question, api_key, verbose=verbose, question_embedding=question_embedding
+            )
+            if relevant_passages:
+                builder = ContextBuilder(header="Relevant Passages:\n\n")
+                for passage in relevant_passages:
+                    note = self.notes[passage["note_id"]]
+                    prefix = [f"ID: {passage['note_id']}\n", f"Title: {note['title']}\n"]
                     if note.get("tags"):
-                        notes_context += f"Tags: {', '.join(note['tags'])}\n"
-                    notes_context += f"Content: {note['content']}\n\n"
-            else:
+                        prefix.append(f"Tags: {', '.join(note['tags'])}\n")
+                    prefix.append("Passage: ")
+                    builder.add(passage["note_id"], "".join(prefix), passage["text"], "\n\n")
+                context = builder.build()
+            elif relevant_passages is not None:
                 notes_context = "No relevant notes found."
-        else:
-            # Use all notes
-            notes_context = self.get_all_content()
+        
+        if context is None and notes_context is None:
+            # Use all notes (also the fallback when embedding fails)
+            if self.notes:
+                context = self.build_notes_context()
+            else:
+                notes_context = "No notes available."
+        if context is not None:
+            notes_context = context.text
+            if verbose and context.omitted_ids:
+                print(f"📏 Context budget reached: {len(context.omitted_ids)} older notes left out")
             
         prompt = f"""Based on these notes, analyze the question and respond with JSON in this exact format:
 {{
@@ -240,57 +439,188 @@ Notes: {notes_context}
 Question: {question}
 
 Respond ONLY with valid JSON, no other text."""
+        return prompt, context
+    
+    def _answer_locally(self, question):
+        """Local router answer from the running aggregates and daily rollup (built once per notebook version)"""
+        from intent_router import answer_locally
+
+        with self._stat_lock:
+            version = notebook_version(self.notes_file)
+            if self._stat_indexes is None or self._stat_indexes[0] not in (None, version):
+                from aggregates import NoteAggregates
+                from daily_rollup import DailyRollup
+
+                rollup = DailyRollup()
+                if rollup.notes_version != version:
+                    rollup.rebuild(self.notes)
+                self._stat_indexes = (version, NoteAggregates.from_notes(self.notes), rollup)
+            _, aggregates, rollup = self._stat_indexes
+        return answer_locally(self.notes, question, aggregates=aggregates, rollup=rollup)
+
+    @traced("notes.answer_question")
+    def answer_question(self, question, use_relevant_only=False, api_key=None, use_local=True):
+        """Answer one question without printing; returns a result dict for batch output"""
+        api_key = api_key or GEMINI_API_KEY
+        started = time.perf_counter()
+        result = {"question": question}
+        local = None
+        if use_local:
+            local = self._answer_locally(question)
+        if local is not None:
+            result.update(local)
+            result["cached"] = False
+            result["latency_ms"] = round((time.perf_counter() - started) * 1000, 1)
+            return result
+        try:
+            vector, hit = self._semantic_lookup(question, use_relevant_only, api_key)
+            if hit is not None:
+                ai_response, matched_question, similarity = hit
+                result.update(ai_response)
+                result.update({"cached": True, "matched_question": matched_question,
+                               "similarity": round(similarity, 4)})
+                result["latency_ms"] = round((time.perf_counter() - started) * 1000, 1)
+                return result
+            prompt, context = self._build_ask_prompt(question, use_relevant_only, api_key, verbose=False,
+                                                     question_embedding=vector)
+            answer, cached = cached_generate_content(
+                prompt, ASK_PROMPT_VERSION, notebook_version(self.notes_file), api_key=api_key
+            )
+            result["cached"] = cached
+            try:
+                ai_response = json.loads(answer)
+                if context is not None:
+                    ai_response['sources_used'] = context.filter_sources(ai_response.get('sources_used', []))
+                self._remember_answer(question, vector, ai_response, use_relevant_only)
+                result.update({
+                    "answer": ai_response.get("answer"),
+                    "confidence": ai_response.get("confidence"),
+                    "sources_used": ai_response.get("sources_used", []),
+                    "suggested_actions": ai_response.get("suggested_actions", []),
+                    "related_topics": ai_response.get("related_topics", [])
+                })
+            except (ValueError, AttributeError):
+                result.update({"answer": answer, "confidence": None, "sources_used": []})
+        except GeminiError as e:
+            result["error"] = f"API Error: {e.status_code}" if e.status_code else str(e)
+        except Exception as e:
+            result["error"] = f"Unexpected error: {e}"
+        result["latency_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        return result
+    
+    def ask_batch(self, questions, output_file, use_relevant_only=False, workers=4, use_local=True):
+        """Answer many questions concurrently (shared rate limit) and write JSONL results"""
+        api_key = GEMINI_API_KEY
+        started = time.perf_counter()
+        print(f"📋 Answering {len(questions)} questions with {workers} workers...")
+        if use_relevant_only and self.notes:
+            # Build the passage index once, before fanning out
+            self.ensure_passage_index(api_key)
+        
+        from concurrent.futures import ThreadPoolExecutor
+
+        failed = 0
+        with open(output_file, 'w', encoding='utf-8') as out, \
+                ThreadPoolExecutor(max_workers=workers) as executor:
+            results = executor.map(
+                lambda question: self.answer_question(question, use_relevant_only, api_key, use_local), questions
+            )
+            for index, result in enumerate(results, 1):
+                out.write(json.dumps(result, ensure_ascii=False) + "\n")
+                out.flush()
+                if "error" in result:
+                    failed += 1
+                    print(f"❌ [{index}/{len(questions)}] {result['question']} - {result['error']}")
+                else:
+                    print(f"✅ [{index}/{len(questions)}] {result['question']} ({result['latency_ms']:.0f} ms)")
+        
+        elapsed = time.perf_counter() - started
+        print(f"✨ Done in {elapsed:.1f}s: {len(questions) - failed} answered, {failed} failed")
+        print(f"📄 Results written to {output_file}")
+    
+    def _print_structured(self, ai_response):
+        """Print an answer in the structured JSON shape"""
+        print("✨ Structured Response:")
+        print("-" * 50)
+        print(f"Answer: {ai_response['answer']}")
+        print(f"Confidence: {ai_response['confidence']:.2%}")
+        print(f"Sources: {', '.join(ai_response['sources_used'])}")
+        if ai_response['suggested_actions']:
+            print(f"Suggestions: {', '.join(ai_response['suggested_actions'])}")
+        if ai_response['related_topics']:
+            print(f"Related: {', '.join(ai_response['related_topics'])}")
+        print("-" * 50)
+    
+    @traced("notes.ask_ai")
+    def ask_ai(self, question, use_relevant_only=False, stream=False, use_local=True):
+        """Ask AI about your notes using Gemini API"""
+        if use_local:
+            started = time.perf_counter()
+            local = self._answer_locally(question)
+            if local is not None:
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                print(f"⚡ Answered locally from your notes in {elapsed_ms:.1f} ms (no AI call needed)")
+                self._print_structured(local)
+                return
+        
+        api_key = GEMINI_API_KEY
+        vector, hit = self._semantic_lookup(question, use_relevant_only, api_key)
+        if hit is not None:
+            ai_response, matched_question, similarity = hit
+            print(f"⚡ Reusing the answer to '{matched_question}' (similarity {similarity:.2f})")
+            self._print_structured(ai_response)
+            return
+        prompt, context = self._build_ask_prompt(question, use_relevant_only, api_key,
+                                                 question_embedding=vector)
 
         try:
-            url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-1.5-flash:generateContent?key={api_key}"
-            payload = {
-                "contents": [{
-                    "parts": [{
-                        "text": prompt
-                    }]
-                }]
-            }
-            headers = {"Content-Type": "application/json"}
             print(f"🤖 Asking AI about: '{question}'")
             print("⏳ Thinking...")
-            response = requests.post(url, json=payload, headers=headers)
-            if response.status_code == 200:
-                result = response.json()
-                if 'candidates' in result and len(result['candidates']) > 0:
-                    answer = result['candidates'][0]['content']['parts'][0]['text']
-                    # Try to parse as JSON first
-                    try:
-                        ai_response = json.loads(answer)
-                        print("✨ Structured Response:")
-                        print("-" * 50)
-                        print(f"Answer: {ai_response['answer']}")
-                        print(f"Confidence: {ai_response['confidence']:.2%}")
-                        print(f"Sources: {', '.join(ai_response['sources_used'])}")
-                        if ai_response['suggested_actions']:
-                            print(f"Suggestions: {', '.join(ai_response['suggested_actions'])}")
-                        if ai_response['related_topics']:
-                            print(f"Related: {', '.join(ai_response['related_topics'])}")
-                        print("-" * 50)
-                    except Exception:
-                        # Fallback to regular text display
-                        print("✨ AI Response:")
-                        print("-" * 50)
-                        print(answer)
-                        print("-" * 50)
-                else:
-                    print("❌ No response from AI")
+            if stream:
+                answer = self._stream_answer(prompt, api_key)
+            else:
+                answer, cached = cached_generate_content(
+                    prompt, ASK_PROMPT_VERSION, notebook_version(self.notes_file), api_key=api_key
+                )
+                if cached:
+                    print("⚡ Answered from cache (no notes changed since last time)")
+            # Try to parse as JSON first
+            try:
+                ai_response = json.loads(answer)
+                if context is not None:
+                    # Only trust sources that were actually in the prompt
+                    ai_response['sources_used'] = context.filter_sources(ai_response.get('sources_used', []))
+                self._remember_answer(question, vector, ai_response, use_relevant_only)
+                self._print_structured(ai_response)
+            except Exception:
+                # Fallback to regular text display (already shown if streamed)
+                if not stream:
+                    print("✨ AI Response:")
+                    print("-" * 50)
+                    print(answer)
+                    print("-" * 50)
+        except GeminiError as e:
+            if e.status_code is None:
+                print(f"❌ {e}")
             else:
-                print(f"❌ API Error: {response.status_code}")
-                print(f"Response: {response.text}")
-        except requests.RequestException as e:
-            print(f"❌ Network error: {e}")
+                print(f"❌ API Error: {e.status_code}")
+                print(f"Response: {e.response_text}")
         except Exception as e:
             print(f"❌ Unexpected error: {e}")
 
-def main():
-    notes = SmartNotes()
-    
+def add_output_arguments(parser):
+    parser.add_argument('--limit', type=int, help='Show at most this many notes')
+    parser.add_argument('--offset', type=int, default=0, help='Skip this many notes first')
+    parser.add_argument('--sort', choices=list(NOTE_SORTS), default='file', help='Order (default: as stored)')
+    parser.add_argument('--format', choices=OUTPUT_FORMATS, default='text', dest='output_format',
+                        help='text for reading, jsonl/tsv for piping into other tools')
+
+def _limit(args):
+    return max(0, args.limit) if args.limit is not None else None
+
+def build_parser():
     parser = argparse.ArgumentParser(description="Smart Notes CLI - A powerful note-taking tool with AI assistance")
+    parser.add_argument('--no-daemon', action='store_true', help='Run in this process even if notes_daemon.py is running')
     subparsers = parser.add_subparsers(dest='command', help='Available commands')
     
     # Add command
@@ -302,10 +632,12 @@ def main():
     # List command
     list_parser = subparsers.add_parser('list', help='List all notes')
     list_parser.add_argument('--tag', type=str, help='Filter notes by tag')
+    add_output_arguments(list_parser)
     
     # Search command
     search_parser = subparsers.add_parser('search', help='Search notes')
     search_parser.add_argument('query', nargs='*', help='Search query')
+    add_output_arguments(search_parser)
     
     # Update command
     update_parser = subparsers.add_parser('update', help='Update an existing note')
@@ -322,20 +654,45 @@ def main():
     ask_parser = subparsers.add_parser('ask', help='Ask AI about your notes')
     ask_parser.add_argument('question', nargs='*', help='Question to ask')
     ask_parser.add_argument('--relevant-only', action='store_true', help='Use only relevant notes for context')
+    ask_parser.add_argument('--stream', action='store_true', help='Show the answer as it is generated')
+    ask_parser.add_argument('--batch', type=str, metavar='FILE', help='Answer every question in FILE (one per line)')
+    ask_parser.add_argument('--output', type=str, help='JSONL results file for --batch (default: FILE.results.jsonl)')
+    ask_parser.add_argument('--workers', type=int, default=4, help='Concurrent requests for --batch')
+    ask_parser.add_argument('--no-local', action='store_true', help='Always ask the AI, even for simple statistics')
+    
+    # Cache command
+    cache_parser = subparsers.add_parser('cache', help='Show or clear the AI response caches')
+    cache_parser.add_argument('--clear', action='store_true', help='Remove all cached responses and answers')
     
-    args = parser.parse_args()
+    # Reindex command
+    reindex_parser = subparsers.add_parser('reindex', help='Backfill metadata and auto-tags for all notes')
+    reindex_parser.add_argument('--dry-run', action='store_true', help='Show what would change without writing')
+    reindex_parser.add_argument('--workers', type=int, help='Worker processes (default: all cores)')
+    reindex_parser.add_argument('--batch-size', type=int, default=REINDEX_BATCH_SIZE, help='Notes per committed batch')
+    reindex_parser.add_argument('--restart', action='store_true', help='Ignore any checkpoint and start over')
     
+    return parser
+
+def run_command(args, notes=None):
+    """Run one parsed command; notes_daemon.py passes its warm SmartNotes instead of loading one"""
     if not args.command:
         print("📝 Smart Notes CLI")
         print("Usage:")
         print("  python notes.py add [--title TITLE] [--content CONTENT] [--tags TAG1 TAG2 ...]")
-        print("  python notes.py list [--tag TAG]")
-        print("  python notes.py search QUERY")
+        print("  python notes.py list [--tag TAG] [--limit N] [--offset N] [--sort ORDER] [--format text|jsonl|tsv]")
+        print("  python notes.py search QUERY [--limit N] [--offset N] [--sort ORDER] [--format text|jsonl|tsv]")
         print("  python notes.py update ID [--title TITLE] [--content CONTENT] [--tags TAG1 TAG2 ...]")
         print("  python notes.py delete ID")
-        print("  python notes.py ask [--relevant-only] QUESTION")
+        print("  python notes.py ask [--relevant-only] [--stream] [--no-local] QUESTION")
+        print("  python notes.py ask --batch FILE [--output RESULTS.jsonl] [--workers N]")
+        print("  python notes.py cache [--clear]")
+        print("  python notes.py reindex [--dry-run] [--workers N] [--batch-size N] [--restart]")
         return
     
+    # Only commands that work with the notebook pay for loading it
+    if notes is None and args.command not in ("cache", "reindex"):
+        notes = SmartNotes()
+    
     if args.command == "add":
         title = args.title or input("Note title: ").strip()
         if not title:
@@ -365,14 +722,14 @@ def main():
             print("❌ Content cannot be empty")
     
     elif args.command == "list":
-        notes.list_notes(args.tag)
+        notes.list_notes(args.tag, _limit(args), max(0, args.offset), args.sort, args.output_format)
     
     elif args.command == "search":
         if not args.query:
             print("❌ Please provide a search query")
             return
         query = ' '.join(args.query)
-        notes.search_notes(query)
+        notes.search_notes(query, _limit(args), max(0, args.offset), args.sort, args.output_format)
     
     elif args.command == "update":
         # For update, we'll prompt for missing fields
@@ -389,16 +746,57 @@ def main():
     elif args.command == "delete":
         notes.delete_note(args.id)
     
+    elif args.command == "ask" and args.batch:
+        batch_file = Path(args.batch)
+        if not batch_file.exists():
+            print(f"❌ Questions file not found: {batch_file}")
+            return
+        with open(batch_file, 'r', encoding='utf-8') as f:
+            questions = [line.strip() for line in f if line.strip() and not line.lstrip().startswith('#')]
+        if not questions:
+            print("❌ No questions found in batch file")
+            return
+        output_file = args.output or str(batch_file.with_suffix('.results.jsonl'))
+        notes.ask_batch(questions, output_file, args.relevant_only, max(1, args.workers), not args.no_local)
+    
     elif args.command == "ask":
         if not args.question:
             print("❌ Please provide a question")
             return
             
         question = ' '.join(args.question)
-        notes.ask_ai(question, args.relevant_only)
+        notes.ask_ai(question, args.relevant_only, args.stream, not args.no_local)
+    
+    elif args.command == "cache":
+        cache = get_response_cache()
+        semantic = get_semantic_cache()
+        if args.clear:
+            cache.clear()
+            semantic.clear()
+            print("✅ AI response caches cleared")
+        stats = cache.stats()
+        print("🗄️ AI Response Cache")
+        print("-" * 50)
+        print(f"Entries: {stats['entries']}/{stats['max_entries']}")
+        print(f"Hits: {stats['hits']}  Misses: {stats['misses']}  Hit rate: {stats['hit_rate']:.1%}")
+        print(f"Evictions: {stats['evictions']}  Invalidations: {stats['invalidations']}")
+        stats = semantic.stats()
+        print("🧭 Similar Question Cache")
+        print("-" * 50)
+        print(f"Entries: {stats['entries']}/{stats['max_entries']}  Threshold: {stats['threshold']:.2f}")
+        print(f"Hits: {stats['hits']}  Misses: {stats['misses']}  Hit rate: {stats['hit_rate']:.1%}")
+        print(f"Evictions: {stats['evictions']}  Invalidations: {stats['invalidations']}")
+    
+    elif args.command == "reindex":
+        from backfill import run_backfill
+        run_backfill(NOTES_FILE, workers=args.workers, batch_size=max(1, args.batch_size),
+                     dry_run=args.dry_run, resume=not args.restart)
     
     else:
         print(f"❌ Unknown command: {args.command}")
 
+def main():
+    run_command(build_parser().parse_args())
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
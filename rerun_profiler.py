@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Smart Notes Rerun Profiler - Where does a Streamlit rerun spend its time?
+
+Opt-in timing for streamlit_enhanced.py. The script marks the start of each
+section (startup, sidebar, the current view, ...) and the profiler times them
+like lap times. Store method calls made through a ProfiledView and Gemini HTTP
+requests issued from the script thread are counted separately. Each finished
+rerun is added to a process-wide rolling history that drives a p50/p95/p99
+panel, and is appended as one JSON line to the metrics file. When profiling
+is off, NULL_PROFILER does nothing.
+"""
+
+import json
+import threading
+import time
+from collections import deque
+
+from config import PROFILE_HISTORY_SIZE, PROFILE_METRICS_FILE
+
+_current = threading.local()
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class RerunProfiler:
+    """Lap-style section timer for one script run, plus call counters"""
+
+    enabled = True
+
+    def __init__(self, started=None):
+        self.started = started or time.perf_counter()
+        self.sections = {}
+        self.calls = {}
+        self._section = None
+        self._section_started = self.started
+
+    def section(self, name, at=None):
+        """Close the running section and start timing `name` (at a perf_counter time if given)"""
+        now = at if at is not None else time.perf_counter()
+        if self._section is not None:
+            self.sections[self._section] = self.sections.get(self._section, 0.0) + (now - self._section_started) * 1000
+        self._section = name
+        self._section_started = now
+
+    def record_call(self, kind, name, elapsed_ms):
+        """Count one store or HTTP call (kind is e.g. "store" or "http")"""
+        entry = self.calls.setdefault(f"{kind}:{name}", {"count": 0, "ms": 0.0})
+        entry["count"] += 1
+        entry["ms"] += elapsed_ms
+
+    def activate(self):
+        """Make this the profiler for calls made on the current (script) thread"""
+        _current.profiler = self
+        return self
+
+    def finish(self):
+        """Close the last section and return this rerun's record"""
+        self.section(None)
+        if getattr(_current, "profiler", None) is self:
+            _current.profiler = None
+        return {
+            "at": time.time(),
+            "total_ms": round((time.perf_counter() - self.started) * 1000, 2),
+            "sections": {name: round(ms, 2) for name, ms in self.sections.items()},
+            "calls": {name: {"count": entry["count"], "ms": round(entry["ms"], 2)}
+                      for name, entry in self.calls.items()}
+        }
+
+
+class _NullProfiler:
+    """Drop-in profiler that records nothing"""
+
+    enabled = False
+
+    def section(self, name, at=None):
+        pass
+
+    def record_call(self, kind, name, elapsed_ms):
+        pass
+
+    def activate(self):
+        return self
+
+    def finish(self):
+        return None
+
+
+NULL_PROFILER = _NullProfiler()
+
+
+def current_profiler():
+    """The profiler active on this thread, or NULL_PROFILER"""
+    return getattr(_current, "profiler", None) or NULL_PROFILER
+
+
+def http_response_hook(response, *args, **kwargs):
+    """requests response hook: attribute Gemini HTTP time to the active rerun"""
+    profiler = current_profiler()
+    if profiler.enabled:
+        method = response.request.path_url.split("?", 1)[0].rsplit(":", 1)[-1]
+        profiler.record_call("http", method, response.elapsed.total_seconds() * 1000)
+    return response
+
+
+class ProfiledView:
+    """Wraps a NotesView so its method calls are timed as store calls.
+
+    Calls are charged to the profiler active on the calling thread, so a
+    background job holding the same view does not pollute the rerun numbers.
+    """
+
+    def __init__(self, view):
+        self._view = view
+
+    def __getattr__(self, name):
+        value = getattr(self._view, name)
+        if not callable(value):
+            return value
+
+        def timed(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return value(*args, **kwargs)
+            finally:
+                current_profiler().record_call("store", name, (time.perf_counter() - started) * 1000)
+        return timed
+
+
+class ProfileHistory:
+    """Rolling window of rerun records with per-section percentiles and a JSONL export"""
+
+    def __init__(self, size=PROFILE_HISTORY_SIZE, metrics_file=PROFILE_METRICS_FILE):
+        self.records = deque(maxlen=size)
+        self.metrics_file = metrics_file
+        self._lock = threading.Lock()
+
+    def add(self, record):
+        with self._lock:
+            self.records.append(record)
+            try:
+                with open(self.metrics_file, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            except OSError as e:
+                print(f"❌ Could not write rerun metrics to {self.metrics_file}: {e}")
+
+    def percentiles(self):
+        """{section: {p50, p95, p99, runs}} over the rolling window, plus "total" """
+        with self._lock:
+            records = list(self.records)
+        samples = {"total": [record["total_ms"] for record in records]}
+        for record in records:
+            for name, ms in record["sections"].items():
+                samples.setdefault(name, []).append(ms)
+        return {
+            name: {
+                "p50_ms": round(percentile(values, 0.50), 2),
+                "p95_ms": round(percentile(values, 0.95), 2),
+                "p99_ms": round(percentile(values, 0.99), 2),
+                "runs": len(values)
+            }
+            for name, values in samples.items()
+        }
+
+
+_shared_history = None
+_shared_history_lock = threading.Lock()
+
+
+def get_profile_history():
+    """Return the process-wide ProfileHistory"""
+    global _shared_history
+    if _shared_history is None:
+        with _shared_history_lock:
+            if _shared_history is None:
+                _shared_history = ProfileHistory()
+    return _shared_history
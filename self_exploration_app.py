@@ -6,17 +6,37 @@ Think of this as the "CHEF" that prepares all your personal insights
 """
 
 # 📦 IMPORT SECTION - Getting all our cooking tools ready
+import heapq                   # 🏔️ For picking the newest few without sorting everything
 import json                    # 📋 For reading/writing data files (like recipes)
 import os                     # 🖥️ For talking to your computer
 import sys                    # 🔧 System tools
-import requests               # 🌍 For talking to the internet (AI API)
 from datetime import datetime # 📅 For timestamps on your thoughts
 from pathlib import Path      # 📁 Smart file path handling
 import uuid                   # 🏗️ For creating unique IDs
-from collections import defaultdict # 🗃️ For counting and organizing data
 
 # 🏢 IMPORTING FROM THE MANAGER'S OFFICE
-from config import GEMINI_API_KEY, NOTES_FILE
+from config import GEMINI_API_KEY, NOTES_FILE, CONTEXT_TOKEN_BUDGET
+# 🧮 THE RUNNING SCOREBOARD - Totals updated on every write, read instantly
+from aggregates import NoteAggregates, MORNING_HOURS, EVENING_HOURS, metric_value
+# 📈 THE TREND LAB - Vectorized mood/energy time series
+from mood_analytics import MoodSeries, summarize
+# 📆 THE DAILY LEDGER - One pre-added row per day for dashboards and date ranges
+from daily_rollup import DailyRollup, combine, note_day
+# 🏷️ THE LABEL MAKER - Word-boundary keyword tagging from a hot-reloaded lexicon
+from auto_tagger import get_auto_tagger
+# 📏 THE PROMPT PACKER - Streams notes into a token-budgeted context
+from context_builder import ContextBuilder, iter_notes
+# 📞 THE SHARED AI HOTLINE - One pooled connection for every AI call
+from gemini_client import GeminiError
+# 🗓️ THE WEEKLY DIGEST - Map-reduce analysis for big notebooks
+from hierarchical_analysis import HierarchicalAnalyzer
+# 🗄️ THE ANSWER FILING CABINET - Repeat analyses come back instantly
+from llm_cache import cached_generate_content, notebook_version
+# 🔬 THE FLIGHT RECORDER - Opt-in timing spans (free when SMART_NOTES_TRACE is off)
+from instrumentation import span, traced
+
+# 🔖 Bump when the analysis prompt changes so old cached answers are not reused
+ANALYSIS_PROMPT_VERSION = "analysis-v1"
 
 
 # 👨‍🍳 THE MASTER CHEF CLASS - Where all the magic happens!
@@ -27,25 +47,42 @@ class SmartNotesEnhanced:
         self.notes_file = NOTES_FILE
         # 📚 Load all existing recipes (your previous thoughts)
         self.notes = self.load_notes()
+        # 🧮 Tally everything once; every add/update/delete keeps it current
+        self.aggregates = NoteAggregates.from_notes(self.notes)
+        # 📈 Columnar mood/energy arrays, built on first use and dropped on every write
+        self._mood_series = None
+        # 📆 Daily ledger: rebuilt only if the notes changed behind our back
+        self.rollup = DailyRollup()
+        if self.rollup.notes_version != notebook_version(self.notes_file):
+            self.rollup.rebuild(self.notes)
+            self.rollup.save(notebook_version(self.notes_file))
     
     # 📖 THE LIBRARIAN - Reads your existing thoughts from storage
     def load_notes(self):
         """Load notes from JSON file"""
-        if self.notes_file.exists():  # 🔍 Does the file exist?
-            try:
-                with open(self.notes_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)  # 📖 Read and convert JSON to Python
-            except (json.JSONDecodeError, FileNotFoundError):
-                return {}  # 🤷 If file is corrupted, start fresh
-        return {}  # 📝 No file yet? Start with empty notebook
+        with span("app.load_notes") as sp:
+            if self.notes_file.exists():  # 🔍 Does the file exist?
+                try:
+                    with open(self.notes_file, 'r', encoding='utf-8') as f:
+                        notes = json.load(f)  # 📖 Read and convert JSON to Python
+                    sp.file_read(self.notes_file)
+                    return notes
+                except (json.JSONDecodeError, FileNotFoundError):
+                    return {}  # 🤷 If file is corrupted, start fresh
+            return {}  # 📝 No file yet? Start with empty notebook
     
     # 💾 THE ARCHIVIST - Saves your thoughts to permanent storage
     def save_notes(self):
         """Save notes to JSON file"""
-        with open(self.notes_file, 'w', encoding='utf-8') as f:
-            json.dump(self.notes, f, indent=2, ensure_ascii=False)  # 📝 Write beautifully formatted
+        with span("app.save_notes") as sp:
+            with open(self.notes_file, 'w', encoding='utf-8') as f:
+                json.dump(self.notes, f, indent=2, ensure_ascii=False)  # 📝 Write beautifully formatted
+            sp.file_written(self.notes_file)
+            # 📆 Stamp the daily ledger with the notebook version it now matches
+            self.rollup.save(notebook_version(self.notes_file))
     
     # ✍️ THE SCRIBE - Your main "ADD NOTE" department (HR Department!)
+    @traced("app.add_note")
     def add_note(self, title, content, tags=None, note_type="general", mood=None, energy_level=None):
         """Add enhanced note with self-exploration metadata"""
         # 🕐 Timestamp = When did you have this thought?
@@ -70,11 +107,70 @@ class SmartNotesEnhanced:
             }
         }
         
+        self.aggregates.add(self.notes[note_id])  # 🧮 Update the scoreboard
+        self.rollup.add(self.notes[note_id])      # 📆 ...and today's ledger row
+        self._mood_series = None
+        
         # 💾 SAVE TO DISK - Don't lose your precious thoughts!
         self.save_notes()
         print(f"✅ {note_type.title()} '{title}' saved with ID: {note_id}")
         return note_id
     
+    # ✏️ THE EDITOR - Change an existing thought
+    @traced("app.update_note")
+    def update_note(self, note_id, title=None, content=None, tags=None, note_type=None,
+                    mood=None, energy_level=None):
+        """Update an existing note and keep its metadata and the aggregates in sync"""
+        if note_id not in self.notes:
+            print(f"❌ Note with ID {note_id} not found")
+            return False
+        
+        old_note = json.loads(json.dumps(self.notes[note_id]))  # 📸 Snapshot for the scoreboard
+        note = self.notes[note_id]
+        metadata = note.setdefault("metadata", {})
+        if title is not None:
+            note["title"] = title
+        if content is not None:
+            note["content"] = content
+            metadata["word_count"] = len(content.split())
+        if tags is not None:
+            note["tags"] = tags
+        if note_type is not None:
+            note["type"] = note_type
+        if mood is not None:
+            metadata["mood"] = mood
+        if energy_level is not None:
+            metadata["energy_level"] = energy_level
+        note["updated"] = datetime.now().isoformat()
+        
+        self.aggregates.replace(old_note, note)
+        self.rollup.replace(old_note, note)
+        self._mood_series = None
+        self.save_notes()
+        print(f"✅ Note '{note['title']}' updated")
+        return True
+    
+    # 🗑️ THE SHREDDER - Remove a thought for good
+    @traced("app.delete_note")
+    def delete_note(self, note_id):
+        """Delete a note by ID"""
+        if note_id not in self.notes:
+            print(f"❌ Note with ID {note_id} not found")
+            return False
+        
+        note = self.notes.pop(note_id)
+        self.aggregates.remove(note)
+        self.rollup.remove(note)
+        self._mood_series = None
+        self.save_notes()
+        print(f"✅ Note '{note['title']}' deleted")
+        return True
+    
+    # 🔍 THE AUDITOR - Double-checks the scoreboard against a full recount
+    def check_aggregates(self):
+        """Verify the running aggregates against a full recompute; returns the mismatches"""
+        return self.aggregates.verify(self.notes)
+    
     def quick_journal(self):
         """Quick journaling interface"""
         print("📝 Quick Journal Entry")
@@ -126,90 +222,93 @@ class SmartNotesEnhanced:
         print(f"\n🎉 Journal entry saved! Auto-tags: {', '.join(tags) if tags else 'none'}")
         return note_id
     
+    # 🏷️ THE LABEL MAKER - One pass over your words, scored against tag_lexicon.json
+    @traced("app.auto_generate_tags")
     def _auto_generate_tags(self, content):
         """Auto-generate tags based on content"""
-        content_lower = content.lower()
-        tags = []
-        
-        # Emotion-based tags
-        if any(word in content_lower for word in ['happy', 'joy', 'excited', 'great', 'amazing']):
-            tags.append('positive')
-        if any(word in content_lower for word in ['sad', 'upset', 'frustrated', 'angry', 'stressed']):
-            tags.append('challenging')
-        if any(word in content_lower for word in ['grateful', 'thankful', 'appreciate']):
-            tags.append('gratitude')
-        
-        # Activity-based tags
-        if any(word in content_lower for word in ['work', 'job', 'meeting', 'project']):
-            tags.append('work')
-        if any(word in content_lower for word in ['family', 'friend', 'relationship']):
-            tags.append('relationships')
-        if any(word in content_lower for word in ['learn', 'study', 'read', 'course']):
-            tags.append('learning')
-        if any(word in content_lower for word in ['goal', 'plan', 'future', 'dream']):
-            tags.append('goals')
-        
-        return tags[:3]
+        return get_auto_tagger().tag(content)
     
     # 🆕 NEW FEATURE: THE MOOD DETECTIVE - Tracks your emotional patterns over time
+    @traced("app.track_mood_trends")
     def track_mood_trends(self, days_back=30):
-        """🧠 EMOTION ANALYTICS DEPARTMENT - Find your mood patterns!"""
-        # 📊 Collect all mood data from recent entries
-        mood_data = []
-        for note_id, note in self.notes.items():
-            metadata = note.get("metadata", {})
-            if metadata.get("mood") and isinstance(metadata["mood"], (int, float)):
-                mood_data.append({
-                    "date": metadata.get("created_date_only"),
-                    "hour": metadata.get("created_hour", 12), 
-                    "mood": metadata["mood"],
-                    "title": note["title"]
-                })
-        
-        if not mood_data:
-            return {"message": "No mood data available yet. Start journaling with mood ratings!"}
-        
-        # 🧮 Calculate trends (this is where the magic happens!)
-        moods = [entry["mood"] for entry in mood_data]
-        avg_mood = sum(moods) / len(moods)
-        
-        # 📈 Find patterns by time of day
-        morning_moods = [entry["mood"] for entry in mood_data if entry["hour"] < 12]
-        evening_moods = [entry["mood"] for entry in mood_data if entry["hour"] >= 18]
+        """🧠 EMOTION ANALYTICS DEPARTMENT - Find your mood patterns!
+        
+        days_back=N reads at most N daily ledger rows; days_back=None covers all time.
+        """
+        if days_back is None:
+            # 🧮 The scoreboard already has the all-time totals - no need to reread every note
+            mood = self.aggregates.mood
+            if not mood.count:
+                return {"message": "No mood data available yet. Start journaling with mood ratings!"}
+            stats = {
+                "average": mood.average(), "count": mood.count,
+                "max": mood.maximum(), "min": mood.minimum(),
+                # 📈 Find patterns by time of day (from the per-hour buckets)
+                "morning": self.aggregates.hours_mood_average(MORNING_HOURS),
+                "evening": self.aggregates.hours_mood_average(EVENING_HOURS)
+            }
+            since = ""
+        else:
+            # 📆 Add up just the last N days from the daily ledger
+            rows = self.rollup.last_days(days_back)
+            totals = combine(rows)
+            mood = totals["mood"]
+            if not mood["count"]:
+                return {"message": f"No mood data in the last {days_back} days. Start journaling with mood ratings!"}
+            stats = {
+                "average": mood["average"], "count": mood["count"],
+                "max": mood["max"], "min": mood["min"],
+                "morning": totals["morning_mood"]["average"],
+                "evening": totals["evening_mood"]["average"]
+            }
+            since = rows[0][0]
+        
+        # 📋 The 5 newest mood entries in the window, by timestamp - file order isn't chronological
+        # for legacy, imported or backfilled notes
+        in_window = (note for note in self.notes.values()
+                     if note_day(note) >= since and metric_value(note, "mood") is not None)
+        newest = heapq.nlargest(5, in_window, key=lambda note: note.get("created", ""))
+        recent_entries = [{
+            "date": note["metadata"].get("created_date_only"),
+            "hour": note["metadata"].get("created_hour", 12),
+            "mood": note["metadata"]["mood"],
+            "title": note["title"]
+        } for note in reversed(newest)]
         
         return {
-            "average_mood": round(avg_mood, 1),
-            "total_entries": len(mood_data),
-            "best_mood": max(moods),
-            "lowest_mood": min(moods),
-            "morning_average": round(sum(morning_moods)/len(morning_moods), 1) if morning_moods else None,
-            "evening_average": round(sum(evening_moods)/len(evening_moods), 1) if evening_moods else None,
-            "recent_entries": mood_data[-5:]  # Last 5 entries
+            "average_mood": round(stats["average"], 1),
+            "total_entries": stats["count"],
+            "best_mood": stats["max"],
+            "lowest_mood": stats["min"],
+            "morning_average": round(stats["morning"], 1) if stats["morning"] is not None else None,
+            "evening_average": round(stats["evening"], 1) if stats["evening"] is not None else None,
+            "recent_entries": recent_entries  # Last 5 entries
         }
     
+    # 📈 THE TREND LAB - Daily/weekly curves, heatmaps, streaks and correlations
+    def mood_series(self):
+        """Columnar MoodSeries of all notes, cached until the next write"""
+        if self._mood_series is None:
+            self._mood_series = MoodSeries.from_notes(self.notes)
+        return self._mood_series
+    
+    @traced("app.mood_analytics")
+    def mood_analytics(self, window=7):
+        """Resampled mood/energy series, rolling averages, heatmap, streaks and correlation"""
+        return summarize(self.mood_series(), window)
+    
+    @traced("app.get_statistics")
     def get_statistics(self):
         """Get detailed statistics"""
         if not self.notes:
             print("📊 No data available")
             return
         
-        total_notes = len(self.notes)
-        total_words = sum(note.get("metadata", {}).get("word_count", 0) for note in self.notes.values())
-        
-        # Notes by type
-        types = defaultdict(int)
-        for note in self.notes.values():
-            types[note.get("type", "general")] += 1
-        
-        # Mood analysis
-        moods = []
-        energy_levels = []
-        for note in self.notes.values():
-            metadata = note.get("metadata", {})
-            if metadata.get("mood") and isinstance(metadata["mood"], (int, float)):
-                moods.append(metadata["mood"])
-            if metadata.get("energy_level") and isinstance(metadata["energy_level"], (int, float)):
-                energy_levels.append(metadata["energy_level"])
+        # 🧮 Everything below comes straight off the running scoreboard
+        aggregates = self.aggregates
+        total_notes = aggregates.total_notes
+        total_words = aggregates.total_words
+        types = aggregates.type_counts
         
         print("📊 YOUR STATISTICS")
         print("=" * 40)
@@ -221,15 +320,16 @@ class SmartNotesEnhanced:
         for note_type, count in sorted(types.items()):
             print(f"  {note_type}: {count}")
         
-        if moods:
-            print(f"\n😊 Average mood: {sum(moods) / len(moods):.1f}/10")
-        if energy_levels:
-            print(f"⚡ Average energy: {sum(energy_levels) / len(energy_levels):.1f}/10")
+        if aggregates.mood.count:
+            print(f"\n😊 Average mood: {aggregates.mood.average():.1f}/10")
+        if aggregates.energy.count:
+            print(f"⚡ Average energy: {aggregates.energy.average():.1f}/10")
         
         print("=" * 40)
     
-    def analyze_patterns(self):
-        """AI-powered pattern analysis"""
+    @traced("app.analyze_patterns")
+    def analyze_patterns(self, mode="full"):
+        """AI-powered pattern analysis (mode="hierarchical" for large notebooks)"""
         if not self.notes:
             print("📈 No notes for analysis")
             return None
@@ -241,10 +341,69 @@ class SmartNotesEnhanced:
         
         print("🔍 Analyzing your personal patterns...")
         
+        if mode == "hierarchical":
+            return self._analyze_patterns_hierarchical(api_key)
+        
         # Prepare context
         context = self._prepare_analysis_context()
         
-        prompt = f"""You are a personal development coach. Analyze these personal notes and provide insights in JSON format:
+        prompt = self._build_analysis_prompt(context)
+        
+        try:
+            print("⏳ Processing...")
+            answer, cached = cached_generate_content(
+                prompt, ANALYSIS_PROMPT_VERSION, notebook_version(self.notes_file), api_key=api_key
+            )
+            if cached:
+                print("⚡ Reusing cached analysis (no notes changed since last time)")
+            try:
+                analysis = json.loads(answer)
+                self._display_analysis(analysis)
+                return analysis
+            except:
+                print("🧠 AI Analysis:")
+                print("-" * 50)
+                print(answer)
+                print("-" * 50)
+                return answer
+        except GeminiError as e:
+            if e.status_code is None:
+                print(f"❌ {e}")
+            else:
+                print(f"❌ API Error: {e.status_code}")
+        except Exception as e:
+            print(f"❌ Error: {e}")
+        
+        return None
+    
+    # 🗓️ THE WEEKLY DIGEST - Summarize week by week, then combine
+    def _analyze_patterns_hierarchical(self, api_key):
+        """Incremental map-reduce analysis; only changed weeks go back to the AI"""
+        try:
+            analysis = HierarchicalAnalyzer(self).analyze(api_key=api_key, progress=lambda msg: print(f"⏳ {msg}"))
+        except GeminiError as e:
+            if e.status_code is None:
+                print(f"❌ {e}")
+            else:
+                print(f"❌ API Error: {e.status_code}")
+            return None
+        except Exception as e:
+            print(f"❌ Error: {e}")
+            return None
+        
+        if isinstance(analysis, dict):
+            self._display_analysis(analysis)
+        else:
+            print("🧠 AI Analysis:")
+            print("-" * 50)
+            print(analysis)
+            print("-" * 50)
+        return analysis
+    
+    # 📜 THE COACH'S SCRIPT - One prompt template shared by CLI and web app
+    def _build_analysis_prompt(self, context):
+        """Wrap the analysis context in the coaching prompt template"""
+        return f"""You are a personal development coach. Analyze these personal notes and provide insights in JSON format:
 
 {{
   "emotional_patterns": {{
@@ -266,70 +425,43 @@ Notes data:
 {context}
 
 Provide actionable insights for personal growth."""
-        
-        try:
-            url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-1.5-flash:generateContent?key={api_key}"
-            payload = {
-                "contents": [{
-                    "parts": [{
-                        "text": prompt
-                    }]
-                }]
-            }
-            
-            print("⏳ Processing...")
-            response = requests.post(url, json=payload, headers={"Content-Type": "application/json"})
-            
-            if response.status_code == 200:
-                result = response.json()
-                if 'candidates' in result and len(result['candidates']) > 0:
-                    answer = result['candidates'][0]['content']['parts'][0]['text']
-                    try:
-                        analysis = json.loads(answer)
-                        self._display_analysis(analysis)
-                        return analysis
-                    except:
-                        print("🧠 AI Analysis:")
-                        print("-" * 50)
-                        print(answer)
-                        print("-" * 50)
-                        return answer
-            else:
-                print(f"❌ API Error: {response.status_code}")
-        except Exception as e:
-            print(f"❌ Error: {e}")
-        
-        return None
     
-    def _prepare_analysis_context(self):
+    @traced("app.prepare_analysis_context")
+    def _prepare_analysis_context(self, token_budget=CONTEXT_TOKEN_BUDGET):
         """Prepare data for AI analysis"""
-        context = f"Personal Notes Analysis (Total: {len(self.notes)} entries)\n\n"
-        
-        # Sort by date
-        sorted_notes = sorted(self.notes.items(), key=lambda x: x[1]['created'])
-        
-        for note_id, note in sorted_notes:
-            context += f"Date: {note['created'][:10]}\n"
-            context += f"Type: {note.get('type', 'general')}\n"
-            context += f"Title: {note['title']}\n"
+        return self._build_analysis_context(token_budget).text
+    
+    # 📏 THE PACKING EXPERT - Fits the newest notes into the AI's suitcase
+    def _build_analysis_context(self, token_budget=CONTEXT_TOKEN_BUDGET):
+        """Token-budgeted analysis context; newest notes win, shown oldest first"""
+        builder = ContextBuilder(
+            header=f"Personal Notes Analysis (Total: {len(self.notes)} entries)\n\n",
+            token_budget=token_budget,
+            per_note_tokens=125  # ~500 characters per note for API efficiency
+        )
+        builder.extend(self._analysis_entries(iter_notes(self.notes, "recency")))
+        return builder.build(reverse=True)  # 📅 Present in date order
+    
+    def _analysis_entries(self, notes_iter):
+        """Yield context builder entries for the analysis prompt"""
+        for note_id, note in notes_iter:
+            prefix = [
+                f"Date: {note['created'][:10]}\n",
+                f"Type: {note.get('type', 'general')}\n",
+                f"Title: {note['title']}\n"
+            ]
             
             metadata = note.get('metadata', {})
             if metadata.get('mood'):
-                context += f"Mood: {metadata['mood']}/10\n"
+                prefix.append(f"Mood: {metadata['mood']}/10\n")
             if metadata.get('energy_level'):
-                context += f"Energy: {metadata['energy_level']}/10\n"
+                prefix.append(f"Energy: {metadata['energy_level']}/10\n")
             
             if note.get('tags'):
-                context += f"Tags: {', '.join(note['tags'])}\n"
+                prefix.append(f"Tags: {', '.join(note['tags'])}\n")
             
-            # Limit content for API efficiency
-            content = note['content'][:500]
-            if len(note['content']) > 500:
-                content += "..."
-            context += f"Content: {content}\n"
-            context += "-" * 30 + "\n"
-        
-        return context
+            prefix.append("Content: ")
+            yield note_id, "".join(prefix), note['content'], "\n" + "-" * 30 + "\n"
     
     def _display_analysis(self, analysis):
         """Display analysis results beautifully"""
@@ -375,6 +507,7 @@ Provide actionable insights for personal growth."""
         print("🌟 Use these insights for your growth journey! 🌟")
         print("=" * 60 + "\n")
     
+    @traced("app.list_notes")
     def list_notes(self, note_type=None):
         """List notes with enhanced display"""
         if not self.notes:
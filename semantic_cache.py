@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Smart Notes Semantic Cache - Reuse answers for reworded questions
+
+Incoming questions are embedded and compared (cosine similarity) with the
+questions answered before against the same notebook version. When one scores
+above the threshold its structured answer is returned without another model
+call, so "how's my mood lately" and "recent mood trend" share one answer.
+Entries expire after a TTL, the cache is bounded with LRU eviction, and
+entries from older notebook versions are dropped as soon as the notes change.
+"""
+
+import atexit
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from config import (
+    SEMANTIC_CACHE_FILE, SEMANTIC_CACHE_THRESHOLD, SEMANTIC_CACHE_TTL_SECONDS,
+    SEMANTIC_CACHE_MAX_ENTRIES
+)
+from llm_cache import normalize_prompt
+
+
+class SemanticCache:
+    """Embedding-matched answer cache with threshold, TTL and LRU bounds, persisted to JSON.
+
+    Lookups and invalidations only touch memory; the file is rewritten by put
+    and clear, and once more at exit if there are unsaved changes. Each write
+    merges in what other processes (the Streamlit app, the CLI) saved since.
+    """
+
+    def __init__(self, cache_file=SEMANTIC_CACHE_FILE, threshold=SEMANTIC_CACHE_THRESHOLD,
+                 ttl_seconds=SEMANTIC_CACHE_TTL_SECONDS, max_entries=SEMANTIC_CACHE_MAX_ENTRIES):
+        self.cache_file = cache_file
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._matrix = None  # normalized question vectors, rebuilt lazily when entries are added or dropped
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+        self._unsaved = dict.fromkeys(self._stats, 0)  # counter increments not yet on disk
+        self._dropped = set()  # keys removed here, not to be revived from the file
+        self._cleared = False
+        self._dirty = False
+        entries, stats = self._read_file()
+        self._entries.update(entries)
+        self._stats.update(stats)
+        atexit.register(self.flush)
+
+    @staticmethod
+    def make_key(question, scope):
+        material = json.dumps([scope, normalize_prompt(question).lower()])
+        return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+    def _read_file(self):
+        """(entries least-recently-used first, stats) as currently saved"""
+        if not self.cache_file.exists():
+            return [], {}
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (json.JSONDecodeError, FileNotFoundError):
+            return [], {}
+        return data.get("entries", []), data.get("stats", {})
+
+    def _count(self, name, amount=1):
+        self._stats[name] += amount
+        self._unsaved[name] += amount
+        self._dirty = True
+
+    def _save(self):
+        entries, stats = self._read_file()
+        now = time.time()
+        merged = OrderedDict()
+        if not self._cleared:
+            for key, entry in entries:
+                if (key not in self._entries and key not in self._dropped
+                        and now - entry["stored_at"] <= self.ttl_seconds):
+                    merged[key] = entry
+        if merged:
+            self._matrix = None
+        # Ours were used by this process, so they count as more recent
+        merged.update(self._entries)
+        while len(merged) > self.max_entries:
+            merged.popitem(last=False)
+            self._unsaved["evictions"] += 1
+            self._matrix = None
+        self._entries = merged
+
+        self._stats = {name: stats.get(name, 0) + self._unsaved[name] for name in self._stats}
+        data = {"stats": self._stats, "entries": list(self._entries.items())}
+        tmp_file = self.cache_file.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_file, self.cache_file)
+        self._unsaved = dict.fromkeys(self._stats, 0)
+        self._dropped.clear()
+        self._cleared = False
+        self._dirty = False
+
+    def flush(self):
+        """Persist counters and invalidations that have only been kept in memory"""
+        with self._lock:
+            if self._dirty:
+                try:
+                    self._save()
+                except OSError as e:
+                    print(f"❌ Could not save semantic cache: {e}")
+
+    def _candidates(self):
+        """(keys, matrix of unit vectors), cached until the entries change"""
+        if self._matrix is None:
+            import numpy as np  # deferred: only lookups need it, not CLI startup
+
+            keys = list(self._entries)
+            if keys:
+                matrix = np.array([self._entries[key]["vector"] for key in keys], dtype=float)
+                norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+                norms[norms == 0] = 1.0
+                matrix = matrix / norms
+            else:
+                matrix = np.zeros((0, 0))
+            self._matrix = (keys, matrix)
+        return self._matrix
+
+    def _drop(self, keys):
+        for key in keys:
+            del self._entries[key]
+        self._dropped.update(keys)
+        if keys:
+            self._matrix = None
+            self._dirty = True
+
+    def lookup(self, question_vector, notebook_version, scope="all"):
+        """Return (answer, matched_question, similarity) for the closest fresh question, or None"""
+        with self._lock:
+            now = time.time()
+            expired = [key for key, entry in self._entries.items()
+                       if now - entry["stored_at"] > self.ttl_seconds]
+            self._drop(expired)
+
+            best = None
+            keys, matrix = self._candidates()
+            if keys:
+                import numpy as np
+
+                query = np.asarray(question_vector, dtype=float)
+                norm = np.linalg.norm(query)
+                if norm and query.shape[0] == matrix.shape[1]:
+                    similarities = matrix @ (query / norm)
+                    for index in np.argsort(similarities)[::-1]:
+                        if similarities[index] < self.threshold:
+                            break
+                        entry = self._entries[keys[index]]
+                        if entry["notebook_version"] == notebook_version and entry["scope"] == scope:
+                            best = (keys[index], float(similarities[index]))
+                            break
+
+            if best is None:
+                self._count("misses")
+                return None
+            key, similarity = best
+            self._entries.move_to_end(key)  # the matrix maps rows to keys, so LRU order doesn't touch it
+            self._count("hits")
+            entry = self._entries[key]
+            return entry["answer"], entry["question"], similarity
+
+    def put(self, question, question_vector, answer, notebook_version, scope="all"):
+        """Store a structured answer, evicting the least recently used entries if full"""
+        with self._lock:
+            key = self.make_key(question, scope)
+            self._entries[key] = {
+                "question": question,
+                "vector": list(question_vector),
+                "answer": answer,
+                "notebook_version": notebook_version,
+                "scope": scope,
+                "stored_at": time.time()
+            }
+            self._entries.move_to_end(key)
+            self._dropped.discard(key)
+            while len(self._entries) > self.max_entries:
+                self._dropped.add(self._entries.popitem(last=False)[0])
+                self._count("evictions")
+            self._matrix = None
+            self._save()
+
+    def invalidate_stale(self, current_version):
+        """Drop answers computed against any other notebook version"""
+        with self._lock:
+            stale = [key for key, entry in self._entries.items()
+                     if entry["notebook_version"] != current_version]
+            self._drop(stale)
+            if stale:
+                self._count("invalidations", len(stale))
+            return len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._drop(list(self._entries))
+            self._cleared = True
+            self._save()
+
+    def stats(self):
+        """Hit/miss counters plus the current hit rate, size and threshold"""
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return dict(self._stats,
+                        entries=len(self._entries),
+                        max_entries=self.max_entries,
+                        threshold=self.threshold,
+                        hit_rate=self._stats["hits"] / lookups if lookups else 0.0)
+
+
+_shared_cache = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_semantic_cache():
+    """Return the process-wide SemanticCache"""
+    global _shared_cache
+    if _shared_cache is None:
+        with _shared_cache_lock:
+            if _shared_cache is None:
+                _shared_cache = SemanticCache()
+    return _shared_cache
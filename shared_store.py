@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Smart Notes Shared Store - One notebook per process, many lightweight views
+
+Streamlit used to build a SmartNotesEnhanced (a full parsed copy of notes.json
+plus its aggregates) for every browser session. SharedNotesStore loads the
+notebook once per process and publishes it copy-on-write. Readers pick up the
+current snapshot without taking a lock and can iterate it safely while someone
+else writes. Writers are serialized: each write clones the small per-notebook
+structures and the notes dict, applies the change, saves, and then swaps the
+new snapshot in with a single reference assignment. Each session holds a
+NotesView, which is just a pointer to the store, so memory stays flat as
+sessions are added.
+"""
+
+import copy
+import threading
+
+from llm_cache import notebook_version
+from self_exploration_app import SmartNotesEnhanced
+
+WRITE_METHODS = ("add_note", "update_note", "delete_note")
+
+
+class SharedNotesStore:
+    """Process-wide SmartNotesEnhanced with lock-free reads and serialized copy-on-write writes"""
+
+    def __init__(self, app_factory=SmartNotesEnhanced):
+        self._app_factory = app_factory
+        self._write_lock = threading.Lock()
+        self._app = app_factory()
+        self._disk_version = notebook_version(self._app.notes_file)
+        self.generation = 0  # bumps on every published change; handy as a cache key
+
+    def snapshot(self):
+        """The current published notebook; treat it as read-only"""
+        return self._app
+
+    def refresh_if_changed(self):
+        """Reload if notes.json was changed by another process (e.g. the CLI)"""
+        if notebook_version(self._app.notes_file) == self._disk_version:
+            return False
+        with self._write_lock:
+            version = notebook_version(self._app.notes_file)
+            if version == self._disk_version:
+                return False
+            self._app = self._app_factory()
+            self._disk_version = version
+            self.generation += 1
+            return True
+
+    def _clone(self, app, note_id=None):
+        """Shallow copy of the app with private copies of everything a write mutates"""
+        clone = copy.copy(app)
+        clone.notes = dict(app.notes)
+        if note_id in clone.notes:
+            # update_note edits the note dict in place; readers must keep the old one
+            clone.notes[note_id] = copy.deepcopy(clone.notes[note_id])
+        clone.aggregates = copy.deepcopy(app.aggregates)
+        clone.rollup = app.rollup.copy()  # add/update/delete adjust ledger rows in place
+        return clone
+
+    def write(self, method, *args, **kwargs):
+        """Run one of WRITE_METHODS against a private clone, then publish it"""
+        if method not in WRITE_METHODS:
+            raise ValueError(f"Not a write method: {method}")
+        with self._write_lock:
+            note_id = args[0] if method != "add_note" and args else kwargs.get("note_id")
+            clone = self._clone(self._app, note_id)
+            result = getattr(clone, method)(*args, **kwargs)
+            self._app = clone
+            self._disk_version = notebook_version(clone.notes_file)
+            self.generation += 1
+            return result
+
+    def view(self):
+        return NotesView(self)
+
+
+class NotesView:
+    """What a session holds: reads go to the latest snapshot, writes go through the store"""
+
+    def __init__(self, store):
+        self._store = store
+
+    @property
+    def generation(self):
+        return self._store.generation
+
+    def __getattr__(self, name):
+        if name in WRITE_METHODS:
+            return lambda *args, **kwargs: self._store.write(name, *args, **kwargs)
+        return getattr(self._store.snapshot(), name)
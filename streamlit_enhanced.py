@@ -5,6 +5,10 @@ This is where YOU (the customer) interact with your self-exploration app!
 Think of this as the beautiful restaurant where you enjoy your "thought meals"
 """
 
+# ⏱️ Start the stopwatch before anything else, so profiling sees the whole rerun
+import time
+_rerun_started = time.perf_counter()
+
 # 🚨 SUPER IMPORTANT: Load secrets FIRST before anything else!
 # (Like checking if the restaurant has power before opening the doors)
 import os                     # 🖥️ For system stuff
@@ -26,21 +30,36 @@ except ImportError:
     print("❌ python-dotenv not installed!")
 except Exception as e:
     print(f"❌ Error loading .env: {e}")
+_env_probed = time.perf_counter()
 
 # 🌍 NOW WE CAN IMPORT THE REST OF OUR TOOLS
 import streamlit as st        # 🎆 The beautiful web magic maker
 import json                   # 📋 For data handling
+import uuid                   # 🎫 For telling browser sessions apart
 from datetime import datetime # 📅 For timestamps
-import requests               # 🌍 For internet calls
+import pandas as pd           # 🐼 Tables behind the trend charts
 
 # 👨‍🍳 IMPORT OUR CHEF from the kitchen!
-from self_exploration_app import SmartNotesEnhanced
+from self_exploration_app import ANALYSIS_PROMPT_VERSION
+from shared_store import SharedNotesStore
+from mood_analytics import WEEKDAYS
+from hierarchical_analysis import HierarchicalAnalyzer
+# 📞 THE SHARED AI HOTLINE - One pooled, rate-limited client for all sessions
+from gemini_client import GeminiError, get_client
+# 🗄️ THE ANSWER FILING CABINET - Cached AI answers, shared by every session
+from llm_cache import cached_generate_content, cached_stream_content, get_response_cache, notebook_version
+# 🧵 THE BACK KITCHEN - AI jobs that keep running while you browse
+from ai_jobs import DONE, CANCELLED, RUNNING, get_job_registry, prompt_hash
+# ⏱️ THE KITCHEN STOPWATCH - Opt-in per-rerun timing
+from config import PROFILE_RERUNS, PROFILE_METRICS_FILE
+from rerun_profiler import NULL_PROFILER, ProfiledView, RerunProfiler, get_profile_history, http_response_hook
 
 # 🎫 GET OUR GOLDEN TICKET (API key) with detective debugging
 GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
 print(f"API Key loaded: {bool(GEMINI_API_KEY)}")
 if GEMINI_API_KEY:
     print(f"API Key preview: {GEMINI_API_KEY[:15]}...")
+_imports_done = time.perf_counter()
 
 # 🏠 RESTAURANT SETUP - Configure how your dining room looks
 st.set_page_config(
@@ -107,18 +126,199 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+# 👨‍🍳 ONE CHEF FOR THE WHOLE RESTAURANT - Loaded once per process, shared by every tab
+@st.cache_resource
+def get_shared_store():
+    return SharedNotesStore()
+
+# ⏱️ THE KITCHEN STOPWATCH - Time this rerun if profiling is on (sidebar toggle, ?profile=1 or PROFILE_RERUNS)
+@st.cache_resource
+def install_http_profiling():
+    """Let the shared AI client report request times to whichever rerun made them"""
+    get_client().session.hooks["response"].append(http_response_hook)
+    return True
+
+if 'profile_reruns' not in st.session_state:
+    st.session_state.profile_reruns = PROFILE_RERUNS or st.query_params.get("profile") == "1"
+if st.session_state.profile_reruns:
+    install_http_profiling()
+    profiler = RerunProfiler(started=_rerun_started).activate()
+    profiler.section(".env probing", at=_rerun_started)
+    profiler.section("imports", at=_env_probed)
+    profiler.section("page setup", at=_imports_done)
+else:
+    profiler = NULL_PROFILER
+profiler.section("store setup")
+
 # 🧠 THE RESTAURANT'S MEMORY SYSTEM - Remember things while you're here
-if 'notes_app' not in st.session_state:                    # 👨‍🍳 Do we have a chef?
-    st.session_state.notes_app = SmartNotesEnhanced()      # 🔥 Hire the chef!
+store = get_shared_store()
+store.refresh_if_changed()                                 # 🔄 Pick up notes added from the CLI
+if 'notes_app' not in st.session_state or profiler.enabled or isinstance(st.session_state.notes_app, ProfiledView):
+    # 🪟 Each tab just gets a window into the kitchen (with a stopwatch on it while profiling)
+    st.session_state.notes_app = ProfiledView(store.view()) if profiler.enabled else store.view()
 
 if 'current_view' not in st.session_state:                 # 🗺️ Which room are we in?
     st.session_state.current_view = 'dashboard'            # 🏠 Start in the main lobby
 
+if 'session_id' not in st.session_state:                   # 🎫 A ticket so the back kitchen knows whose order is whose
+    st.session_state.session_id = uuid.uuid4().hex
+
+# 📋 THE FILING INDEX - Sorted/filtered id lists, cached until the notes change
+NOTE_PREVIEW_CHARS = 300
+NOTE_SORT_ORDERS = {
+    "Newest first": (lambda note: note.get("created", ""), True),
+    "Oldest first": (lambda note: note.get("created", ""), False),
+    "Title A-Z": (lambda note: note.get("title", "").lower(), False)
+}
+
+@st.cache_resource(max_entries=8)
+def notes_tag_options(generation):
+    """Every tag in the notebook; `generation` makes the cache follow writes"""
+    notes = get_shared_store().snapshot().notes
+    return sorted({tag for note in notes.values() for tag in note.get("tags", [])})
+
+@st.cache_resource(max_entries=32)
+def filtered_note_ids(generation, note_type, tag, sort_order):
+    """Ids matching the filters, in display order (shared by every session)"""
+    notes = get_shared_store().snapshot().notes
+    note_ids = [note_id for note_id, note in notes.items()
+                if (note_type == "All" or note.get("type", "general") == note_type)
+                and (tag == "All" or tag in note.get("tags", []))]
+    key, reverse = NOTE_SORT_ORDERS[sort_order]
+    note_ids.sort(key=lambda note_id: key(notes[note_id]), reverse=reverse)
+    return note_ids
+
+# 🍽️ THE PLATING STATION - Serve an AI analysis beautifully
+def render_analysis(analysis):
+    """Display a structured analysis, or the raw text if the AI didn't return JSON"""
+    if not isinstance(analysis, dict):
+        st.markdown("### 🧠 AI Analysis:")
+        st.write(analysis)
+        return
+    
+    # Display structured analysis
+    if analysis.get('summary'):
+        st.markdown(f"""
+        <div class='insight-card'>
+            <h3>📝 Summary</h3>
+            <p>{analysis['summary']}</p>
+        </div>
+        """, unsafe_allow_html=True)
+
+    col1, col2 = st.columns(2)
+
+    with col1:
+        if 'emotional_patterns' in analysis:
+            ep = analysis['emotional_patterns']
+            st.markdown("### 💭 Emotional Patterns")
+            if ep.get('dominant_emotions'):
+                st.write(f"**Key emotions:** {', '.join(ep['dominant_emotions'])}")
+            if ep.get('trends'):
+                st.write(f"**Trends:** {ep['trends']}")
+
+    with col2:
+        if 'behavioral_patterns' in analysis:
+            bp = analysis['behavioral_patterns']
+            st.markdown("### 🎨 Behavioral Patterns")
+            if bp.get('recurring_themes'):
+                st.write(f"**Themes:** {', '.join(bp['recurring_themes'])}")
+            if bp.get('growth_indicators'):
+                st.write(f"**Growth:** {', '.join(bp['growth_indicators'])}")
+
+    # Recommendations
+    if 'recommendations' in analysis:
+        rec = analysis['recommendations']
+        st.markdown("### 🎯 Personalized Recommendations")
+
+        if rec.get('immediate_actions'):
+            st.markdown("**🏃 Immediate Actions:**")
+            for action in rec['immediate_actions']:
+                st.write(f"• {action}")
+
+        if rec.get('reflection_questions'):
+            st.markdown("**🤔 Questions to Ponder:**")
+            for question in rec['reflection_questions']:
+                st.write(f"• {question}")
+    
+    st.balloons()
+
 # Header
+# 🧵 THE BACK KITCHEN ORDERS - What a background pattern analysis actually does
+def run_pattern_analysis(prompt, notes_version, stream, job):
+    """Job body for the standard analysis: streams into job.chunks so the page can show progress"""
+    if stream:
+        for chunk in cached_stream_content(prompt, ANALYSIS_PROMPT_VERSION, notes_version, api_key=GEMINI_API_KEY):
+            job.append_text(chunk)  # 📡 Also where a cancel request takes effect
+        answer = job.partial_text
+    else:
+        answer, cached = cached_generate_content(prompt, ANALYSIS_PROMPT_VERSION, notes_version, api_key=GEMINI_API_KEY)
+        job.check_cancelled()
+        job.meta["cached"] = cached
+    try:
+        return json.loads(answer)
+    except json.JSONDecodeError:
+        return answer
+
+def render_job_progress(job):
+    """Running job: latest progress, partial text and a cancel button"""
+    st.info(f"⏳ {job.label} running for {job.elapsed:.0f}s - feel free to look around, it keeps going in the background")
+    if job.messages:
+        st.caption(f"⏳ {job.messages[-1]}")
+    if job.chunks:
+        st.code(job.partial_text, language="json")
+    if st.button("✋ Cancel analysis", key=f"cancel_job_{job.id}"):
+        get_job_registry().cancel(job.id)
+        st.caption("Cancelling...")
+
+def render_job_result(job):
+    """Finished job: the analysis, or what went wrong"""
+    if job.status == DONE:
+        if job.meta.get("cached"):
+            st.caption("⚡ Instant result from the AI response cache - no notes changed since the last analysis")
+        st.caption(f"✅ Finished in {job.elapsed:.1f}s")
+        render_analysis(job.result)
+    elif job.status == CANCELLED:
+        st.warning("✋ Analysis cancelled")
+    elif isinstance(job.error, GeminiError):
+        if job.error.status_code is None:
+            st.error(f"❌ {job.error}")
+        else:
+            st.error(f"❌ API Error: {job.error.status_code}")
+            st.write(f"Response: {job.error.response_text}")
+    else:
+        st.error(f"❌ Error: {job.error}")
+
+if hasattr(st, "fragment"):
+    # 🔁 Only this small piece reruns every second while the job is cooking
+    @st.fragment(run_every=1.0)
+    def poll_job(job_id):
+        job = get_job_registry().get(job_id)
+        if job is None:
+            return
+        if job.finished:
+            st.rerun()  # 🍽️ Done - redraw the whole page with the result
+        render_job_progress(job)
+else:
+    def poll_job(job_id):
+        job = get_job_registry().get(job_id)
+        if job is not None:
+            render_job_progress(job)
+            st.button("🔄 Check progress", key=f"poll_job_{job_id}")
+
+def show_analysis_job(job_id):
+    job = get_job_registry().get(job_id)
+    if job is None:
+        return
+    if job.status == RUNNING:
+        poll_job(job_id)
+    else:
+        render_job_result(job)
+
 st.markdown("<h1 class='main-header'>🧠 Smart Notes Enhanced</h1>", unsafe_allow_html=True)
 st.markdown("<p style='text-align: center; color: #666; font-size: 1.2rem;'>Your AI-Powered Self-Exploration Platform</p>", unsafe_allow_html=True)
 
 # Sidebar Navigation
+profiler.section("sidebar")
 with st.sidebar:
     st.title("🌟 Navigation")
     
@@ -147,6 +347,11 @@ with st.sidebar:
     if st.button("📋 All Notes", use_container_width=True):
         st.session_state.current_view = 'all_notes'
     
+    # 🧵 A little bell while an analysis cooks in the background
+    running_job = get_job_registry().get(st.session_state.get('analysis_job_id'))
+    if running_job is not None and running_job.status == RUNNING:
+        st.caption(f"🧠 Analysis running ({running_job.elapsed:.0f}s) - see AI Insights")
+    
     st.markdown("---")
     
     # Quick Stats in Sidebar
@@ -158,15 +363,10 @@ with st.sidebar:
     </div>
     """, unsafe_allow_html=True)
     
-    # Mood average if available
-    moods = []
-    for note in st.session_state.notes_app.notes.values():
-        metadata = note.get("metadata", {})
-        if metadata.get("mood") and isinstance(metadata["mood"], (int, float)):
-            moods.append(metadata["mood"])
-    
-    if moods:
-        avg_mood = sum(moods) / len(moods)
+    # Mood average if available (read from the running aggregates, no rescan per rerun)
+    mood_stats = st.session_state.notes_app.aggregates.mood
+    if mood_stats.count:
+        avg_mood = mood_stats.average()
         mood_emoji = "😊" if avg_mood >= 7 else "😐" if avg_mood >= 5 else "😔"
         st.markdown(f"""
         <div class='stats-card'>
@@ -176,6 +376,7 @@ with st.sidebar:
         """, unsafe_allow_html=True)
 
 # Main Content Area
+profiler.section(f"view: {st.session_state.current_view}")
 if st.session_state.current_view == 'dashboard':
     st.markdown("## 🌟 Welcome to Your Self-Exploration Journey")
     
@@ -352,112 +553,35 @@ elif st.session_state.current_view == 'ai_insights':
     else:
         st.success(f"✅ API key loaded: {GEMINI_API_KEY[:15]}...")
         
+        cache_stats = get_response_cache().stats()
+        st.caption(f"🗄️ Response cache: {cache_stats['entries']} entries, "
+                   f"{cache_stats['hit_rate']:.0%} hit rate ({cache_stats['hits']} hits / {cache_stats['misses']} misses)")
+        
+        hierarchical = st.checkbox(
+            "🗓️ Incremental weekly analysis (for large notebooks - only changed weeks are re-analyzed)"
+        )
+        stream_response = st.checkbox("📡 Show the analysis as it's being written", value=True,
+                                      disabled=hierarchical)
+        
         if st.button("🔍 Analyze My Patterns", use_container_width=True):
-            with st.spinner("🧠 AI is analyzing your personal patterns..."):
-                # Create a temporary instance with the correct API key
-                analysis_prompt = st.session_state.notes_app._prepare_analysis_context()
-                
-                # Manual API call with proper error handling
-                try:
-                    url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-1.5-flash:generateContent?key={GEMINI_API_KEY}"
-                    
-                    prompt = f"""You are a personal development coach. Analyze these personal notes and provide insights in JSON format:
-
-{{
-  "emotional_patterns": {{
-    "dominant_emotions": ["emotion1", "emotion2"],
-    "trends": "description of emotional trends"
-  }},
-  "behavioral_patterns": {{
-    "recurring_themes": ["theme1", "theme2"],
-    "growth_indicators": ["indicator1", "indicator2"]
-  }},
-  "recommendations": {{
-    "immediate_actions": ["action1", "action2"],
-    "reflection_questions": ["question1", "question2"]
-  }},
-  "summary": "2-3 sentence summary of personal development journey"
-}}
-
-Notes data:
-{analysis_prompt}
-
-Provide actionable insights for personal growth."""
-                    
-                    payload = {
-                        "contents": [{
-                            "parts": [{
-                                "text": prompt
-                            }]
-                        }]
-                    }
-                    
-                    response = requests.post(url, json=payload, headers={"Content-Type": "application/json"})
-                    
-                    if response.status_code == 200:
-                        result = response.json()
-                        if 'candidates' in result and len(result['candidates']) > 0:
-                            answer = result['candidates'][0]['content']['parts'][0]['text']
-                            try:
-                                analysis = json.loads(answer)
-                                
-                                # Display structured analysis
-                                if analysis.get('summary'):
-                                    st.markdown(f"""
-                                    <div class='insight-card'>
-                                        <h3>📝 Summary</h3>
-                                        <p>{analysis['summary']}</p>
-                                    </div>
-                                    """, unsafe_allow_html=True)
-                                
-                                col1, col2 = st.columns(2)
-                                
-                                with col1:
-                                    if 'emotional_patterns' in analysis:
-                                        ep = analysis['emotional_patterns']
-                                        st.markdown("### 💭 Emotional Patterns")
-                                        if ep.get('dominant_emotions'):
-                                            st.write(f"**Key emotions:** {', '.join(ep['dominant_emotions'])}")
-                                        if ep.get('trends'):
-                                            st.write(f"**Trends:** {ep['trends']}")
-                                
-                                with col2:
-                                    if 'behavioral_patterns' in analysis:
-                                        bp = analysis['behavioral_patterns']
-                                        st.markdown("### 🎨 Behavioral Patterns")
-                                        if bp.get('recurring_themes'):
-                                            st.write(f"**Themes:** {', '.join(bp['recurring_themes'])}")
-                                        if bp.get('growth_indicators'):
-                                            st.write(f"**Growth:** {', '.join(bp['growth_indicators'])}")
-                                
-                                # Recommendations
-                                if 'recommendations' in analysis:
-                                    rec = analysis['recommendations']
-                                    st.markdown("### 🎯 Personalized Recommendations")
-                                    
-                                    if rec.get('immediate_actions'):
-                                        st.markdown("**🏃 Immediate Actions:**")
-                                        for action in rec['immediate_actions']:
-                                            st.write(f"• {action}")
-                                    
-                                    if rec.get('reflection_questions'):
-                                        st.markdown("**🤔 Questions to Ponder:**")
-                                        for question in rec['reflection_questions']:
-                                            st.write(f"• {question}")
-                                
-                                st.balloons()
-                                
-                            except json.JSONDecodeError:
-                                st.markdown("### 🧠 AI Analysis:")
-                                st.write(answer)
-                        else:
-                            st.error("❌ No response from AI")
-                    else:
-                        st.error(f"❌ API Error: {response.status_code}")
-                        st.write(f"Response: {response.text}")
-                        
-                except Exception as e:
-                    st.error(f"❌ Error: {e}")
+            # 🧵 Hand the order to the back kitchen; a repeat click joins the same job
+            notes_app = st.session_state.notes_app
+            notes_version = notebook_version(notes_app.notes_file)
+            if hierarchical:
+                digest = prompt_hash("hierarchical", notes_version)
+                job_function = lambda job: HierarchicalAnalyzer(notes_app).analyze(
+                    api_key=GEMINI_API_KEY, progress=job.report
+                )
+            else:
+                prompt = notes_app._build_analysis_prompt(notes_app._prepare_analysis_context())
+                digest = prompt_hash(ANALYSIS_PROMPT_VERSION, notes_version, prompt)
+                job_function = lambda job: run_pattern_analysis(prompt, notes_version, stream_response, job)
+            job = get_job_registry().submit(st.session_state.session_id, digest, "Pattern analysis", job_function)
+            st.session_state.analysis_job_id = job.id
+        
+        # 🍱 The latest analysis for this session, whether it's still cooking or done
+        if st.session_state.get('analysis_job_id'):
+            show_analysis_job(st.session_state.analysis_job_id)
 
 # 🆕 BRAND NEW MOOD TRENDS PAGE - Watch the waiter call the chef!
 elif st.session_state.current_view == 'mood_trends':
@@ -467,7 +591,9 @@ elif st.session_state.current_view == 'mood_trends':
     # 🔥 THE MAGIC MOMENT: Waiter calls the chef!
     # st.session_state.notes_app = The chef (SmartNotesEnhanced)
     # .track_mood_trends() = The specific recipe we want
-    mood_data = st.session_state.notes_app.track_mood_trends()
+    periods = {"Last 7 days": 7, "Last 30 days": 30, "Last 90 days": 90, "Last year": 365, "All time": None}
+    period = st.selectbox("📆 Period", list(periods), index=1)
+    mood_data = st.session_state.notes_app.track_mood_trends(days_back=periods[period])
     
     # 🎉 Display the results the chef prepared for us
     if "message" in mood_data:
@@ -550,6 +676,37 @@ elif st.session_state.current_view == 'mood_trends':
             else:
                 st.info("⚖️ You maintain consistent energy throughout the day. Well balanced!")
         
+        # 📈 The trend lab: vectorized curves, heatmap and streaks
+        analytics = st.session_state.notes_app.mood_analytics(window=7)
+        
+        st.markdown("### 📈 Mood Over Time")
+        daily = analytics["daily"]
+        st.line_chart(pd.DataFrame({
+            "Daily average": daily["mean"],
+            "7-day rolling average": analytics["daily_rolling"],
+            "Daily energy": analytics["daily_energy"]["mean"]
+        }, index=pd.to_datetime(daily["periods"])))
+        
+        weekly = analytics["weekly"]
+        st.markdown("#### 🗓️ Weekly Average")
+        st.bar_chart(pd.DataFrame({"Weekly mood": weekly["mean"]}, index=pd.to_datetime(weekly["periods"])))
+        
+        st.markdown("### 🕐 Mood by Weekday and Hour")
+        heat = pd.DataFrame(analytics["heatmap"], index=WEEKDAYS, columns=[f"{hour:02d}" for hour in range(24)])
+        # Only show the hours you actually write in
+        heat = heat.loc[:, analytics["heatmap_counts"].sum(axis=0) > 0]
+        st.dataframe(heat.round(1), use_container_width=True)
+        
+        streaks = analytics["streaks"]
+        col1, col2, col3 = st.columns(3)
+        col1.metric("🔥 Journaling Streak", f"{streaks['current_journal_streak']} days",
+                    help=f"Longest: {streaks['longest_journal_streak']} days")
+        col2.metric("😊 Good-Mood Streak", f"{streaks['current_good_mood_streak']} days",
+                    help=f"Longest: {streaks['longest_good_mood_streak']} days of average mood 7+")
+        if analytics["correlation"] is not None:
+            col3.metric("⚡ Mood ↔ Energy", f"{analytics['correlation']:+.2f}",
+                        help="Correlation between mood and energy ratings (-1 to +1)")
+        
         # 📋 Recent mood entries
         st.markdown("### 📋 Recent Mood Entries")
         
@@ -568,10 +725,10 @@ elif st.session_state.current_view == 'statistics':
     if not st.session_state.notes_app.notes:
         st.info("📝 Start journaling to see your statistics!")
     else:
-        # Calculate stats
-        notes = st.session_state.notes_app.notes
-        total_notes = len(notes)
-        total_words = sum(note.get("metadata", {}).get("word_count", 0) for note in notes.values())
+        # Stats come from the running aggregates
+        aggregates = st.session_state.notes_app.aggregates
+        total_notes = aggregates.total_notes
+        total_words = aggregates.total_words
         
         # Display main stats
         col1, col2, col3, col4 = st.columns(4)
@@ -602,10 +759,8 @@ elif st.session_state.current_view == 'statistics':
             """, unsafe_allow_html=True)
         
         with col4:
-            moods = [note.get("metadata", {}).get("mood") for note in notes.values() 
-                    if note.get("metadata", {}).get("mood")]
-            if moods:
-                avg_mood = sum(moods) / len(moods)
+            if aggregates.mood.count:
+                avg_mood = aggregates.mood.average()
                 st.markdown(f"""
                 <div class='stats-card'>
                     <h2>😊 {avg_mood:.1f}</h2>
@@ -615,14 +770,30 @@ elif st.session_state.current_view == 'statistics':
         
         # Entry types breakdown
         st.markdown("### 📝 Entry Types")
-        types = {}
-        for note in notes.values():
-            note_type = note.get("type", "general")
-            types[note_type] = types.get(note_type, 0) + 1
-        
-        for note_type, count in types.items():
+        for note_type, count in aggregates.type_counts.items():
             percentage = (count / total_notes) * 100
             st.write(f"**{note_type.title()}:** {count} entries ({percentage:.1f}%)")
+        
+        # 📆 Last 30 days straight from the daily ledger (30 rows, not every note)
+        recent_days = st.session_state.notes_app.rollup.last_days(30)
+        if recent_days:
+            st.markdown("### 📆 Last 30 Days")
+            st.bar_chart(pd.DataFrame({
+                "Entries": [row["entries"] for _, row in recent_days],
+                "Words": [row["words"] for _, row in recent_days]
+            }, index=pd.to_datetime([day for day, _ in recent_days])), y="Entries")
+        
+        # 📈 Writing rhythm from the trend lab
+        analytics = st.session_state.notes_app.mood_analytics()
+        st.markdown("### 📈 Entries per Week")
+        st.bar_chart(pd.DataFrame({"Entries": analytics["weekly_entries"]},
+                                  index=pd.to_datetime(analytics["weekly"]["periods"])))
+        
+        streaks = analytics["streaks"]
+        col1, col2 = st.columns(2)
+        col1.metric("🔥 Longest Journaling Streak", f"{streaks['longest_journal_streak']} days")
+        if analytics["correlation"] is not None:
+            col2.metric("⚡ Mood ↔ Energy Correlation", f"{analytics['correlation']:+.2f}")
 
 elif st.session_state.current_view == 'all_notes':
     st.markdown("## 📋 All Your Notes")
@@ -630,39 +801,54 @@ elif st.session_state.current_view == 'all_notes':
     if not st.session_state.notes_app.notes:
         st.info("📝 No notes yet. Start your journey!")
     else:
-        # Filter options
-        col1, col2 = st.columns(2)
+        notes_app = st.session_state.notes_app
+        generation = notes_app.generation
+        
+        # Filter and sort options (the option lists are cached until the notes change)
+        col1, col2, col3 = st.columns(3)
         with col1:
-            note_types = list(set(note.get("type", "general") for note in st.session_state.notes_app.notes.values()))
+            note_types = sorted(notes_app.aggregates.type_counts)
             selected_type = st.selectbox("Filter by type", ["All"] + note_types)
         
         with col2:
-            all_tags = []
-            for note in st.session_state.notes_app.notes.values():
-                all_tags.extend(note.get("tags", []))
-            unique_tags = list(set(all_tags))
-            selected_tag = st.selectbox("Filter by tag", ["All"] + unique_tags)
-        
-        # Display notes
-        notes_items = list(st.session_state.notes_app.notes.items())
-        
-        # Apply filters
-        if selected_type != "All":
-            notes_items = [(id, note) for id, note in notes_items 
-                          if note.get("type", "general") == selected_type]
+            selected_tag = st.selectbox("Filter by tag", ["All"] + notes_tag_options(generation))
         
-        if selected_tag != "All":
-            notes_items = [(id, note) for id, note in notes_items 
-                          if selected_tag in note.get("tags", [])]
-        
-        st.write(f"Showing {len(notes_items)} notes")
-        
-        for note_id, note in notes_items:
+        with col3:
+            sort_order = st.selectbox("Sort by", list(NOTE_SORT_ORDERS))
+        
+        # Only ids are cached; note bodies are read for the visible page alone
+        note_ids = filtered_note_ids(generation, selected_type, selected_tag, sort_order)
+        
+        page_col, size_col = st.columns([3, 1])
+        with size_col:
+            page_size = st.selectbox("Per page", [10, 25, 50, 100], index=1)
+        page_count = max(1, -(-len(note_ids) // page_size))
+        with page_col:
+            # Keyed by the filters so changing them starts again at page 1
+            page = st.number_input(f"Page (of {page_count})", min_value=1, max_value=page_count, value=1, step=1,
+                                   key=f"notes_page_{selected_type}_{selected_tag}_{sort_order}_{page_size}")
+        
+        first = (page - 1) * page_size
+        page_ids = note_ids[first:first + page_size]
+        if note_ids:
+            st.write(f"Showing {first + 1}-{first + len(page_ids)} of {len(note_ids)} notes")
+        else:
+            st.write("Showing 0 notes")
+        
+        notes = notes_app.notes
+        for note_id in page_ids:
+            note = notes.get(note_id)
+            if note is None:
+                continue
             with st.expander(f"{note['title']} ({note.get('type', 'general')})"):
                 col1, col2 = st.columns([3, 1])
                 
                 with col1:
-                    st.write(f"**Content:** {note['content']}")
+                    content = note['content']
+                    # Long bodies are only sent to the browser when asked for
+                    if len(content) > NOTE_PREVIEW_CHARS and not st.toggle("Show full note", key=f"full_{note_id}"):
+                        content = content[:NOTE_PREVIEW_CHARS] + "..."
+                    st.write(f"**Content:** {content}")
                     if note.get('tags'):
                         st.write(f"**Tags:** {', '.join(note['tags'])}")
                     st.write(f"**Created:** {note['created'][:16]}")
@@ -675,10 +861,29 @@ elif st.session_state.current_view == 'all_notes':
                         st.metric("Energy", f"{metadata['energy_level']}/10")
 
 # Footer
+profiler.section("footer")
 st.markdown("---")
 st.markdown("""
 <div style='text-align: center; color: #666; padding: 2rem;'>
     <p>🌟 Smart Notes Enhanced - Your AI-Powered Self-Exploration Platform 🌟</p>
     <p>Keep journaling, keep growing! 🚀</p>
 </div>
-""", unsafe_allow_html=True)
\ No newline at end of file
+""", unsafe_allow_html=True)
+
+# ⏱️ THE STOPWATCH READOUT - This rerun's breakdown plus rolling percentiles
+rerun_record = profiler.finish()
+if rerun_record:
+    profile_history = get_profile_history()
+    profile_history.add(rerun_record)
+with st.sidebar:
+    with st.expander("🛠️ Debug", expanded=bool(rerun_record)):
+        st.checkbox("⏱️ Profile reruns", key="profile_reruns")
+        if rerun_record:
+            st.caption(f"This rerun: {rerun_record['total_ms']:.1f} ms")
+            st.dataframe(pd.DataFrame({"ms": rerun_record["sections"]}), use_container_width=True)
+            if rerun_record["calls"]:
+                st.markdown("**Store & HTTP calls**")
+                st.dataframe(pd.DataFrame(rerun_record["calls"]).T, use_container_width=True)
+            st.markdown("**Rolling percentiles (ms)**")
+            st.dataframe(pd.DataFrame(profile_history.percentiles()).T, use_container_width=True)
+            st.caption(f"🧾 Appended to {PROFILE_METRICS_FILE}")
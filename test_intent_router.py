@@ -0,0 +1,84 @@
+"""Tests for the local question router: what it answers, what it leaves to the LLM"""
+
+from datetime import datetime
+
+import pytest
+
+from aggregates import NoteAggregates
+from corpus_generator import generate_notes
+from daily_rollup import DailyRollup
+from intent_router import answer_locally, parse_intent
+
+NOW = datetime(2025, 9, 1, 12, 0)
+TAGS = {"work", "gratitude", "family"}
+
+
+@pytest.mark.parametrize("question, expected", [
+    ("What's my average mood?", ("mood", "avg", None, None)),
+    ("highest energy level last week", ("energy_level", "max", None, None)),
+    ("What was my lowest mood this month?", ("mood", "min", None, None)),
+    ("How many words have I written?", ("word_count", "total", None, None)),
+    ("What is my average mood in journal entries?", ("mood", "avg", "journal", None)),
+    ("average mood of notes tagged work", ("mood", "avg", None, "work")),
+    ("How many notes do I have?", ("notes", "count", None, None)),
+    ("How many goals did I write in the past 7 days?", ("notes", "count", "goal", None)),
+    ("How many work notes did I write last month?", ("notes", "count", None, "work")),
+    ("how many entries since 2025-08-01", ("notes", "count", None, None)),
+])
+def test_parses_statistical_questions(question, expected):
+    intent = parse_intent(question, TAGS, NOW)
+    assert intent is not None
+    assert (intent["metric"], intent["aggregate"], intent["type"], intent["tag"]) == expected
+
+
+@pytest.mark.parametrize("question", [
+    # Qualifiers the totals can't honour
+    "what is my average mood on weekends?",
+    "average energy in the morning",
+    "what was my highest mood when I was with family",
+    "what was my worst mood after meetings",
+    "how many notes mention family",
+    "how many times did I feel happy last week",
+    # Judgement calls and reasoning
+    "how's my mood lately",
+    "why is my energy so low?",
+    "what should I do to improve my mood?",
+    # Dates we can't read
+    "how many notes since 2025-02-30",
+    "average mood on 2025-13-01",
+    # Not statistics at all
+    "what did I learn about python?",
+])
+def test_leaves_other_questions_to_the_llm(question):
+    assert parse_intent(question, TAGS, NOW) is None
+
+
+def test_reads_the_date_range():
+    intent = parse_intent("How many work notes did I write last month?", TAGS, NOW)
+    start, end, label = intent["range"]
+    assert (start, end, label) == (datetime(2025, 8, 1), datetime(2025, 9, 1), "last month")
+
+
+@pytest.mark.parametrize("question", [
+    "What's my average mood?",
+    "What is my highest energy?",
+    "What was my lowest mood in the past 30 days?",
+    "What is my average mood last month?",
+    "How many words have I written?",
+    "How many words did I write this year?",
+    "What's my average word count?",
+    "How many notes do I have?",
+    "How many journal entries did I write last month?",
+    "How many work notes do I have?",
+    "How many gratitude notes did I write in the past 90 days?",
+    "What is my average mood in journal entries?",
+])
+def test_index_answers_match_a_full_scan(question, tmp_path):
+    notes = dict(generate_notes(3000, seed=7, end=NOW, legacy_ratio=0.1))
+    rollup = DailyRollup(rollup_file=tmp_path / "daily_rollup.json")
+    rollup.rebuild(notes)
+
+    indexed = answer_locally(notes, question, NOW, NoteAggregates.from_notes(notes), rollup)
+    scanned = answer_locally(notes, question, NOW)
+    assert indexed is not None
+    assert indexed["answer"] == scanned["answer"]